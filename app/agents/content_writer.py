@@ -1,6 +1,6 @@
 import os
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_core.messages import HumanMessage, SystemMessage
 from openai import AzureOpenAI
 from app.agents.state import AgentState
@@ -36,10 +36,7 @@ class ContentWriterAgent:
         # Initialize the publisher for posting to social media
         self.publisher = SocialMediaPublisher()
 
-    def generate_content(self, product_data: Dict, market_data: Dict) -> Dict[str, Any]:
-        """Generate content for all platforms in one LLM call for efficiency."""
-        
-        system_prompt = """You are an expert Content Strategist and Copywriter. 
+    SYSTEM_PROMPT = """You are an expert Content Strategist and Copywriter. 
 Your goal is to create high-converting, SEO-friendly marketing content for a product based on its visual analysis and market research.
 
 Platforms to cover:
@@ -54,46 +51,95 @@ Guidelines:
 - Include SEO keywords naturally.
 - Provide the output as a structured JSON object."""
 
-        user_prompt = f"""
-PRODUCT DATA:
-{json.dumps(product_data, indent=2)}
-
-MARKET RESEARCH SUMMARY:
-- Search Term: {market_data.get('search_term')}
-- Top Features Found: {market_data.get('features', [])[:5]}
-- Review Sentiment: {market_data.get('metadata', {}).get('total_reviews', 0)} reviews analyzed.
-
-Generate the following in JSON format:
-{{
-  "linkedin_post": {{
+    CONTENT_FORMAT = """{
+  "linkedin_post": {
     "title": "Catchy Headline",
     "content": "Professional post body...",
     "hashtags": ["#tag1", "#tag2"]
-  }},
-  "blog_post": {{
+  },
+  "blog_post": {
     "title": "SEO Optimized Title",
     "content": "Full blog content with markdown headings...",
     "seo_keywords": ["keyword1", "keyword2"]
-  }},
-  "meta_post": {{
+  },
+  "meta_post": {
     "caption": "Catchy caption with emojis...",
     "hashtags": ["#tag1", "#tag2"]
-  }}
-}}
-"""
+  }
+}"""
 
+    @staticmethod
+    def _product_prompt(product_data: Dict, market_data: Dict) -> str:
+        """Inputs for one product: vision analysis and a research summary"""
+        return f"""PRODUCT DATA:
+{json.dumps(product_data, indent=2)}
+
+MARKET RESEARCH SUMMARY:
+- Search Term: {market_data.get('search_term')}
+- Top Features Found: {market_data.get('features', [])[:5]}
+- Review Sentiment: {market_data.get('metadata', {}).get('total_reviews', 0)} reviews analyzed."""
+
+    def _complete_json(self, user_prompt: str) -> Dict[str, Any]:
         response = self.client.chat.completions.create(
             model=self.deployment_name,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": self.SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=self.temperature,
             response_format={"type": "json_object"}
         )
-        
         return json.loads(response.choices[0].message.content)
 
+    def generate_content(self, product_data: Dict, market_data: Dict) -> Dict[str, Any]:
+        """Generate content for all platforms in one LLM call for efficiency."""
+        user_prompt = f"""
+{self._product_prompt(product_data, market_data)}
+
+Generate the following in JSON format:
+{self.CONTENT_FORMAT}
+"""
+        return self._complete_json(user_prompt)
+
+    def generate_content_batch(self, products: List[Tuple[Dict, Dict]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Generate content for several products in one LLM call.
+
+        The system prompt and output instructions are sent once for the
+        whole batch instead of once per product, and one request replaces
+        len(products) requests.
+
+        Args:
+            products: (product_data, market_data) pairs
+
+        Returns:
+            Content per product, in input order; None for any product the
+            model left out of its answer (callers retry those singly)
+        """
+        if len(products) == 1:
+            return [self.generate_content(*products[0])]
+
+        sections = "\n\n".join(
+            f"=== PRODUCT p{index} ===\n{self._product_prompt(product_data, market_data)}"
+            for index, (product_data, market_data) in enumerate(products)
+        )
+        user_prompt = f"""
+Create content for each of the {len(products)} products below, independently: never mix details between products.
+
+{sections}
+
+Return JSON with one entry per product, keyed by its id (p0, p1, ...):
+{{"products": {{"p0": <content>, "p1": <content>, ...}}}}
+
+where each <content> has this format:
+{self.CONTENT_FORMAT}
+"""
+        results = self._complete_json(user_prompt).get("products", {})
+        return [
+            results.get(f"p{index}") if isinstance(results.get(f"p{index}"), dict) else None
+            for index in range(len(products))
+        ]
+
     def __call__(self, state: AgentState) -> AgentState:
         """LangGraph node function."""
         print("Content Writer Agent: Generating marketing content...")
@@ -107,7 +153,18 @@ Generate the following in JSON format:
                 return state
             
             generated = self.generate_content(product_data, market_data)
+            self.record_content(state, generated)
             
+        except Exception as e:
+            error_msg = f"Content Writer Error: {str(e)}"
+            state["errors"].append(error_msg)
+            print(f"Error: {error_msg}")
+            
+        return state
+
+    def record_content(self, state: AgentState, generated: Dict[str, Any]) -> AgentState:
+        """Store generated content on the state and publish the LinkedIn post."""
+        try:
             # Update state
             state["generated_content"] = generated
             state["current_step"] = "content_generation_complete"
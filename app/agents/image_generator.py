@@ -5,13 +5,21 @@ This agent uses the Bytez SDK to generate:
 1. Fashion model images wearing the product
 2. Product showcase images
 3. Social media campaign images (Instagram, Facebook, TikTok styles)
+
+All prompts are submitted concurrently (up to IMAGE_GEN_CONCURRENCY at a
+time, on the shared agent thread pool) through one shared model handle, each with its own timeout
+(IMAGE_GEN_TIMEOUT_SECONDS). Callers can pass `on_image` to handle every
+image as soon as it is ready instead of waiting for the whole set.
 """
 
 import os
-from typing import Dict, Any, Optional, List
+import asyncio
+import inspect
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from langchain_core.messages import SystemMessage
 from bytez import Bytez
 from app.agents.state import AgentState, ProductData
+from app.core.executor import run_agent_call
 
 
 class ImageGeneratorAgent:
@@ -30,6 +38,10 @@ class ImageGeneratorAgent:
             
         self.client = Bytez(api_key)
         self.model_id = "ZB-Tech/Text-to-Image"
+        self.model = self.client.model(self.model_id)
+        
+        self.concurrency = max(1, int(os.getenv("IMAGE_GEN_CONCURRENCY", "5")))
+        self.timeout_seconds = float(os.getenv("IMAGE_GEN_TIMEOUT_SECONDS", "120"))
         
     def generate_fashion_prompt(self, product_data: Dict[str, Any]) -> str:
         """Create prompt for fashion model image."""
@@ -113,11 +125,20 @@ class ImageGeneratorAgent:
         )
         return prompt
 
+    def build_prompts(self, product_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(image type, prompt) pairs for every image in the campaign set."""
+        return [
+            ("fashion_model", self.generate_fashion_prompt(product_data)),
+            ("product_showcase", self.generate_product_showcase_prompt(product_data)),
+            ("instagram_campaign", self.generate_instagram_campaign_prompt(product_data)),
+            ("facebook_campaign", self.generate_facebook_campaign_prompt(product_data)),
+            ("tiktok_campaign", self.generate_tiktok_campaign_prompt(product_data))
+        ]
+
     def generate_image(self, prompt: str) -> Dict[str, Any]:
         """Generate image using Bytez SDK."""
         try:
-            model = self.client.model(self.model_id)
-            result = model.run(prompt)
+            result = self.model.run(prompt)
             
             return {
                 "output": result.output,
@@ -126,7 +147,67 @@ class ImageGeneratorAgent:
         except Exception as e:
             return {"error": str(e), "output": None}
 
-    def __call__(self, state: AgentState) -> AgentState:
+    async def agenerate_images(
+        self,
+        product_data: Dict[str, Any],
+        on_image: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Generate the whole campaign set concurrently.
+        
+        Args:
+            product_data: Vision analysis results
+            on_image: Called (or awaited, if a coroutine function) with each
+                image dict as soon as that image is ready
+            
+        Returns:
+            (images in prompt order, error messages for images that failed)
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def generate_one(image_type: str, prompt: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                print(f"\n  [GENERATING] {image_type.replace('_', ' ')} image...")
+                print(f"     Prompt: {prompt[:80]}...")
+                try:
+                    # The SDK call blocks, so it runs on the shared agent pool
+                    # (bounded by AGENT_EXECUTOR_WORKERS across all workflows);
+                    # a timed-out call is abandoned, not killed
+                    result = await asyncio.wait_for(
+                        run_agent_call(self.generate_image, prompt),
+                        timeout=self.timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    result = {"error": f"timed out after {self.timeout_seconds:.0f}s", "output": None}
+            
+            if result.get("error") or not result.get("output"):
+                raise RuntimeError(f"{image_type}: {result.get('error') or 'no output'}")
+            
+            image = {"type": image_type, "url": result["output"], "prompt": prompt}
+            print(f"     [OK] {image_type.replace('_', ' ')} generated")
+            
+            if on_image is not None:
+                outcome = on_image(image)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            return image
+        
+        results = await asyncio.gather(
+            *(generate_one(image_type, prompt) for image_type, prompt in self.build_prompts(product_data)),
+            return_exceptions=True
+        )
+        
+        images = [r for r in results if isinstance(r, dict)]
+        errors = [str(r) for r in results if isinstance(r, BaseException)]
+        for error in errors:
+            print(f"     [WARNING] Error: {error}")
+        return images, errors
+
+    async def arun(
+        self,
+        state: AgentState,
+        on_image: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> AgentState:
         """
         Generate multiple campaign images for different platforms.
         """
@@ -140,36 +221,9 @@ class ImageGeneratorAgent:
             if "generated_images" not in state:
                 state["generated_images"] = []
             
-            # Generate different image types
-            image_types = [
-                ("fashion_model", self.generate_fashion_prompt(product_data)),
-                ("product_showcase", self.generate_product_showcase_prompt(product_data)),
-                ("instagram_campaign", self.generate_instagram_campaign_prompt(product_data)),
-                ("facebook_campaign", self.generate_facebook_campaign_prompt(product_data)),
-                ("tiktok_campaign", self.generate_tiktok_campaign_prompt(product_data))
-            ]
-            
-            generated_count = 0
-            
-            for image_type, prompt in image_types:
-                print(f"\n  [GENERATING] {image_type.replace('_', ' ')} image...")
-                print(f"     Prompt: {prompt[:80]}...")
-                
-                result = self.generate_image(prompt)
-                
-                if result.get("error"):
-                    print(f"     [WARNING] Error: {result['error']}")
-                    continue
-                
-                image_url = result.get("output")
-                if image_url:
-                    state["generated_images"].append({
-                        "type": image_type,
-                        "url": image_url,
-                        "prompt": prompt
-                    })
-                    print(f"     [OK] Generated successfully!")
-                    generated_count += 1
+            images, _ = await self.agenerate_images(product_data, on_image=on_image)
+            state["generated_images"].extend(images)
+            generated_count = len(images)
             
             if generated_count == 0:
                 raise Exception("No images were generated successfully")
@@ -189,3 +243,9 @@ class ImageGeneratorAgent:
             print(f"\n[ERROR] {error_msg}")
             
         return state
+
+    def __call__(self, state: AgentState) -> AgentState:
+        """
+        Synchronous entry point (LangGraph node); runs `arun` on its own event loop.
+        """
+        return asyncio.run(self.arun(state))
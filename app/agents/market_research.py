@@ -5,14 +5,31 @@ This agent uses Brave Search API efficiently with just 2 queries per product:
 1. Main search: product info, features, reviews
 2. Supplementary search: news and videos
 
-Optimized for scale operations.
+Optimized for scale operations. Search results are cached in a persistent
+store shared by all worker processes, and the monthly query budget is
+counted in the same store, so repeat research for the same product costs
+no queries and restarts do not reset the budget.
+
+All searches in the process share one token-bucket rate limiter. `arun` is
+the async variant of the LangGraph node: it sends both queries concurrently
+whenever the limiter allows. With the default BRAVE_BURST=1 (the free plan's
+1 query/second) the limiter still spaces the two queries a second apart, so
+only cache hits and the rest of the work overlap; set BRAVE_BURST=2 or more
+on a paid plan to send both queries at once. Blocking calls run on the
+shared agent pool (run_agent_call), under the same concurrency limit as the
+other agents.
 """
 
 import os
-import time
-from typing import Dict, Any, List
+import re
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_core.messages import SystemMessage
 from app.agents.state import AgentState
+from app.core.executor import run_agent_call
+from app.utils.cache import PersistentCache, make_cache_key
+from app.utils.rate_limit import get_rate_limiter
 from brave import Brave
 
 
@@ -37,23 +54,89 @@ class MarketResearchAgent:
             print("   Get your free key at: https://brave.com/search/api/")
         
         self.brave = Brave(api_key=self.api_key) if self.api_key else None
-        self.last_request_time = 0
-        self.query_count = 0
-        self.max_queries = 200
+        
+        # One bucket for every workflow in the process. The free plan allows
+        # 1 query/second; raise BRAVE_BURST on paid plans to send both queries at once.
+        self.rate_limiter = get_rate_limiter(
+            "brave_search",
+            rate=float(os.getenv("BRAVE_RATE_PER_SECOND", "1")),
+            capacity=int(os.getenv("BRAVE_BURST", "1"))
+        )
+        self.max_queries = int(os.getenv("BRAVE_MAX_QUERIES", "200"))  # Per calendar month
+        
+        # Shared result cache; the query budget counter lives in the same store
+        self.cache = PersistentCache(
+            "brave_search",
+            ttl_seconds=int(os.getenv("BRAVE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            max_entries=int(os.getenv("BRAVE_CACHE_MAX_ENTRIES", "10000"))
+        )
         
     def _rate_limit(self):
-        """Enforce 1 search per second rate limit."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 1.0:
-            sleep_time = 1.0 - time_since_last
-            print(f"Rate limiting: waiting {sleep_time:.2f}s...")
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
-        self.query_count += 1
-        
-        if self.query_count >= self.max_queries:
-            print(f"Warning: Approaching query limit ({self.query_count}/{self.max_queries})")
+        """Wait for the shared Brave rate limiter."""
+        waited = self.rate_limiter.acquire()
+        if waited:
+            print(f"Rate limiting: waited {waited:.2f}s")
+    
+    def _consume_quota(self) -> bool:
+        """Count one query against the shared monthly budget; False if exhausted."""
+        period = datetime.utcnow().strftime("%Y-%m")
+        used = self.cache.increment_counter(f"queries:{period}", limit=self.max_queries)
+        if used is None:
+            print(f"Warning: Brave query budget exhausted ({self.max_queries}/{self.max_queries} this month)")
+            return False
+        if used >= self.max_queries * 0.9:
+            print(f"Warning: Approaching query limit ({used}/{self.max_queries})")
+        return True
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Lowercase, drop punctuation and word order so similar names share a cache entry."""
+        words = re.sub(r"[^\w\s]", " ", query.lower()).split()
+        return " ".join(sorted(set(words)))
+    
+    def _lookup(self, query: str, count: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Cache key and fresh cached results (or None) for a query."""
+        cache_key = make_cache_key(self._normalize_query(query), count)
+        return cache_key, self.cache.get(cache_key)
+    
+    def _fetch(self, query: str, count: int, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Call Brave and cache the results."""
+        results = self.brave.search(q=query, count=count, raw=True)
+        if isinstance(results, dict):
+            self.cache.set(cache_key, results)
+        return results
+    
+    def _search(self, query: str, count: int) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Run a Brave query through the shared cache, budget and rate limiter.
+        
+        Returns:
+            (raw results or None, whether a Brave query was actually spent)
+        """
+        cache_key, cached = self._lookup(query, count)
+        if cached is not None:
+            print("   Served from search cache")
+            return cached, False
+        
+        if not self._consume_quota():
+            # Out of budget: an expired result is better than none
+            return self.cache.get(cache_key, allow_stale=True), False
+        
+        self._rate_limit()
+        return self._fetch(query, count, cache_key), True
+    
+    async def _search_async(self, query: str, count: int) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Async variant of _search; waits for the rate limiter without holding a thread."""
+        cache_key, cached = await run_agent_call(self._lookup, query, count)
+        if cached is not None:
+            print("   Served from search cache")
+            return cached, False
+        
+        if not await run_agent_call(self._consume_quota):
+            return await run_agent_call(self.cache.get, cache_key, allow_stale=True), False
+        
+        await self.rate_limiter.acquire_async()
+        return await run_agent_call(self._fetch, query, count, cache_key), True
     
     def _extract_reviews_from_results(self, results: List[Dict]) -> Dict[str, List[str]]:
         """Extract reviews from search results based on source domain."""
@@ -104,26 +187,50 @@ class MarketResearchAgent:
         Uses a single query with count=20 to get maximum information.
         """
         if not self.brave:
-            return {"results": [], "reviews": {}, "features": []}
+            return {"results": [], "reviews": {}, "features": [], "queried": False}
         
         print(f"Query 1/2: Comprehensive search for '{product_name}'")
         
+        try:
+            # Single comprehensive query with higher count
+            search_results, queried = self._search(
+                f"{product_name} review features specifications",
+                count=20  # Get more results in one query
+            )
+        except Exception as e:
+            print(f"   Error: {e}")
+            search_results, queried = None, False
+        
+        return self._parse_comprehensive(search_results, queried)
+    
+    async def search_comprehensive_async(self, product_name: str) -> Dict[str, Any]:
+        """Async variant of search_comprehensive."""
+        if not self.brave:
+            return {"results": [], "reviews": {}, "features": [], "queried": False}
+        
+        print(f"Query 1/2: Comprehensive search for '{product_name}'")
+        
+        try:
+            search_results, queried = await self._search_async(
+                f"{product_name} review features specifications",
+                count=20
+            )
+        except Exception as e:
+            print(f"   Error: {e}")
+            search_results, queried = None, False
+        
+        return self._parse_comprehensive(search_results, queried)
+    
+    def _parse_comprehensive(self, search_results: Optional[Dict[str, Any]], queried: bool) -> Dict[str, Any]:
+        """Turn raw comprehensive-search results into results, reviews and features."""
         all_data = {
             "results": [],
             "reviews": {"amazon": [], "reddit": [], "youtube": [], "general": []},
-            "features": []
+            "features": [],
+            "queried": queried
         }
         
         try:
-            self._rate_limit()
-            
-            # Single comprehensive query with higher count
-            search_results = self.brave.search(
-                q=f"{product_name} review features specifications",
-                count=20,  # Get more results in one query
-                raw=True
-            )
-            
             if isinstance(search_results, dict) and 'web' in search_results:
                 web_results = search_results['web'].get('results', [])
                 
@@ -157,25 +264,49 @@ class MarketResearchAgent:
         Optional - can be skipped if not needed.
         """
         if not self.brave:
-            return {"news": [], "videos": []}
+            return {"news": [], "videos": [], "queried": False}
         
         print(f"News and videos for '{product_name}'")
         
+        try:
+            # Search for news and videos
+            search_results, queried = self._search(
+                f"{product_name} news video",
+                count=10
+            )
+        except Exception as e:
+            print(f"   Error: {e}")
+            search_results, queried = None, False
+        
+        return self._parse_news_videos(search_results, queried)
+    
+    async def search_news_videos_async(self, product_name: str) -> Dict[str, Any]:
+        """Async variant of search_news_videos."""
+        if not self.brave:
+            return {"news": [], "videos": [], "queried": False}
+        
+        print(f"News and videos for '{product_name}'")
+        
+        try:
+            search_results, queried = await self._search_async(
+                f"{product_name} news video",
+                count=10
+            )
+        except Exception as e:
+            print(f"   Error: {e}")
+            search_results, queried = None, False
+        
+        return self._parse_news_videos(search_results, queried)
+    
+    def _parse_news_videos(self, search_results: Optional[Dict[str, Any]], queried: bool) -> Dict[str, Any]:
+        """Pick news articles and videos out of raw search results."""
         media_data = {
             "news": [],
-            "videos": []
+            "videos": [],
+            "queried": queried
         }
         
         try:
-            self._rate_limit()
-            
-            # Search for news and videos
-            search_results = self.brave.search(
-                q=f"{product_name} news video",
-                count=10,
-                raw=True
-            )
-            
             if isinstance(search_results, dict):
                 # Extract news
                 if 'news' in search_results and search_results['news'].get('results'):
@@ -217,28 +348,99 @@ class MarketResearchAgent:
         
         return media_data
 
+    def _check_configured(self, state: AgentState) -> bool:
+        if not self.brave:
+            error_msg = "Brave API key not configured. Please set BRAVE_API_KEY environment variable."
+            state["errors"].append(error_msg)
+            print(f"Error: {error_msg}")
+            return False
+        return True
+    
+    def _product_name(self, state: AgentState) -> str:
+        product_data = state.get("product_data", {})
+        product_name = product_data.get("product_name")
+        
+        if not product_name:
+            product_name = "Generic Product"
+            print("Warning: No product name found, using generic search")
+            
+        print(f"Researching: {product_name}")
+        print(f"Optimization: Using only 2 API queries (saves 71% quota)\n")
+        return product_name
+    
+    def _store_results(
+        self,
+        state: AgentState,
+        product_name: str,
+        comprehensive_data: Dict[str, Any],
+        media_data: Dict[str, Any]
+    ):
+        """Combine both searches into state["market_data"]."""
+        # Combine all data
+        search_results = comprehensive_data["results"]
+        reviews = comprehensive_data["reviews"]
+        features = comprehensive_data["features"]
+        news = media_data["news"]
+        videos = media_data["videos"]
+        
+        # Add video descriptions to YouTube reviews
+        for video in videos:
+            if video.get("description"):
+                reviews["youtube"].append(video["description"])
+        
+        # Count totals
+        total_reviews = sum(len(v) for v in reviews.values())
+        queries_used = sum(d["queried"] for d in (comprehensive_data, media_data))
+        
+        # Save to state
+        state["market_data"] = {
+            "search_term": product_name,
+            "results": search_results,
+            "reviews": reviews,
+            "features": features,
+            "news": news,
+            "videos": videos,
+            "metadata": {
+                "total_results": len(search_results),
+                "total_reviews": total_reviews,
+                "total_features": len(features),
+                "total_news": len(news),
+                "total_videos": len(videos),
+                "sources": ["brave_web", "amazon", "reddit", "youtube", "news"],
+                "api_provider": "Brave Search API",
+                "queries_used": queries_used,
+                "optimization": "2 queries instead of 7 (71% savings)"
+            }
+        }
+        
+        state["current_step"] = "market_research_complete"
+        state["messages"].append(
+            SystemMessage(
+                content=f"Gathered market data via Brave Search ({queries_used} queries): {len(search_results)} results, "
+                       f"{total_reviews} reviews, {len(features)} features, {len(news)} news, "
+                       f"{len(videos)} videos for {product_name}"
+            )
+        )
+        
+        print(f"\nMarket research complete!")
+        print(f"   Search Results: {len(search_results)}")
+        print(f"   Reviews: {total_reviews}")
+        print(f"   Features: {len(features)}")
+        print(f"   News: {len(news)}")
+        print(f"   Videos: {len(videos)}")
+        print(f"   API Queries Used: {queries_used}")
+    
     def __call__(self, state: AgentState) -> AgentState:
         """
         Process the state with optimized 2-query approach.
         """
         print("Market Research Agent: Optimized search (2 queries only)...")
         
-        if not self.brave:
-            error_msg = "Brave API key not configured. Please set BRAVE_API_KEY environment variable."
-            state["errors"].append(error_msg)
-            print(f"Error: {error_msg}")
+        if not self._check_configured(state):
             return state
         
         try:
-            product_data = state.get("product_data", {})
-            product_name = product_data.get("product_name")
-            
-            if not product_name:
-                product_name = "Generic Product"
-                print("Warning: No product name found, using generic search")
-                
-            print(f"Researching: {product_name}")
-            print(f"Optimization: Using only 2 API queries (saves 71% quota)\n")
+            product_name = self._product_name(state)
             
             # QUERY 1: Comprehensive search (product info + reviews + features)
             comprehensive_data = self.search_comprehensive(product_name)
@@ -246,58 +448,37 @@ class MarketResearchAgent:
             # QUERY 2: News and videos (optional)
             media_data = self.search_news_videos(product_name)
             
-            # Combine all data
-            search_results = comprehensive_data["results"]
-            reviews = comprehensive_data["reviews"]
-            features = comprehensive_data["features"]
-            news = media_data["news"]
-            videos = media_data["videos"]
-            
-            # Add video descriptions to YouTube reviews
-            for video in videos:
-                if video.get("description"):
-                    reviews["youtube"].append(video["description"])
+            self._store_results(state, product_name, comprehensive_data, media_data)
             
-            # Count totals
-            total_reviews = sum(len(v) for v in reviews.values())
+        except Exception as e:
+            error_msg = f"Market Research Error: {str(e)}"
+            state["errors"].append(error_msg)
+            print(f"Error: {error_msg}")
+            import traceback
+            traceback.print_exc()
             
-            # Save to state
-            state["market_data"] = {
-                "search_term": product_name,
-                "results": search_results,
-                "reviews": reviews,
-                "features": features,
-                "news": news,
-                "videos": videos,
-                "metadata": {
-                    "total_results": len(search_results),
-                    "total_reviews": total_reviews,
-                    "total_features": len(features),
-                    "total_news": len(news),
-                    "total_videos": len(videos),
-                    "sources": ["brave_web", "amazon", "reddit", "youtube", "news"],
-                    "api_provider": "Brave Search API",
-                    "queries_used": 2,
-                    "optimization": "2 queries instead of 7 (71% savings)"
-                }
-            }
+        return state
+    
+    async def arun(self, state: AgentState) -> AgentState:
+        """
+        Async variant of __call__: both queries go out concurrently, subject
+        to the shared rate limiter, so research takes about one round trip.
+        At the default BRAVE_BURST=1 the limiter sends them a second apart.
+        """
+        print("Market Research Agent: Concurrent search (2 queries)...")
+        
+        if not self._check_configured(state):
+            return state
+        
+        try:
+            product_name = self._product_name(state)
             
-            state["current_step"] = "market_research_complete"
-            state["messages"].append(
-                SystemMessage(
-                    content=f"Gathered market data via Brave Search (2 queries): {len(search_results)} results, "
-                           f"{total_reviews} reviews, {len(features)} features, {len(news)} news, "
-                           f"{len(videos)} videos for {product_name}"
-                )
+            comprehensive_data, media_data = await asyncio.gather(
+                self.search_comprehensive_async(product_name),
+                self.search_news_videos_async(product_name)
             )
             
-            print(f"\nMarket research complete!")
-            print(f"   Search Results: {len(search_results)}")
-            print(f"   Reviews: {total_reviews}")
-            print(f"   Features: {len(features)}")
-            print(f"   News: {len(news)}")
-            print(f"   Videos: {len(videos)}")
-            print(f"   API Queries Used: 2 (saved 5 queries!)")
+            self._store_results(state, product_name, comprehensive_data, media_data)
             
         except Exception as e:
             error_msg = f"Market Research Error: {str(e)}"
@@ -9,10 +9,15 @@ import os
 import base64
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from langchain_core.messages import HumanMessage, SystemMessage
 from openai import AzureOpenAI
 from app.agents.state import AgentState, ProductData
+from app.utils.cache import PersistentCache, make_cache_key, hash_file
+from app.utils.image_processing import prepare_image
+
+# Bump whenever the analysis prompt changes so cached results are not reused
+PROMPT_VERSION = "v1"
 
 
 class VisionAnalyzerAgent:
@@ -53,18 +58,40 @@ class VisionAnalyzerAgent:
             api_version=api_version,
         )
         
-    def encode_image(self, image_path: str) -> str:
+        # Images are downscaled and re-encoded before upload
+        self.max_image_edge = int(os.getenv("VISION_MAX_IMAGE_EDGE", "1024"))
+        self.image_format = os.getenv("VISION_IMAGE_FORMAT", "WEBP")
+        self.image_quality = int(os.getenv("VISION_IMAGE_QUALITY", "85"))
+        
+        # Repeat analyses of the same image and description are served from
+        # a persistent cache instead of calling the API again (TTL 0 = off)
+        cache_ttl = int(os.getenv("VISION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+        self.cache = PersistentCache(
+            "vision_analysis",
+            ttl_seconds=cache_ttl,
+            max_entries=int(os.getenv("VISION_CACHE_MAX_ENTRIES", "5000"))
+        ) if cache_ttl > 0 else None
+        
+    def encode_image(self, image_path: str) -> Tuple[str, str]:
         """
         Encode image to base64 for API transmission.
         
+        The image is first orientation-corrected, downscaled and re-encoded
+        (see app/utils/image_processing.py).
+        
         Args:
             image_path: Path to the product image
             
         Returns:
-            Base64 encoded image string
+            (Base64 encoded image string, MIME type)
         """
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+        image_bytes, mime_type = prepare_image(
+            image_path,
+            max_edge=self.max_image_edge,
+            image_format=self.image_format,
+            quality=self.image_quality
+        )
+        return base64.b64encode(image_bytes).decode('utf-8'), mime_type
     
     def analyze_product_image(self, image_path: str, description: str = "") -> Dict[str, Any]:
         """
@@ -77,8 +104,20 @@ class VisionAnalyzerAgent:
         Returns:
             Structured product data dictionary
         """
+        cache_key = None
+        if self.cache:
+            cache_key = make_cache_key(
+                hash_file(image_path), description, self.deployment_name,
+                self.temperature, PROMPT_VERSION,
+                self.max_image_edge, self.image_format, self.image_quality
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print("Vision analysis served from cache")
+                return cached
+        
         # Encode the image
-        base64_image = self.encode_image(image_path)
+        base64_image, mime_type = self.encode_image(image_path)
         
         # Construct the analysis prompt
         system_prompt = """You are an expert marketing analyst and visual designer. 
@@ -113,7 +152,7 @@ Provide your analysis as a valid JSON object."""
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
+                            "url": f"data:{mime_type};base64,{base64_image}"
                         }
                     }
                 ]
@@ -133,6 +172,8 @@ Provide your analysis as a valid JSON object."""
         try:
             content = response.choices[0].message.content
             product_data = json.loads(content)
+            if cache_key:
+                self.cache.set(cache_key, product_data)
             return product_data
         except json.JSONDecodeError:
             # Fallback: return raw content
@@ -1,3 +1,3 @@
-from . import auth, projects, uploads, jobs
+from . import auth, projects, uploads, jobs, batches
 
-__all__ = ["auth", "projects", "uploads", "jobs"]
+__all__ = ["auth", "projects", "uploads", "jobs", "batches"]
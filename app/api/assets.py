@@ -1,16 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+import os
 import uuid
 from app.db.session import get_db
 from app.db.models import Asset, Project, User
 from app.schemas.asset import AssetOut
 from app.api.auth import get_current_user
+from app.core.config import settings
+from app.utils.blob_store import blob_path
+from app.utils.pagination import InvalidCursor, page_size, paginate, split_page
 
 router = APIRouter(
     prefix="/assets",
     tags=["assets"]
 )
 
+@router.get("/blobs/{name}")
+def get_blob(name: str):
+    """
+    Serve a stored blob (e.g. a generated image).
+
+    Blob names are the SHA-256 of their content, so the URL is unguessable
+    and the bytes never change: responses are cacheable indefinitely.
+    """
+    path = blob_path(name)
+    if not path or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blob not found"
+        )
+
+    return FileResponse(
+        path,
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{name.split(".")[0]}"'
+        }
+    )
+
 @router.get("/{asset_id}", response_model=AssetOut)
 def get_asset(
     asset_id: str,
@@ -58,12 +88,22 @@ def get_asset(
 @router.get("/")
 def list_assets(
     project_id: str = None,
+    asset_type: Optional[str] = Query(None, description="Only assets of this type (e.g. blog_post, image)"),
+    created_after: Optional[datetime] = Query(None, description="Only assets created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only assets created before this time"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (max {settings.PAGE_SIZE_MAX})"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List assets, optionally filtered by project_id"""
-    query = db.query(Asset)
+    """List the current user's assets, oldest first, one page at a time"""
+    # Ownership is checked by the join itself, so the page comes back in a
+    # single query however many projects the user has
+    query = db.query(Asset).join(Project, Project.id == Asset.project_id).filter(
+        Project.user_id == current_user.id
+    )
     
+    project_uuid = None
     if project_id:
         try:
             project_uuid = uuid.UUID(project_id)
@@ -72,27 +112,38 @@ def list_assets(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid project ID format"
             )
-        
-        # Verify project belongs to user
-        project = db.query(Project).filter(
+        query = query.filter(Asset.project_id == project_uuid)
+    
+    if asset_type:
+        query = query.filter(Asset.asset_type == asset_type)
+    if created_after:
+        query = query.filter(Asset.created_at >= created_after)
+    if created_before:
+        query = query.filter(Asset.created_at < created_before)
+    
+    limit = page_size(limit)
+    try:
+        query = paginate(query, Asset, cursor, limit)
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    assets, next_cursor = split_page(query.all(), limit)
+    
+    # An empty first page may mean the project is not the user's: only then
+    # is it worth a second query to answer 404 rather than an empty list
+    if project_uuid and not assets and not cursor:
+        owned = db.query(Project.id).filter(
             Project.id == project_uuid,
             Project.user_id == current_user.id
         ).first()
-        
-        if not project:
+        if not owned:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
-        
-        query = query.filter(Asset.project_id == project_uuid)
-    else:
-        # Get all projects for user and filter assets
-        user_projects = db.query(Project).filter(Project.user_id == current_user.id).all()
-        project_ids = [p.id for p in user_projects]
-        query = query.filter(Asset.project_id.in_(project_ids))
-    
-    assets = query.all()
     
     return {
         "assets": [
@@ -105,5 +156,6 @@ def list_assets(
                 created_at=asset.created_at
             )
             for asset in assets
-        ]
+        ],
+        "next_cursor": next_cursor
     }
@@ -3,11 +3,16 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Annotated, Optional
-from app.db.session import get_db
+from app.db.session import get_db, get_session_local
 from app.db.models import User, UserSession
 from app.schemas.user import UserCreate, UserLogin, UserOut, Token
-from app.core.security import hash_password, verify_password, create_access_token, decode_access_token
+from app.core.security import (
+    PasswordHashingBusy, hash_password_async, verify_password_async, needs_rehash,
+    create_access_token, decode_access_token
+)
+from app.core.executor import run_db_call
 from app.core.config import settings
+from app.core.auth_cache import get_auth_cache, token_digest, UserSnapshot
 import uuid
 
 router = APIRouter(
@@ -17,11 +22,43 @@ router = APIRouter(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
+def _busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+def _create_user(db: Session, email: str, password_hash: str) -> User:
+    new_user = User(
+        email=email,
+        password_hash=password_hash,
+        is_active=True
+    )
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+def _store_session(db: Session, user: User, access_token: str, expires_at: datetime, new_password_hash: Optional[str]):
+    if new_password_hash:
+        user.password_hash = new_password_hash
+    session = UserSession(
+        user_id=user.id,
+        token_digest=token_digest(access_token),
+        expires_at=expires_at
+    )
+    db.add(session)
+    db.commit()
+
 @router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
+    # Async so bcrypt runs in the password process pool, not a request thread;
+    # database calls go through the DB executor
     print(f"DEBUG: Attempting signup for email: {user.email}")
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    existing_user = await run_db_call(
+        lambda: db.query(User.id).filter(User.email == user.email).first()
+    )
     if existing_user:
         print(f"DEBUG: Signup failed - Email {user.email} already exists")
         raise HTTPException(
@@ -29,21 +66,18 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordHashingBusy:
+        raise _busy_exception()
+    
     try:
         # Create new user
-        hashed_password = hash_password(user.password)
-        new_user = User(
-            email=user.email,
-            password_hash=hashed_password,
-            is_active=True
-        )
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        new_user = await run_db_call(_create_user, db, user.email, hashed_password)
         print(f"DEBUG: User created successfully: {new_user.id}")
         return UserOut(id=str(new_user.id), email=new_user.email)
     except Exception as e:
-        db.rollback()
+        await run_db_call(db.rollback)
         print(f"ERROR: Database error during signup: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -51,7 +85,7 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     username: Annotated[str, Form()],
     password: Annotated[str, Form()],
     grant_type: Annotated[str, Form(pattern="password")] = "password",
@@ -63,9 +97,13 @@ def login(
     """
     OAuth2 password-flow compatible login endpoint.
     Standardized for perfect Swagger UI compatibility.
+    
+    Answers 503 with Retry-After when the password pool is saturated.
     """
     # Find user by email / username
-    user = db.query(User).filter(User.email == username).first()
+    user = await run_db_call(
+        lambda: db.query(User).filter(User.email == username).first()
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,7 +112,12 @@ def login(
         )
     
     # Verify password
-    if not verify_password(password, user.password_hash):
+    try:
+        password_ok = await verify_password_async(password, user.password_hash)
+    except PasswordHashingBusy:
+        raise _busy_exception()
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -88,67 +131,135 @@ def login(
             detail="User account is inactive"
         )
     
+    # Upgrade the hash if BCRYPT_ROUNDS changed; best effort, the next
+    # login retries if the pool is busy
+    new_password_hash = None
+    if needs_rehash(user.password_hash):
+        try:
+            new_password_hash = await hash_password_async(password)
+        except PasswordHashingBusy:
+            pass
+    
     # Create access token
     expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email},
+        # jti keeps tokens unique even when issued in the same second
+        data={"sub": str(user.id), "email": user.email, "jti": uuid.uuid4().hex},
         expires_delta=expires_delta
     )
     
     # Store session in database
     expires_at = datetime.utcnow() + expires_delta
-    session = UserSession(
-        user_id=user.id,
-        token=access_token,
-        expires_at=expires_at
-    )
-    db.add(session)
-    db.commit()
+    await run_db_call(_store_session, db, user, access_token, expires_at, new_password_hash)
     
     return Token(access_token=access_token, token_type="bearer")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    """Dependency to get the current authenticated user"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def resolve_user(token: str, db: Session) -> User:
+    """
+    Authenticate a bearer token.
+    
+    Tokens seen recently are answered from the in-process auth cache with no
+    database queries; otherwise the session and user are checked in the
+    database and the result is cached. The returned User is a detached
+    snapshot (id, email, is_active), not a session-bound row.
+    """
+    auth_cache = get_auth_cache()
+    auth_cache.refresh_revocations(db)
     
+    snapshot = auth_cache.get(token)
+    if snapshot is None:
+        # Decode token
+        payload = decode_access_token(token)
+        if payload is None:
+            raise _credentials_exception()
+        
+        user_id: str = payload.get("sub")
+        if user_id is None:
+            raise _credentials_exception()
+        
+        # Verify session exists and is valid
+        session = db.query(UserSession.id).filter(
+            UserSession.token_digest == token_digest(token),
+            UserSession.expires_at > datetime.utcnow(),
+            UserSession.revoked_at.is_(None)
+        ).first()
+        
+        if not session:
+            raise _credentials_exception()
+        
+        # Get user
+        user = db.query(User).filter(User.id == uuid.UUID(user_id)).first()
+        if user is None:
+            raise _credentials_exception()
+        
+        snapshot = UserSnapshot(id=user.id, email=user.email, is_active=user.is_active)
+        auth_cache.put(token, snapshot, payload.get("exp", 0))
+    
+    if not snapshot.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is inactive"
+        )
+    
+    return User(id=snapshot.id, email=snapshot.email, is_active=snapshot.is_active)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    """Dependency to get the current authenticated user"""
     # Check if token is None
     if token is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    return resolve_user(token, db)
+
+def get_current_user_for_stream(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    get_current_user for long-lived responses such as event streams.
+    
+    get_current_user's session stays open until the response ends, holding
+    any pooled connection it checked out; this one closes its session
+    before the endpoint runs.
+    """
+    if token is None:
+        raise _credentials_exception()
     
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
+    db = get_session_local()()
+    try:
+        return resolve_user(token, db)
+    finally:
+        db.close()
+
+@router.post("/logout")
+def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Revoke the current access token.
     
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    Takes effect immediately in this process and within
+    AUTH_REVOCATION_POLL_SECONDS in every other process.
+    """
+    if token is None:
+        raise _credentials_exception()
     
-    # Verify session exists and is valid
     session = db.query(UserSession).filter(
-        UserSession.token == token,
-        UserSession.expires_at > datetime.utcnow()
+        UserSession.token_digest == token_digest(token),
+        UserSession.revoked_at.is_(None)
     ).first()
     
     if not session:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    # Get user
-    user = db.query(User).filter(User.id == uuid.UUID(user_id)).first()
-    if user is None:
-        raise credentials_exception
+    session.revoked_at = datetime.utcnow()
+    db.commit()
     
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User account is inactive"
-        )
+    get_auth_cache().revoke(token, (session.expires_at - datetime(1970, 1, 1)).total_seconds())
     
-    return user
+    return {"message": "Logged out"}
 
 @router.get("/me", response_model=UserOut)
 def get_me(current_user: User = Depends(get_current_user)):
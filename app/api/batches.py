@@ -0,0 +1,261 @@
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+import contextlib
+import os
+import uuid
+from app.db.session import get_db
+from app.db.models import Batch, Project, Upload, User
+from app.schemas.batch import BatchOut, BatchCreated
+from app.schemas.project import ProjectCreate
+from app.api.auth import get_current_user
+from app.core.config import settings
+from app.core.job_queue import add_batch_workflows
+from app.utils.catalog_import import PRODUCT_FIELDS, CatalogFormatError, read_products
+from app.utils.uploads import UploadTooLarge, safe_extension, save_stream
+
+router = APIRouter(
+    prefix="/batches",
+    tags=["batches"]
+)
+
+# Row errors reported back at most, so a broken 1000-row file stays readable
+MAX_REPORTED_ERRORS = 20
+
+def _batch_status(counts: Dict[str, int]) -> str:
+    # Projects deleted since the import no longer count
+    finished = counts.get("completed", 0) + counts.get("failed", 0)
+    if finished and finished == sum(counts.values()):
+        return "finished"
+    if finished or counts.get("processing", 0):
+        return "processing"
+    if counts.get("queued", 0):
+        return "queued"
+    return "created"
+
+def _batch_out(batch: Batch, counts: Dict[str, int]) -> Dict[str, Any]:
+    return dict(
+        id=str(batch.id),
+        source_filename=batch.source_filename,
+        total=batch.total,
+        status=_batch_status(counts),
+        counts=counts,
+        created_at=batch.created_at
+    )
+
+def _validate_rows(rows: List[Dict[str, Any]], image_names: set) -> List[str]:
+    """Check every row up front: the batch is created whole or not at all"""
+    errors = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            ProjectCreate(**{field: row[field] for field in PRODUCT_FIELDS})
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            errors.append(f"Row {number}: {problems}")
+        if row["image"] and row["upload_id"]:
+            errors.append(f"Row {number}: provide either image or upload_id, not both")
+        elif row["image"] and row["image"] not in image_names:
+            errors.append(f"Row {number}: image '{row['image']}' was not sent with the request")
+        elif row["upload_id"]:
+            try:
+                uuid.UUID(row["upload_id"])
+            except ValueError:
+                errors.append(f"Row {number}: invalid upload_id")
+    return errors
+
+def _save_images(
+    images: List[UploadFile],
+    names: set,
+    current_user: User,
+    db: Session,
+    saved_paths: List[str]
+) -> Dict[str, str]:
+    """
+    Store the referenced image parts as completed uploads.
+
+    Several products may share an image file; as uploads, the file is not
+    removed when one of those projects is deleted.
+
+    Returns:
+        File path by image name
+    """
+    paths = {}
+    for image in images:
+        if image.filename not in names or image.filename in paths:
+            continue
+        if not image.content_type or not image.content_type.startswith('image/'):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{image.filename}: file must be an image"
+            )
+        try:
+            file_path, sha256, size = save_stream(image.file, f"{uuid.uuid4()}{safe_extension(image.filename)}")
+        except UploadTooLarge as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"{image.filename}: {e}"
+            )
+        saved_paths.append(file_path)
+        db.add(Upload(
+            user_id=current_user.id,
+            filename=image.filename,
+            content_type=image.content_type,
+            status="completed",
+            bytes_received=size,
+            sha256=sha256,
+            file_path=file_path
+        ))
+        paths[image.filename] = file_path
+    return paths
+
+@router.post("/", response_model=BatchCreated, status_code=status.HTTP_201_CREATED)
+def create_batch(
+    products: UploadFile = File(..., description="Catalog as CSV (with header) or JSONL"),
+    images: List[UploadFile] = File(default=[], description="Product images, referenced by file name in the image column"),
+    start: bool = Form(True, description="Queue the agent workflow for every product"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create many projects from one catalog file.
+
+    Columns: product_name (required), brand_name, price, description,
+    campaign_goal, target_audience, brand_persona, and optionally image
+    (name of an image sent in this request) or upload_id (a completed
+    upload from /uploads).
+
+    All projects are inserted in one transaction: if any row is invalid,
+    nothing is created and the row errors are returned. With start=true
+    their workflows are queued as batch workflows, which the workers run
+    BATCH_MAX_RUNNING_WORKFLOWS at a time in total. Follow progress with
+    GET /batches/{batch_id}.
+    """
+    try:
+        rows = read_products(
+            products.file, products.filename, products.content_type,
+            settings.BATCH_MAX_PRODUCTS
+        )
+    except CatalogFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    errors = _validate_rows(rows, {image.filename for image in images})
+
+    # Resolve every upload_id in one query
+    upload_ids = {uuid.UUID(row["upload_id"]) for row in rows if row["upload_id"]} if not errors else set()
+    upload_paths = {}
+    if upload_ids:
+        upload_paths = {
+            str(upload_id): file_path
+            for upload_id, file_path in db.query(Upload.id, Upload.file_path).filter(
+                Upload.id.in_(upload_ids),
+                Upload.user_id == current_user.id,
+                Upload.status == "completed"
+            )
+        }
+        for number, row in enumerate(rows, start=1):
+            if row["upload_id"] and str(uuid.UUID(row["upload_id"])) not in upload_paths:
+                errors.append(f"Row {number}: upload not found or not completed")
+
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=errors[:MAX_REPORTED_ERRORS] + (
+                [f"... and {len(errors) - MAX_REPORTED_ERRORS} more"] if len(errors) > MAX_REPORTED_ERRORS else []
+            )
+        )
+
+    saved_paths: List[str] = []
+    try:
+        image_paths = _save_images(images, {row["image"] for row in rows if row["image"]}, current_user, db, saved_paths)
+
+        batch = Batch(
+            user_id=current_user.id,
+            source_filename=products.filename,
+            total=len(rows)
+        )
+        db.add(batch)
+        db.flush()
+
+        project_status = "queued" if start else "created"
+        project_rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": current_user.id,
+                "batch_id": batch.id,
+                "status": project_status,
+                "image_path": image_paths.get(row["image"]) or upload_paths.get(
+                    str(uuid.UUID(row["upload_id"])) if row["upload_id"] else None
+                ),
+                **{field: row[field] for field in PRODUCT_FIELDS}
+            }
+            for row in rows
+        ]
+        # One multi-row INSERT for the projects and one for their jobs
+        db.execute(insert(Project), project_rows)
+        project_ids = [row["id"] for row in project_rows]
+        if start:
+            add_batch_workflows(db, project_ids, batch.id)
+        db.commit()
+        db.refresh(batch)
+    except Exception as e:
+        db.rollback()
+        for path in saved_paths:
+            # A cleanup failure must not hide the original error
+            with contextlib.suppress(OSError):
+                os.remove(path)
+        if isinstance(e, HTTPException):
+            raise
+        print(f"Could not create batch from {products.filename}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+    return BatchCreated(
+        **_batch_out(batch, {project_status: len(rows)}),
+        project_ids=[str(project_id) for project_id in project_ids]
+    )
+
+@router.get("/{batch_id}", response_model=BatchOut)
+def get_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Aggregate progress of a batch: its projects counted by status"""
+    try:
+        batch_uuid = uuid.UUID(batch_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid batch ID format"
+        )
+
+    batch = db.query(Batch).filter(
+        Batch.id == batch_uuid,
+        Batch.user_id == current_user.id
+    ).first()
+
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+
+    # Served by ix_projects_batch_id_status, however large the batch
+    counts = dict(
+        db.query(Project.status, func.count(Project.id))
+        .filter(Project.batch_id == batch.id)
+        .group_by(Project.status)
+        .all()
+    )
+
+    return BatchOut(**_batch_out(batch, counts))
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
+import asyncio
+import json
 import uuid
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db, run_concurrently
 from app.db.models import Job, Project, User
 from app.schemas.job import JobOut, JobCreate
-from app.api.auth import get_current_user
-from app.core.orchestrator import AgentOrchestrator
+from app.api.auth import get_current_user, get_current_user_for_stream
+from app.core.config import settings
+from app.core.events import get_event_broker
+from app.core.orchestrator import WORKFLOW_STAGES, AgentOrchestrator, stage_applies
+from app.core.job_queue import (
+    BATCH_WORKFLOW_JOB_TYPE, WORKFLOW_JOB_TYPE, WORKFLOW_JOB_TYPES, enqueue_workflow, enqueue_workflow_async
+)
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
-@router.post("/start/{project_id}")
-async def start_workflow(
+@router.post("/start/{project_id}", status_code=status.HTTP_202_ACCEPTED)
+def start_workflow(
     project_id: str,
-    background_tasks: BackgroundTasks,
+    force: bool = Query(False, description="Re-run every stage, even those whose inputs did not change"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Start the agent workflow for a project.
+    Queue the agent workflow for a project.
     
     This triggers the complete pipeline:
     1. Vision Analysis
@@ -26,7 +36,12 @@ async def start_workflow(
     3. Content Generation
     4. Image Generation (optional)
     
-    The workflow runs in the background and updates job statuses.
+    The workflow is picked up by a worker process (python -m app.worker);
+    poll /jobs/{job_id} or the project status endpoint for progress.
+    
+    Stages whose inputs are unchanged since their last successful run reuse
+    that result, so e.g. editing only brand_persona re-runs just content
+    generation. Pass force=true to run everything again.
     """
     try:
         project_uuid = uuid.UUID(project_id)
@@ -36,11 +51,12 @@ async def start_workflow(
             detail="Invalid project ID format"
         )
     
-    # Verify project exists and belongs to user
+    # Verify project exists and belongs to user. The row stays locked until
+    # enqueue_workflow commits, so concurrent starts see each other's status
     project = db.query(Project).filter(
         Project.id == project_uuid,
         Project.user_id == current_user.id
-    ).first()
+    ).with_for_update().first()
     
     if not project:
         raise HTTPException(
@@ -48,33 +64,23 @@ async def start_workflow(
             detail="Project not found"
         )
     
-    # Check if workflow is already running
-    if project.status == "processing":
+    # Check if workflow is already queued or running
+    if project.status in ("queued", "processing"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Workflow is already running for this project"
         )
     
-    # Start workflow in background
-    orchestrator = AgentOrchestrator(db)
-    
-    # Run workflow asynchronously
-    result = await orchestrator.start_workflow(project_uuid)
+    job = enqueue_workflow(db, project, {"force": True} if force else None)
     
     return {
-        "message": "Workflow started",
+        "message": "Workflow queued",
         "project_id": project_id,
-        "status": result.get("status"),
-        "jobs": result.get("jobs", {})
+        "status": job.status,
+        "job_id": str(job.id)
     }
 
-@router.get("/{job_id}", response_model=JobOut)
-def get_job(
-    job_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get a specific job by ID"""
+async def _get_user_job(job_id: str, current_user: User, db: AsyncSession) -> Job:
     try:
         job_uuid = uuid.UUID(job_id)
     except ValueError:
@@ -83,25 +89,28 @@ def get_job(
             detail="Invalid job ID format"
         )
     
-    job = db.query(Job).filter(Job.id == job_uuid).first()
+    # Job and ownership check in one query
+    job = await db.scalar(
+        select(Job)
+        .join(Project, Project.id == Job.project_id)
+        .where(Job.id == job_uuid, Project.user_id == current_user.id)
+    )
     
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
-    
-    # Verify job belongs to user's project
-    project = db.query(Project).filter(
-        Project.id == job.project_id,
-        Project.user_id == current_user.id
-    ).first()
-    
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
+    return job
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a specific job by ID"""
+    job = await _get_user_job(job_id, current_user, db)
     
     return JobOut(
         id=str(job.id),
@@ -116,80 +125,129 @@ def get_job(
         created_at=job.created_at
     )
 
-@router.get("/project/{project_id}/status")
-def get_workflow_status(
-    project_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Get the current status of the workflow for a project.
-    
-    Returns all jobs and their statuses.
-    """
+def _parse_project_id(project_id: str) -> uuid.UUID:
     try:
-        project_uuid = uuid.UUID(project_id)
+        return uuid.UUID(project_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid project ID format"
         )
+
+async def _load_workflow_status(project_uuid: uuid.UUID, current_user: User) -> Dict[str, Any]:
+    async def load_project_status(db: AsyncSession):
+        return await db.scalar(
+            select(Project.status).where(
+                Project.id == project_uuid,
+                Project.user_id == current_user.id
+            )
+        )
     
-    # Verify project belongs to user
-    project = db.query(Project).filter(
-        Project.id == project_uuid,
-        Project.user_id == current_user.id
-    ).first()
+    async def load_jobs(db: AsyncSession):
+        return (await db.scalars(select(Job).where(Job.project_id == project_uuid))).all()
     
-    if not project:
+    # Ownership check and job list are independent: run them together
+    project_status, jobs = await run_concurrently(load_project_status, load_jobs)
+    
+    if project_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    orchestrator = AgentOrchestrator(db)
-    status_info = orchestrator.get_workflow_status(project_uuid)
+    return AgentOrchestrator.format_workflow_status(project_status, jobs)
+
+@router.get("/project/{project_id}/status")
+async def get_workflow_status(
+    project_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current status of the workflow for a project.
     
-    return status_info
+    Returns all jobs and their statuses. To follow a running workflow,
+    prefer /jobs/project/{project_id}/events over polling this endpoint.
+    """
+    return await _load_workflow_status(_parse_project_id(project_id), current_user)
 
-@router.post("/{job_id}/retry")
-async def retry_job(
-    job_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+def _sse(event_type: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/project/{project_id}/events")
+async def stream_workflow_events(
+    project_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user_for_stream)
 ):
     """
-    Retry a failed job.
+    Stream workflow progress as server-sent events.
+    
+    The first event ("snapshot") has the same body as the status endpoint.
+    After that the stream pushes "project" events (status changes) and
+    "job" events (stage started, finished, reused, or partial output such
+    as each generated image) as the orchestrator produces them. Comment
+    lines are sent as keep-alives when nothing happens.
     
-    This will re-run the specific agent that failed.
+    Events reach the API process over a single PostgreSQL LISTEN
+    connection (app/core/events.py), so an open stream costs no queries.
+    Authentication and the snapshot use short-lived sessions that are
+    closed before streaming starts: a stream holds no pooled connection.
     """
+    project_uuid = _parse_project_id(project_id)
+    broker = get_event_broker()
+    
+    # Subscribe before taking the snapshot, so no event falls in between
+    queue = broker.subscribe(str(project_uuid))
     try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid job ID format"
-        )
+        snapshot = await _load_workflow_status(project_uuid, current_user)
+    except BaseException:
+        broker.unsubscribe(str(project_uuid), queue)
+        raise
     
-    job = db.query(Job).filter(Job.id == job_uuid).first()
+    async def stream():
+        try:
+            yield _sse("snapshot", snapshot)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event["type"], event)
+        finally:
+            broker.unsubscribe(str(project_uuid), queue)
     
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
+
+@router.post("/{job_id}/retry", status_code=status.HTTP_202_ACCEPTED)
+async def retry_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Retry a failed job.
     
-    # Verify job belongs to user's project
-    project = db.query(Project).filter(
-        Project.id == job.project_id,
-        Project.user_id == current_user.id
-    ).first()
+    Queues the project's workflow so a worker re-runs just the failed stage
+    (in the same job row) with inputs rebuilt from the completed upstream
+    jobs, then continues with the stages after it. Completed stages are not
+    run again. Retrying a failed WORKFLOW or BATCH_WORKFLOW job resumes the
+    whole workflow the same way, as the same job type; a stage of a batch
+    project is retried as a BATCH_WORKFLOW too.
     
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
+    Answers 409 when the stage does not apply to the project any more (e.g.
+    image generation after the base image was removed).
+    """
+    job = await _get_user_job(job_id, current_user, db)
     
     # Only retry failed jobs
     if job.status != "failed":
@@ -198,18 +256,36 @@ async def retry_job(
             detail=f"Cannot retry job with status: {job.status}"
         )
     
-    # Reset job status
-    job.status = "pending"
-    job.error_message = None
-    job.started_at = None
-    job.completed_at = None
-    db.commit()
+    # Locked like in start_workflow: concurrent retries cannot both enqueue
+    project = await db.get(Project, job.project_id, with_for_update=True)
+    if project.status in ("queued", "processing"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Workflow is already running for this project"
+        )
+    
+    if job.job_type in WORKFLOW_JOB_TYPES:
+        # A batch workflow stays one, so it keeps counting against the batch limit
+        job_type = job.job_type
+        options = {key: value for key, value in (job.input_payload or {}).items() if key == "batch_id"}
+    else:
+        if job.job_type in WORKFLOW_STAGES and not stage_applies(job.job_type, project):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{WORKFLOW_STAGES[job.job_type]['label']} does not apply to this project"
+            )
+        options = {"retry_job_id": str(job.id)}
+        if project.batch_id:
+            job_type = BATCH_WORKFLOW_JOB_TYPE
+            options["batch_id"] = str(project.batch_id)
+        else:
+            job_type = WORKFLOW_JOB_TYPE
     
-    # TODO: Trigger specific agent based on job_type
-    # For now, just return success
+    workflow_job = await enqueue_workflow_async(db, project, options or None, job_type)
     
     return {
         "message": "Job queued for retry",
         "job_id": job_id,
-        "job_type": job.job_type
+        "job_type": job.job_type,
+        "workflow_job_id": str(workflow_job.id)
     }
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Request, Security
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Query, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 import os
 import uuid
 from datetime import datetime
-from app.db.session import get_db
-from app.db.models import Project, Job, User, Asset
+from app.db.session import get_db, get_async_db, run_concurrently
+from app.db.models import Project, Job, User, Asset, Upload
 from app.schemas.project import ProjectCreate, ProjectOut, ProjectUpdate, ProjectDetail
-from app.api.auth import get_current_user
-from app.core.security import decode_access_token
+from app.schemas.job import JobOut
+from app.schemas.asset import AssetOut
+from app.api.auth import get_current_user, resolve_user
+from app.core.config import settings
+from app.utils.image_processing import derived_image_paths
+from app.utils.pagination import InvalidCursor, page_size, paginate, split_page
+from app.utils.uploads import UploadTooLarge, safe_extension, save_stream
 
 router = APIRouter(
     prefix="/projects",
@@ -17,7 +24,7 @@ router = APIRouter(
 )
 
 # Ensure uploads directory exists
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = settings.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # HTTP Bearer security scheme
@@ -38,35 +45,9 @@ def get_user_from_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    token = credentials.credentials
-    
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token missing user ID",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return user
+    # Same checks (and in-process cache) as get_current_user, so logged-out
+    # tokens are rejected here too
+    return resolve_user(credentials.credentials, db)
 
 @router.post("/", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)
 def create_project(
@@ -78,6 +59,7 @@ def create_project(
     target_audience: Optional[str] = Form(None, description="Target demographic"),
     brand_persona: Optional[str] = Form(None, description="Brand personality/voice"),
     image: Optional[UploadFile] = File(None, description="Product image (optional at creation)"),
+    upload_id: Optional[str] = Form(None, description="ID of a completed upload from /uploads (instead of image)"),
     current_user: User = Depends(get_user_from_token),
     db: Session = Depends(get_db)
 ):
@@ -91,9 +73,39 @@ def create_project(
     """
     
     file_path = None
+    has_image = bool(image and hasattr(image, "filename") and image.filename)
+    
+    if has_image and upload_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either image or upload_id, not both"
+        )
+    
+    # Attach a previously uploaded image
+    if upload_id:
+        try:
+            upload_uuid = uuid.UUID(upload_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid upload ID format"
+            )
+        
+        upload = db.query(Upload).filter(
+            Upload.id == upload_uuid,
+            Upload.user_id == current_user.id,
+            Upload.status == "completed"
+        ).first()
+        
+        if not upload:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found or not completed"
+            )
+        file_path = upload.file_path
     
     # Handle image upload if provided and not empty
-    if image and hasattr(image, "filename") and image.filename:
+    if has_image:
         # Validate image file
         if not image.content_type or not image.content_type.startswith('image/'):
             raise HTTPException(
@@ -101,16 +113,15 @@ def create_project(
                 detail="File must be an image"
             )
         
-        # Generate unique filename
-        file_extension = os.path.splitext(image.filename)[1] if image.filename else '.jpg'
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
-        
-        # Save image file
+        # Stream to a unique filename without holding the file in memory
+        unique_filename = f"{uuid.uuid4()}{safe_extension(image.filename)}"
         try:
-            with open(file_path, "wb") as buffer:
-                content = image.file.read()
-                buffer.write(content)
+            file_path, _, _ = save_stream(image.file, unique_filename)
+        except UploadTooLarge as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -157,41 +168,94 @@ def create_project(
         created_at=project.created_at
     )
 
-@router.get("/", response_model=List[ProjectOut])
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+@router.get("/")
 def list_projects(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (max {settings.PAGE_SIZE_MAX})"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """List all projects for the current user"""
-    projects = db.query(Project).filter(
-        Project.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    
-    return [
-        ProjectOut(
-            id=str(p.id),
-            user_id=str(p.user_id),
-            product_name=p.product_name,
-            brand_name=p.brand_name,
-            price=p.price,
-            description=p.description,
-            campaign_goal=p.campaign_goal,
-            target_audience=p.target_audience,
-            brand_persona=p.brand_persona,
-            image_path=p.image_path,
-            status=p.status,
-            created_at=p.created_at
+    """List the current user's projects, newest first, one page at a time"""
+    limit = page_size(limit)
+    try:
+        query = paginate(
+            db.query(Project).filter(Project.user_id == current_user.id),
+            Project, cursor, limit, newest_first=True
+        )
+    except InvalidCursor:
+        raise _invalid_cursor()
+    
+    projects, next_cursor = split_page(query.all(), limit)
+    
+    return {
+        "projects": [
+            ProjectOut(
+                id=str(p.id),
+                user_id=str(p.user_id),
+                product_name=p.product_name,
+                brand_name=p.brand_name,
+                price=p.price,
+                description=p.description,
+                campaign_goal=p.campaign_goal,
+                target_audience=p.target_audience,
+                brand_persona=p.brand_persona,
+                image_path=p.image_path,
+                status=p.status,
+                created_at=p.created_at
+            )
+            for p in projects
+        ],
+        "next_cursor": next_cursor
+    }
+
+PROJECT_INCLUDES = {"jobs": Project.jobs, "assets": Project.assets}
+
+def _parse_include(include: Optional[str]) -> List[str]:
+    names = [name.strip() for name in (include or "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in PROJECT_INCLUDES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(unknown)} (expected {', '.join(PROJECT_INCLUDES)})"
         )
-        for p in projects
-    ]
+    return names
+
+def _job_out(job: Job) -> JobOut:
+    return JobOut(
+        id=str(job.id),
+        project_id=str(job.project_id),
+        job_type=job.job_type,
+        status=job.status,
+        input_payload=job.input_payload,
+        output_payload=job.output_payload,
+        error_message=job.error_message,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        created_at=job.created_at
+    )
+
+def _asset_out(asset: Asset) -> AssetOut:
+    return AssetOut(
+        id=str(asset.id),
+        project_id=str(asset.project_id),
+        asset_type=asset.asset_type,
+        content=asset.content,
+        file_url=asset.file_url,
+        created_at=asset.created_at
+    )
 
 @router.get("/{project_id}", response_model=ProjectDetail)
-def get_project(
+async def get_project(
     project_id: str,
+    include: Optional[str] = Query(None, description="Related rows to embed, comma-separated: jobs, assets"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific project by ID with detailed information"""
     try:
@@ -201,27 +265,51 @@ def get_project(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid project ID format"
         )
+    includes = _parse_include(include)
+    
+    # Counts and latest job status as correlated subqueries, so the project
+    # and its summary come back in a single round trip (each one is served
+    # by the project_id indexes on jobs and assets)
+    jobs_count = (
+        select(func.count(Job.id))
+        .where(Job.project_id == Project.id)
+        .scalar_subquery()
+    )
+    assets_count = (
+        select(func.count(Asset.id))
+        .where(Asset.project_id == Project.id)
+        .scalar_subquery()
+    )
+    latest_job_status = (
+        select(Job.status)
+        .where(Job.project_id == Project.id)
+        .order_by(Job.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
     
-    project = db.query(Project).filter(
+    query = select(
+        Project,
+        jobs_count.label("jobs_count"),
+        assets_count.label("assets_count"),
+        latest_job_status.label("latest_job_status")
+    ).where(
         Project.id == project_uuid,
         Project.user_id == current_user.id
-    ).first()
+    )
+    # One extra SELECT ... WHERE project_id IN (...) per requested relation
+    for name in includes:
+        query = query.options(selectinload(PROJECT_INCLUDES[name]))
     
-    if not project:
+    row = (await db.execute(query)).first()
+    
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    # Get related counts
-    jobs_count = db.query(Job).filter(Job.project_id == project_uuid).count()
-    assets_count = db.query(Asset).filter(Asset.project_id == project_uuid).count()
-    
-    # Get latest job status
-    latest_job = db.query(Job).filter(
-        Job.project_id == project_uuid
-    ).order_by(Job.created_at.desc()).first()
-    
+    project = row.Project
     return ProjectDetail(
         id=str(project.id),
         user_id=str(project.user_id),
@@ -235,9 +323,11 @@ def get_project(
         image_path=project.image_path,
         status=project.status,
         created_at=project.created_at,
-        jobs_count=jobs_count,
-        assets_count=assets_count,
-        latest_job_status=latest_job.status if latest_job else None
+        jobs_count=row.jobs_count,
+        assets_count=row.assets_count,
+        latest_job_status=row.latest_job_status,
+        jobs=[_job_out(job) for job in project.jobs] if "jobs" in includes else None,
+        assets=[_asset_out(asset) for asset in project.assets] if "assets" in includes else None
     )
 
 @router.put("/{project_id}", response_model=ProjectOut)
@@ -316,12 +406,17 @@ def delete_project(
             detail="Project not found"
         )
     
-    # Delete image file if exists
-    if project.image_path and os.path.exists(project.image_path):
-        try:
-            os.remove(project.image_path)
-        except Exception as e:
-            print(f"Warning: Could not delete image file: {e}")
+    # Delete image file and its processed copies if they exist, unless the
+    # file belongs to a reusable upload
+    owned_by_upload = db.query(Upload.id).filter(
+        Upload.file_path == project.image_path
+    ).first() is not None
+    if project.image_path and os.path.exists(project.image_path) and not owned_by_upload:
+        for path in [project.image_path] + derived_image_paths(project.image_path):
+            try:
+                os.remove(path)
+            except Exception as e:
+                print(f"Warning: Could not delete image file: {e}")
     
     # Delete project (cascade will handle jobs and assets)
     db.delete(project)
@@ -329,13 +424,22 @@ def delete_project(
     
     return None
 
+async def _owned_project_exists(db: AsyncSession, project_uuid: uuid.UUID, user_id) -> bool:
+    return await db.scalar(
+        select(Project.id).where(
+            Project.id == project_uuid,
+            Project.user_id == user_id
+        )
+    ) is not None
+
 @router.get("/{project_id}/jobs")
-def get_project_jobs(
+async def get_project_jobs(
     project_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (max {settings.PAGE_SIZE_MAX})"),
+    current_user: User = Depends(get_current_user)
 ):
-    """Get all jobs for a specific project"""
+    """Get jobs for a specific project, oldest first, one page at a time"""
     try:
         project_uuid = uuid.UUID(project_id)
     except ValueError:
@@ -344,46 +448,44 @@ def get_project_jobs(
             detail="Invalid project ID format"
         )
     
-    # Verify project belongs to user
-    project = db.query(Project).filter(
-        Project.id == project_uuid,
-        Project.user_id == current_user.id
-    ).first()
+    limit = page_size(limit)
+    try:
+        query = paginate(select(Job).where(Job.project_id == project_uuid), Job, cursor, limit)
+    except InvalidCursor:
+        raise _invalid_cursor()
     
-    if not project:
+    async def load_jobs(db: AsyncSession):
+        return (await db.scalars(query)).all()
+    
+    # Verify project belongs to user while the jobs load
+    owned, jobs = await run_concurrently(
+        lambda db: _owned_project_exists(db, project_uuid, current_user.id),
+        load_jobs
+    )
+    
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    jobs = db.query(Job).filter(Job.project_id == project_uuid).all()
-    
-    from app.schemas.job import JobOut
+    jobs, next_cursor = split_page(jobs, limit)
     return {
         "jobs": [
-            JobOut(
-                id=str(job.id),
-                project_id=str(job.project_id),
-                job_type=job.job_type,
-                status=job.status,
-                input_payload=job.input_payload,
-                output_payload=job.output_payload,
-                error_message=job.error_message,
-                started_at=job.started_at,
-                completed_at=job.completed_at,
-                created_at=job.created_at
-            )
+            _job_out(job)
             for job in jobs
-        ]
+        ],
+        "next_cursor": next_cursor
     }
 
 @router.get("/{project_id}/assets")
-def get_project_assets(
+async def get_project_assets(
     project_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (max {settings.PAGE_SIZE_MAX})"),
+    current_user: User = Depends(get_current_user)
 ):
-    """Get all generated assets for a specific project"""
+    """Get generated assets for a specific project, oldest first, one page at a time"""
     try:
         project_uuid = uuid.UUID(project_id)
     except ValueError:
@@ -392,32 +494,32 @@ def get_project_assets(
             detail="Invalid project ID format"
         )
     
-    # Verify project belongs to user
-    project = db.query(Project).filter(
-        Project.id == project_uuid,
-        Project.user_id == current_user.id
-    ).first()
+    limit = page_size(limit)
+    try:
+        query = paginate(select(Asset).where(Asset.project_id == project_uuid), Asset, cursor, limit)
+    except InvalidCursor:
+        raise _invalid_cursor()
     
-    if not project:
+    async def load_assets(db: AsyncSession):
+        return (await db.scalars(query)).all()
+    
+    # Verify project belongs to user while the assets load
+    owned, assets = await run_concurrently(
+        lambda db: _owned_project_exists(db, project_uuid, current_user.id),
+        load_assets
+    )
+    
+    if not owned:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    from app.schemas.asset import AssetOut
-    
-    assets = db.query(Asset).filter(Asset.project_id == project_uuid).all()
-    
+    assets, next_cursor = split_page(assets, limit)
     return {
         "assets": [
-            AssetOut(
-                id=str(asset.id),
-                project_id=str(asset.project_id),
-                asset_type=asset.asset_type,
-                content=asset.content,
-                file_url=asset.file_url,
-                created_at=asset.created_at
-            )
+            _asset_out(asset)
             for asset in assets
-        ]
+        ],
+        "next_cursor": next_cursor
     }
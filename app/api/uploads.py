@@ -1,10 +1,212 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from sqlalchemy.orm import Session
+import uuid
+from app.db.session import get_db
+from app.db.models import Upload, User
+from app.schemas.upload import UploadCreate, UploadOut
+from app.api.auth import get_current_user
+from app.utils.uploads import (
+    PartialUploadMissing, UploadTooLarge, safe_extension, save_stream, append_chunk, finalize_partial
+)
 
 router = APIRouter(
     prefix="/uploads",
     tags=["uploads"]
 )
 
-@router.post("/image")
-def upload_image(file: UploadFile = File(...)):
-    return {"filename": file.filename}
+def _upload_out(upload: Upload) -> UploadOut:
+    return UploadOut(
+        id=str(upload.id),
+        filename=upload.filename,
+        content_type=upload.content_type,
+        status=upload.status,
+        bytes_received=upload.bytes_received or 0,
+        sha256=upload.sha256,
+        created_at=upload.created_at
+    )
+
+def _get_user_upload(upload_id: str, current_user: User, db: Session, for_update: bool = False) -> Upload:
+    try:
+        upload_uuid = uuid.UUID(upload_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid upload ID format"
+        )
+
+    query = db.query(Upload).filter(
+        Upload.id == upload_uuid,
+        Upload.user_id == current_user.id
+    )
+    if for_update:
+        query = query.with_for_update()
+    upload = query.first()
+
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+def _require_image(content_type: str):
+    if not content_type or not content_type.startswith('image/'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be an image"
+        )
+
+def _too_large(e: UploadTooLarge) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=str(e)
+    )
+
+@router.post("/image", response_model=UploadOut, status_code=status.HTTP_201_CREATED)
+def upload_image(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a whole image in one request.
+
+    The file is streamed to disk in chunks. Pass the returned `id` as
+    `upload_id` when creating a project.
+    """
+    _require_image(file.content_type)
+
+    upload_id = uuid.uuid4()
+    try:
+        file_path, sha256, size = save_stream(
+            file.file, f"{upload_id}{safe_extension(file.filename)}"
+        )
+    except UploadTooLarge as e:
+        raise _too_large(e)
+
+    upload = Upload(
+        id=upload_id,
+        user_id=current_user.id,
+        filename=file.filename,
+        content_type=file.content_type,
+        status="completed",
+        bytes_received=size,
+        sha256=sha256,
+        file_path=file_path
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+
+    return _upload_out(upload)
+
+@router.post("/", response_model=UploadOut, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    upload_in: UploadCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a resumable upload.
+
+    Send the file with PUT /uploads/{id} in chunks, then call
+    POST /uploads/{id}/complete.
+    """
+    _require_image(upload_in.content_type)
+
+    upload = Upload(
+        user_id=current_user.id,
+        filename=upload_in.filename,
+        content_type=upload_in.content_type,
+        status="uploading",
+        bytes_received=0
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+
+    return _upload_out(upload)
+
+@router.get("/{upload_id}", response_model=UploadOut)
+def get_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get an upload; `bytes_received` is the offset to resume from"""
+    return _upload_out(_get_user_upload(upload_id, current_user, db))
+
+@router.put("/{upload_id}", response_model=UploadOut)
+def upload_chunk(
+    upload_id: str,
+    offset: int = Form(..., ge=0, description="Byte offset of this chunk"),
+    chunk: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Append a chunk to a resumable upload.
+
+    `offset` must equal the upload's current `bytes_received`; after an
+    interruption, GET the upload and resume from there.
+    """
+    # Locked until the commit below: a second PUT at the same offset waits,
+    # then fails the offset check instead of interleaving writes
+    upload = _get_user_upload(upload_id, current_user, db, for_update=True)
+
+    if upload.status != "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload is already completed"
+        )
+
+    if offset != upload.bytes_received:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Expected offset {upload.bytes_received}"
+        )
+
+    try:
+        upload.bytes_received = append_chunk(upload.id, chunk.file, offset)
+    except UploadTooLarge as e:
+        db.rollback()
+        raise _too_large(e)
+
+    db.commit()
+    db.refresh(upload)
+
+    return _upload_out(upload)
+
+@router.post("/{upload_id}/complete", response_model=UploadOut)
+def complete_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Finish a resumable upload so it can be attached to a project"""
+    upload = _get_user_upload(upload_id, current_user, db, for_update=True)
+
+    if upload.status == "completed":
+        return _upload_out(upload)
+
+    if not upload.bytes_received:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No data has been uploaded"
+        )
+
+    try:
+        upload.file_path, upload.sha256 = finalize_partial(
+            upload.id, f"{upload.id}{safe_extension(upload.filename)}"
+        )
+    except PartialUploadMissing:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The uploaded data is no longer available; start a new upload"
+        )
+    upload.status = "completed"
+    db.commit()
+    db.refresh(upload)
+
+    return _upload_out(upload)
@@ -6,8 +6,95 @@ handling the conversion between backend data structures and agent state.
 """
 
 import os
-from typing import Dict, Any, Optional
+import inspect
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from pathlib import Path
+from app.core.metrics import metrics
+
+metrics.describe("content_generation_requests_total", "counter", "Chat completions sent for content generation")
+metrics.describe("content_generation_products_total", "counter", "Products whose content was generated")
+
+
+class ContentBatcher:
+    """
+    Packs concurrent content generation requests into multi-product calls.
+
+    Each running workflow asks for its content from its own agent pool
+    thread and blocks in submit(). The first request of a batch waits up to
+    `window_seconds` for others; the batch is sent when `max_products`
+    requests are waiting or the window closes, and every caller gets its
+    own product's result. The call is made on one of the waiting callers'
+    threads, so batches stay within AGENT_EXECUTOR_WORKERS. During catalog
+    runs many content stages overlap, so one request (and one copy of the
+    system prompt) serves several products. Only batch workflows use it: a
+    lone interactive request would just wait for the window.
+
+    A batch only holds the batch workflows this process runs at once, so it
+    is at most WORKER_CONCURRENCY products: run catalog workers with
+    WORKER_CONCURRENCY (and BATCH_MAX_RUNNING_WORKFLOWS) at least
+    CONTENT_BATCH_MAX_PRODUCTS, and a window long enough for their content
+    stages to line up (vision and research times vary by a few seconds).
+
+    If the batched call fails, every product is retried on its own, so one
+    bad response does not cost the whole batch its content.
+    """
+
+    def __init__(self, agent, max_products: int, window_seconds: float):
+        self.agent = agent
+        self.max_products = max_products
+        self.window_seconds = window_seconds
+        self._pending: List[Tuple[Dict[str, Any], Dict[str, Any], Future]] = []
+        self._changed = threading.Condition()
+
+    def submit(self, product_data: Dict[str, Any], market_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate content for one product as part of the next batch"""
+        future: Future = Future()
+        batch = None
+        with self._changed:
+            self._pending.append((product_data, market_data, future))
+            if len(self._pending) >= self.max_products:
+                batch = self._take()
+            elif len(self._pending) == 1:
+                # First of a new batch: wait out the window, then send
+                # whatever joined unless a full batch was sent meanwhile
+                deadline = time.monotonic() + self.window_seconds
+                while self._pending and self._pending[0][2] is future:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        batch = self._take()
+                        break
+                    self._changed.wait(remaining)
+        if batch:
+            self._run(batch)
+        return future.result()
+
+    def _take(self):
+        batch, self._pending = self._pending, []
+        self._changed.notify_all()
+        return batch
+
+    def _run(self, batch):
+        metrics.inc("content_generation_requests_total")
+        metrics.inc("content_generation_products_total", len(batch))
+        try:
+            results = self.agent.generate_content_batch([(p, m) for p, m, _ in batch])
+        except Exception as e:
+            print(f"Batched content generation failed for {len(batch)} products ({e}); retrying each on its own")
+            results = [None] * len(batch)
+
+        for (product_data, market_data, future), result in zip(batch, results):
+            if result is None:
+                # Left out of the batched answer (or the batch failed): generate this one alone
+                try:
+                    metrics.inc("content_generation_requests_total")
+                    result = self.agent.generate_content(product_data, market_data)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+            future.set_result(result)
 
 
 class AgentWrapper:
@@ -37,6 +124,17 @@ class AgentWrapper:
                 self.content_agent = ContentWriterAgent()
                 self.image_agent = ImageGeneratorAgent()
                 
+                # Content for up to CONTENT_BATCH_MAX_PRODUCTS overlapping
+                # batch workflows is generated in one call; 1 disables batching.
+                # Only batch workflows wait for the window, so it can be long
+                # enough for their content stages to meet (see ContentBatcher)
+                batch_size = int(os.getenv("CONTENT_BATCH_MAX_PRODUCTS", "4"))
+                self.content_batcher = ContentBatcher(
+                    self.content_agent,
+                    max_products=batch_size,
+                    window_seconds=float(os.getenv("CONTENT_BATCH_WINDOW_SECONDS", "3"))
+                ) if batch_size > 1 else None
+                
                 print("✅ Real agents loaded successfully")
             except Exception as e:
                 print(f"⚠️  Failed to load real agents: {e}")
@@ -109,13 +207,50 @@ class AgentWrapper:
             print(f"Market research error: {e}")
             return self._mock_market_research(product_name)
     
+    async def arun_market_research(
+        self, 
+        product_name: str, 
+        brand_name: str,
+        product_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Async variant of run_market_research.
+        
+        The Brave queries run concurrently and wait on the shared rate
+        limiter instead of holding an agent thread while they sleep.
+        """
+        if self.use_mock:
+            return self._mock_market_research(product_name)
+        
+        try:
+            from app.agents.state import AgentState
+            
+            state = AgentState(
+                messages=[],
+                product_image_path="",
+                product_description="",
+                product_data=product_data,
+                market_data={},
+                generated_images=[],
+                generated_content={},
+                errors=[]
+            )
+            
+            updated_state = await self.research_agent.arun(state)
+            return updated_state.get("market_data", {})
+            
+        except Exception as e:
+            print(f"Market research error: {e}")
+            return self._mock_market_research(product_name)
+    
     def run_content_generation(
         self,
         product_data: Dict[str, Any],
         market_data: Dict[str, Any],
         campaign_goal: Optional[str] = None,
         target_audience: Optional[str] = None,
-        brand_persona: Optional[str] = None
+        brand_persona: Optional[str] = None,
+        batched: bool = False
     ) -> Dict[str, Any]:
         """
         Generate marketing content.
@@ -126,6 +261,7 @@ class AgentWrapper:
             campaign_goal: Campaign objective
             target_audience: Target demographic
             brand_persona: Brand voice/personality
+            batched: Share a request with other batch workflows (ContentBatcher)
             
         Returns:
             Generated content dictionary
@@ -151,12 +287,17 @@ class AgentWrapper:
             )
             
             # Run the agent
-            updated_state = self.content_agent(state)
+            if batched and self.content_batcher is not None and product_data and market_data:
+                generated = self.content_batcher.submit(product_data, market_data)
+                updated_state = self.content_agent.record_content(state, generated)
+            else:
+                updated_state = self.content_agent(state)
             return updated_state.get("generated_content", {})
             
         except Exception as e:
-            print(f"Content generation error: {e}")
-            return self._mock_content_generation(product_data.get("product_name", "Product"))
+            product_name = (product_data or {}).get("product_name", "Product")
+            print(f"Content generation error for '{product_name}': {e}; using mock content")
+            return self._mock_content_generation(product_name)
     
     def run_image_generation(
         self,
@@ -200,6 +341,51 @@ class AgentWrapper:
             print(f"Image generation error: {e}")
             return self._mock_image_generation()
     
+    async def arun_image_generation(
+        self,
+        product_data: Dict[str, Any],
+        market_data: Dict[str, Any],
+        on_image: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of run_image_generation.
+        
+        Images are generated concurrently; `on_image` receives each one as
+        soon as it is ready so callers can persist partial results.
+        """
+        if self.use_mock:
+            output = self._mock_image_generation()
+            if on_image is not None:
+                for image in output["generated_images"]:
+                    outcome = on_image(image)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+            return output
+        
+        try:
+            from app.agents.state import AgentState
+            
+            state = AgentState(
+                messages=[],
+                product_image_path="",
+                product_description="",
+                product_data=product_data,
+                market_data=market_data,
+                generated_images=[],
+                generated_content={},
+                errors=[]
+            )
+            
+            updated_state = await self.image_agent.arun(state, on_image=on_image)
+            return {
+                "generated_images": updated_state.get("generated_images", []),
+                "errors": updated_state.get("errors", [])
+            }
+            
+        except Exception as e:
+            print(f"Image generation error: {e}")
+            return self._mock_image_generation()
+    
     # ============================================
     # MOCK IMPLEMENTATIONS (Fallback)
     # ============================================
@@ -297,10 +483,14 @@ class AgentWrapper:
 
 # Global instance
 _agent_wrapper = None
+_agent_wrapper_lock = threading.Lock()
 
 def get_agent_wrapper() -> AgentWrapper:
     """Get or create the global agent wrapper instance"""
     global _agent_wrapper
     if _agent_wrapper is None:
-        _agent_wrapper = AgentWrapper()
+        # Workflows call this from pool threads; build the agents only once
+        with _agent_wrapper_lock:
+            if _agent_wrapper is None:
+                _agent_wrapper = AgentWrapper()
     return _agent_wrapper
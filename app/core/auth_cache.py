@@ -0,0 +1,166 @@
+"""
+Auth Cache - In-process fast path for bearer token authentication
+
+Verifying a token against the database costs two queries (session lookup
+and user load). Once a token has been verified, a snapshot of its user is
+kept in a bounded LRU keyed by the token's SHA-256, until the token expires
+or AUTH_CACHE_TTL_SECONDS pass (whichever is first), so repeat requests
+need no database work at all.
+
+Logout marks the session revoked in the database. The process that handles
+the logout drops the token at once; other processes pick the revocation up
+from a small revocation list they refresh every AUTH_REVOCATION_POLL_SECONDS.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 hex digest identifying a token without storing it"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The user fields request handlers need"""
+    id: object
+    email: str
+    is_active: bool
+
+
+class AuthCache:
+    """Thread-safe LRU of verified tokens plus a revocation list"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, poll_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # digest -> (snapshot, expires monotonic)
+        self._revoked: Dict[str, float] = {}  # digest -> token expiry (epoch seconds)
+        self._lock = threading.Lock()
+
+        self._poll_lock = threading.Lock()
+        self._last_poll = float("-inf")
+        self._watermark: Optional[datetime] = None  # Latest revoked_at seen
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        """Cached user for a token, or None if unknown, expired or revoked"""
+        digest = token_digest(token)
+        now = time.monotonic()
+        with self._lock:
+            if digest in self._revoked:
+                self._entries.pop(digest, None)
+                return None
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            snapshot, expires = entry
+            if now >= expires:
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return snapshot
+
+    def put(self, token: str, snapshot: UserSnapshot, token_expires_at: float):
+        """Remember a verified token until it expires (epoch seconds) or the TTL passes"""
+        lifetime = min(self.ttl_seconds, token_expires_at - time.time())
+        if lifetime <= 0:
+            return
+        digest = token_digest(token)
+        with self._lock:
+            if digest in self._revoked:
+                return
+            self._entries[digest] = (snapshot, time.monotonic() + lifetime)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, token: str, token_expires_at: float):
+        """Stop accepting a token in this process immediately"""
+        self._add_revoked(token_digest(token), token_expires_at)
+
+    def _add_revoked(self, digest: str, token_expires_at: float):
+        with self._lock:
+            self._revoked[digest] = token_expires_at
+            self._entries.pop(digest, None)
+
+    def refresh_revocations(self, db: Session):
+        """
+        Pull sessions revoked by other processes, at most once per poll interval.
+
+        Cheap to call on every request: it only queries when the interval
+        has passed, and only one thread polls at a time.
+        """
+        if time.monotonic() - self._last_poll < self.poll_seconds:
+            return
+        if not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            from app.db.models import UserSession
+
+            now = datetime.utcnow()
+            query = db.query(
+                UserSession.token_digest, UserSession.expires_at, UserSession.revoked_at
+            ).filter(
+                UserSession.revoked_at.isnot(None),
+                UserSession.expires_at > now
+            )
+            if self._watermark is not None:
+                # Overlap the window so slow commits are not missed
+                query = query.filter(
+                    UserSession.revoked_at > self._watermark - timedelta(seconds=2 * self.poll_seconds)
+                )
+
+            for digest, expires_at, revoked_at in query.all():
+                self._add_revoked(digest, _epoch(expires_at))
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+
+            if self._watermark is None:
+                self._watermark = now
+
+            # Expired tokens are rejected anyway; forget them
+            cutoff = time.time()
+            with self._lock:
+                for digest in [d for d, exp in self._revoked.items() if exp <= cutoff]:
+                    del self._revoked[digest]
+
+            self._last_poll = time.monotonic()
+        finally:
+            self._poll_lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _epoch(naive_utc: datetime) -> float:
+    """Epoch seconds for a naive UTC datetime as stored in the database"""
+    return (naive_utc - datetime(1970, 1, 1)).total_seconds()
+
+
+# Global instance
+_auth_cache = None
+_auth_cache_lock = threading.Lock()
+
+def get_auth_cache() -> AuthCache:
+    """Get or create the global auth cache"""
+    global _auth_cache
+    if _auth_cache is None:
+        with _auth_cache_lock:
+            if _auth_cache is None:
+                _auth_cache = AuthCache(
+                    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+                    poll_seconds=settings.AUTH_REVOCATION_POLL_SECONDS
+                )
+    return _auth_cache
@@ -0,0 +1,221 @@
+"""
+Workflow Events - Push channel for pipeline progress
+
+Workflows run in worker processes, while clients watch them through the API
+server (GET /jobs/project/{project_id}/events, a server-sent events stream).
+Events travel between the two through PostgreSQL NOTIFY:
+
+    orchestrator --pg_notify--> PostgreSQL --LISTEN--> API process
+                                                        |
+                                            EventBroker fan-out
+                                                        |
+                                                SSE subscribers
+
+Each API process holds a single LISTEN connection however many clients
+are watching, so status updates cost no queries per client. NOTIFY is
+transactional: an event is delivered when the transaction that changed the
+job commits, never before.
+
+On other databases (SQLite in development) there is no cross-process
+channel: events are published in-process only, which covers workflows run
+by the API process itself.
+
+Events are progress hints, never the record: a failure to publish one is
+logged and otherwise ignored, and can never roll back the job update it
+describes. Clients that miss an event catch up from the status endpoint.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import metrics
+
+CHANNEL = "workflow_events"
+
+# NOTIFY payloads are limited to 8000 bytes. Larger events lose their
+# structured fields (clients fetch the output from /jobs/{job_id}) and have
+# long strings such as error tracebacks cut short
+MAX_PAYLOAD_BYTES = 7500
+MAX_TRUNCATED_STRING_CHARS = 1000
+
+# Kept in every event, however large the rest
+_IDENTITY_FIELDS = ("type", "project_id", "job_id", "stage", "status")
+
+metrics.describe("workflow_event_subscribers", "gauge", "Open workflow event streams")
+metrics.describe("workflow_events_dropped_total", "counter", "Events dropped for subscribers that fell behind")
+metrics.describe("workflow_events_publish_errors_total", "counter", "Events that could not be published")
+
+
+class EventBroker:
+    """
+    In-process fan-out of workflow events to per-project subscriber queues.
+
+    Subscribers live on the event loop; publish may be called from any
+    thread (e.g. the DB thread pool) and hands the event to the loop.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.setdefault(project_id, set()).add(queue)
+        metrics.inc("workflow_event_subscribers")
+        return queue
+
+    def unsubscribe(self, project_id: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(project_id)
+            if queues and queue in queues:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[project_id]
+                metrics.inc("workflow_event_subscribers", -1)
+
+    def publish(self, event: Dict[str, Any]):
+        """Deliver an event to the subscribers of its project"""
+        with self._lock:
+            loop = self._loop
+            if loop is None or event.get("project_id") not in self._subscribers:
+                return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(event)
+        else:
+            loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict[str, Any]):
+        with self._lock:
+            queues = list(self._subscribers.get(event["project_id"], ()))
+        for queue in queues:
+            if queue.full():
+                # A slow client loses its oldest event rather than holding
+                # memory or delaying everyone else
+                queue.get_nowait()
+                metrics.inc("workflow_events_dropped_total")
+            queue.put_nowait(event)
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_event_broker() -> EventBroker:
+    global _broker
+    if _broker is None:
+        _broker = EventBroker()
+    return _broker
+
+
+def _fits(payload: str) -> bool:
+    return len(payload.encode()) <= MAX_PAYLOAD_BYTES
+
+
+def _encode(event: Dict[str, Any]) -> str:
+    """
+    JSON payload for an event, at most MAX_PAYLOAD_BYTES long.
+
+    Oversized events keep their scalar fields (strings cut to
+    MAX_TRUNCATED_STRING_CHARS) and drop the rest, e.g. output; if that is
+    still too large, only the identity fields are sent. Either way the
+    event carries truncated=true.
+    """
+    payload = json.dumps(event, default=str)
+    if _fits(payload):
+        return payload
+
+    trimmed = {}
+    for key, value in event.items():
+        if isinstance(value, str):
+            trimmed[key] = value[:MAX_TRUNCATED_STRING_CHARS]
+        elif value is None or isinstance(value, (bool, int, float)):
+            trimmed[key] = value
+    trimmed["truncated"] = True
+    payload = json.dumps(trimmed, default=str)
+    if _fits(payload):
+        return payload
+
+    identity = {key: str(event[key])[:200] for key in _IDENTITY_FIELDS if event.get(key) is not None}
+    return json.dumps(dict(identity, truncated=True))
+
+
+def publish_event(db: Session, event: Dict[str, Any]):
+    """
+    Publish a workflow event as part of the session's current transaction.
+
+    The caller commits; on PostgreSQL the event is delivered on commit. The
+    NOTIFY runs in a savepoint, so if it fails only the event is lost: the
+    caller's changes still commit.
+    """
+    event = dict(event, project_id=str(event["project_id"]))
+    postgresql = db.get_bind().dialect.name == "postgresql"
+    if postgresql:
+        # Flush outside the savepoint and the try: errors in the caller's own
+        # changes must still reach the caller
+        db.flush()
+    try:
+        if postgresql:
+            with db.begin_nested():
+                db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": _encode(event)})
+        else:
+            get_event_broker().publish(event)
+    except Exception as e:
+        metrics.inc("workflow_events_publish_errors_total")
+        print(f"Could not publish workflow event for project {event['project_id']}: {e}")
+
+
+def _listen_dsn() -> str:
+    # asyncpg takes a plain postgresql:// URL, without the SQLAlchemy driver
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def run_event_listener(retry_seconds: float = 5.0):
+    """
+    LISTEN for workflow events and feed them to the broker until cancelled.
+
+    Uses its own connection (outside the pool) and reconnects if it drops.
+    Does nothing unless the database is PostgreSQL.
+    """
+    if make_url(settings.DATABASE_URL).get_backend_name() != "postgresql":
+        return
+
+    import asyncpg
+
+    broker = get_event_broker()
+
+    def on_notify(connection, pid, channel, payload):
+        try:
+            broker.publish(json.loads(payload))
+        except ValueError:
+            print(f"Ignoring malformed workflow event: {payload[:200]}")
+
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(_listen_dsn())
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda c: closed.set())
+            await conn.add_listener(CHANNEL, on_notify)
+            await closed.wait()
+            print("Workflow event listener: connection lost, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Workflow event listener error: {e}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(retry_seconds)
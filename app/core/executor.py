@@ -0,0 +1,64 @@
+"""
+Executors - Bounded thread pools for blocking calls made from async code
+
+The agents use synchronous SDKs (OpenAI, Brave, Bytez) and the orchestrator
+uses a synchronous SQLAlchemy session. Calling either directly inside a
+coroutine freezes the whole event loop, so both go through these pools.
+Agent and database work get separate pools so that slow API calls can never
+starve the short database calls that record their results.
+
+Password hashing is CPU-bound, so it gets a small process pool of its own
+and never competes with request threads for the GIL.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable
+from app.core.config import settings
+
+_agent_executor = None
+_db_executor = None
+_password_executor = None
+
+
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Get or create the pool used for external agent API calls"""
+    global _agent_executor
+    if _agent_executor is None:
+        _agent_executor = ThreadPoolExecutor(
+            max_workers=settings.AGENT_EXECUTOR_WORKERS,
+            thread_name_prefix="agent"
+        )
+    return _agent_executor
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Get or create the pool used for synchronous database work"""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=settings.DB_EXECUTOR_WORKERS,
+            thread_name_prefix="db"
+        )
+    return _db_executor
+
+
+def get_password_executor() -> ProcessPoolExecutor:
+    """Get or create the process pool used for bcrypt hashing"""
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _password_executor
+
+
+async def run_agent_call(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await a blocking agent call without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_agent_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_db_call(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await a blocking database call without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
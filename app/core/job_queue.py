@@ -0,0 +1,232 @@
+"""
+Job Queue - Durable workflow queue backed by the jobs table
+
+The API only enqueues a WORKFLOW job row and returns. Worker processes
+(see app/worker.py) claim queued rows with SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of workers on any number of machines can share the queue
+without two of them picking up the same workflow.
+
+While a workflow runs, its worker refreshes the job's heartbeat_at every
+JOB_HEARTBEAT_INTERVAL_SECONDS. A running job whose heartbeat stops for
+JOB_STALE_AFTER_MINUTES belonged to a worker that died, and is queued again.
+
+Workflows queued by bulk imports (POST /batches) have their own job type.
+Workers take them only when no interactive workflow is waiting, and only
+while fewer than BATCH_MAX_RUNNING_WORKFLOWS of them run across all
+workers, so a catalog import neither starves users nor floods the agent
+APIs.
+"""
+
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, insert, or_, text, update
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.events import publish_event
+from app.db.models import Project, Job
+
+WORKFLOW_JOB_TYPE = "WORKFLOW"
+BATCH_WORKFLOW_JOB_TYPE = "BATCH_WORKFLOW"
+WORKFLOW_JOB_TYPES = (WORKFLOW_JOB_TYPE, BATCH_WORKFLOW_JOB_TYPE)
+
+# Error recorded on the stages of a workflow whose worker died
+WORKER_LOST_ERROR = "worker lost"
+
+# pg_advisory_xact_lock key serializing batch claims across workers
+_BATCH_CLAIM_LOCK = 0x42415443
+
+
+def _new_workflow_job(project: Project, options: Optional[Dict[str, Any]], job_type: str) -> Job:
+    project.status = "queued"
+    return Job(
+        project_id=project.id,
+        job_type=job_type,
+        status="queued",
+        input_payload={"project_id": str(project.id), **(options or {})}
+    )
+
+
+def enqueue_workflow(
+    db: Session,
+    project: Project,
+    options: Optional[Dict[str, Any]] = None,
+    job_type: str = WORKFLOW_JOB_TYPE
+) -> Job:
+    """
+    Queue the agent workflow for a project.
+
+    The caller must have loaded the project FOR UPDATE before checking its
+    status, so two concurrent requests cannot both queue a workflow; the
+    commit here releases that lock.
+
+    Args:
+        db: Database session
+        project: Project to process
+        options: Extra settings handed to the worker with the job
+            (force, retry_job_id; see AgentOrchestrator.start_workflow)
+        job_type: WORKFLOW, or BATCH_WORKFLOW to run under the batch limit
+
+    Returns:
+        The queued workflow job
+    """
+    job = _new_workflow_job(project, options, job_type)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+async def enqueue_workflow_async(
+    db: AsyncSession,
+    project: Project,
+    options: Optional[Dict[str, Any]] = None,
+    job_type: str = WORKFLOW_JOB_TYPE
+) -> Job:
+    """enqueue_workflow for async endpoints"""
+    job = _new_workflow_job(project, options, job_type)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+def add_batch_workflows(db: Session, project_ids: List, batch_id) -> None:
+    """
+    Queue workflows for a batch's projects in one INSERT (no commit).
+
+    The projects must already be flushed with status "queued".
+    """
+    if not project_ids:
+        return
+    db.execute(insert(Job), [
+        {
+            "project_id": project_id,
+            "job_type": BATCH_WORKFLOW_JOB_TYPE,
+            "status": "queued",
+            "input_payload": {"project_id": str(project_id), "batch_id": str(batch_id)},
+        }
+        for project_id in project_ids
+    ])
+
+
+def _lock_next(db: Session, job_type: str) -> Optional[Job]:
+    return db.query(Job).filter(
+        Job.job_type == job_type,
+        Job.status == "queued"
+    ).order_by(Job.created_at).with_for_update(skip_locked=True).first()
+
+
+def _batch_slot_free(db: Session) -> bool:
+    if db.get_bind().dialect.name == "postgresql":
+        # Held until commit: workers check and claim batch slots one at a time
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _BATCH_CLAIM_LOCK})
+    running = db.query(func.count(Job.id)).filter(
+        Job.job_type == BATCH_WORKFLOW_JOB_TYPE,
+        Job.status == "running"
+    ).scalar()
+    return running < settings.BATCH_MAX_RUNNING_WORKFLOWS
+
+
+def claim_next_job(db: Session) -> Optional[Job]:
+    """
+    Claim the oldest queued workflow, skipping rows other workers hold.
+
+    Interactive workflows come first; batch workflows are claimed only
+    when a batch slot is free.
+
+    Returns:
+        The claimed job (now "running"), or None if the queue is empty
+    """
+    job = _lock_next(db, WORKFLOW_JOB_TYPE)
+    if not job and _batch_slot_free(db):
+        job = _lock_next(db, BATCH_WORKFLOW_JOB_TYPE)
+
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.started_at = job.heartbeat_at = datetime.utcnow()
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def finish_job(db: Session, job: Job, result: Dict[str, Any]) -> None:
+    """Record the orchestrator result on a claimed workflow job"""
+    succeeded = result.get("status") == "success"
+    job.status = "completed" if succeeded else "failed"
+    job.output_payload = result
+    job.error_message = None if succeeded else result.get("error") or result.get("message")
+    job.completed_at = datetime.utcnow()
+    db.commit()
+
+
+def heartbeat_jobs(db: Session, job_ids: List) -> None:
+    """Mark the given running workflows as alive (one UPDATE for all of them)"""
+    if not job_ids:
+        return
+    db.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.status == "running")
+        .values(heartbeat_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def requeue_stale_jobs(db: Session, stale_after: timedelta) -> int:
+    """
+    Put workflows back on the queue when their worker stopped reporting.
+
+    A worker that crashes mid-run leaves its job "running" forever; a job
+    whose heartbeat is older than `stale_after` is assumed lost and queued
+    again. However long a workflow runs, its heartbeat stays fresh as long
+    as its worker is alive.
+
+    The stages the lost run had in progress are failed in the same
+    transaction, so they do not stay "running" and can be retried.
+
+    Returns:
+        Number of jobs requeued
+    """
+    cutoff = datetime.utcnow() - stale_after
+    stale = db.query(Job).filter(
+        Job.job_type.in_(WORKFLOW_JOB_TYPES),
+        Job.status == "running",
+        or_(
+            Job.heartbeat_at < cutoff,
+            # Claimed before heartbeats existed
+            and_(Job.heartbeat_at.is_(None), Job.started_at < cutoff)
+        )
+    ).with_for_update(skip_locked=True).all()
+    if not stale:
+        db.rollback()
+        return 0
+
+    now = datetime.utcnow()
+    lost_stages = db.query(Job).filter(
+        Job.project_id.in_({job.project_id for job in stale}),
+        Job.job_type.notin_(WORKFLOW_JOB_TYPES),
+        Job.status == "running"
+    ).all()
+    for job in lost_stages:
+        job.status = "failed"
+        job.error_message = WORKER_LOST_ERROR
+        job.completed_at = now
+        publish_event(db, {
+            "type": "job",
+            "project_id": job.project_id,
+            "job_id": str(job.id),
+            "stage": job.job_type,
+            "status": job.status,
+            "error": job.error_message
+        })
+
+    for job in stale:
+        job.status = "queued"
+        job.started_at = None
+        job.heartbeat_at = None
+    db.commit()
+    return len(stale)
@@ -0,0 +1,54 @@
+"""
+Metrics - Minimal in-process counters and gauges
+
+Values are exposed in the Prometheus text format at GET /metrics. Each
+process (API server, workers) reports its own values; aggregate them in
+the scraper.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+
+class MetricsRegistry:
+    """Thread-safe store of named counters and gauges"""
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+        self._meta: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        """Register a metric's type ("counter" or "gauge") and help text"""
+        with self._lock:
+            self._meta[name] = (metric_type, help_text)
+            self._values.setdefault(name, 0.0)
+
+    def inc(self, name: str, amount: float = 1.0):
+        """Add to a counter (or gauge)"""
+        with self._lock:
+            self._values[name] = self._values.get(name, 0.0) + amount
+
+    def set(self, name: str, value: float):
+        """Set a gauge"""
+        with self._lock:
+            self._values[name] = float(value)
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._values.get(name, 0.0)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            for name in sorted(self._values):
+                metric_type, help_text = self._meta.get(name, ("untyped", ""))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {self._values[name]:g}")
+            return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
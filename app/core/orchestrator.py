@@ -10,114 +10,368 @@ This orchestrator integrates with your existing LangGraph agents:
 It manages job creation, execution, and result storage.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db.models import Project, Job, Asset
 import uuid
 import json
+import hashlib
 import asyncio
+from app.core.events import publish_event
+from app.core.executor import run_agent_call, run_db_call
+from app.utils.blob_store import store_remote, blob_url
+
+
+# Pipeline DAG: each stage names the stages whose output it consumes.
+# A stage starts as soon as all of its dependencies have completed, so
+# independent stages run concurrently and a workflow takes roughly as long
+# as its critical path. Stages with a condition are skipped when it is false;
+# failures of non-required stages do not fail the workflow.
+#
+# "inputs" lists the project fields a stage reads. Together with the jobs of
+# its dependencies they make up the stage's fingerprint: when a completed
+# job with the same fingerprint exists, its output is reused instead of
+# running the agent again (see AgentOrchestrator._run_stages).
+WORKFLOW_STAGES: Dict[str, Dict[str, Any]] = {
+    "VISION_ANALYSIS": {
+        "runner": "_run_vision_analysis",
+        "label": "Vision analysis",
+        "depends_on": [],
+        "required": True,
+        "inputs": lambda project: {
+            "image_path": project.image_path,
+            "product_name": project.product_name,
+            "description": project.description,
+        },
+    },
+    "MARKET_RESEARCH": {
+        "runner": "_run_market_research",
+        "label": "Market research",
+        "depends_on": [],  # Only needs the product name
+        "required": True,
+        "inputs": lambda project: {
+            "product_name": project.product_name,
+            "brand_name": project.brand_name,
+        },
+    },
+    "CONTENT_GENERATION": {
+        "runner": "_run_content_generation",
+        "label": "Content generation",
+        "depends_on": ["VISION_ANALYSIS", "MARKET_RESEARCH"],
+        "required": True,
+        "inputs": lambda project: {
+            "campaign_goal": project.campaign_goal,
+            "target_audience": project.target_audience,
+            "brand_persona": project.brand_persona,
+        },
+    },
+    "IMAGE_GENERATION": {
+        "runner": "_run_image_generation",
+        "label": "Image generation",
+        "depends_on": ["VISION_ANALYSIS"],
+        "required": False,
+        "condition": lambda project: bool(project.image_path),  # Needs a base image
+        "inputs": lambda project: {},
+    },
+}
+
+def stage_applies(stage: str, project: Project) -> bool:
+    """Whether a stage runs for this project (its condition, if any, holds)"""
+    return WORKFLOW_STAGES[stage].get("condition", lambda project: True)(project)
+
+
+# Bump to invalidate every stored fingerprint (e.g. after changing prompts)
+FINGERPRINT_VERSION = 1
+
+
+def stage_fingerprint(stage: str, inputs: Dict[str, Any], upstream: Dict[str, Job]) -> str:
+    """
+    SHA-256 over a stage's own inputs and the jobs it consumes.
+
+    Upstream jobs are identified by ID: a reused upstream job keeps its ID,
+    so the fingerprint only changes when something upstream actually re-ran.
+    """
+    material = {
+        "stage": stage,
+        "version": FINGERPRINT_VERSION,
+        "inputs": inputs,
+        "upstream": {name: str(job.id) for name, job in upstream.items()},
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode()).hexdigest()
 
 
 class AgentOrchestrator:
     """
     Orchestrates the multi-agent marketing content generation pipeline.
     
-    Workflow:
+    Workflow (see WORKFLOW_STAGES for the dependency graph):
     1. VISION_ANALYSIS - Analyze product image
-    2. MARKET_RESEARCH - Research market and competitors
-    3. CONTENT_GENERATION - Generate platform-specific content
-    4. IMAGE_GENERATION - Create marketing images (optional)
+    2. MARKET_RESEARCH - Research market and competitors (parallel with 1)
+    3. CONTENT_GENERATION - Generate platform-specific content (after 1 and 2)
+    4. IMAGE_GENERATION - Create marketing images (optional, after 1)
+    
+    Agent calls and database work are blocking, so the async steps hand them
+    to bounded thread pools (app/core/executor.py) and the event loop stays
+    free to serve other requests and workflows while a pipeline runs.
     """
     
     def __init__(self, db: Session):
         self.db = db
+        # Job and project fields are read on the event loop after commits made
+        # in the DB pool; expiring them would trigger lazy loads on the loop.
+        self.db.expire_on_commit = False
+        # The session is not thread-safe: one DB call at a time per workflow
+        self._db_lock = asyncio.Lock()
+        # Failed stage job being retried; its stage re-runs in this row
+        self._retry_job: Optional[Job] = None
+        # Part of a catalog import: content generation may be batched
+        self._batched = False
+    
+    async def _db(self, fn, *args, **kwargs):
+        """Run blocking session work in the DB pool, one call at a time"""
+        async with self._db_lock:
+            return await run_db_call(fn, *args, **kwargs)
+    
+    def _set_project_status(self, project: Project, status: str):
+        project.status = status
+        publish_event(self.db, {"type": "project", "project_id": project.id, "status": status})
+        self.db.commit()
+    
+    def _publish_job(self, job: Job, **extra):
+        """Publish a job's current state (delivered when the caller commits)"""
+        publish_event(self.db, {
+            "type": "job",
+            "project_id": job.project_id,
+            "job_id": str(job.id),
+            "stage": job.job_type,
+            "status": job.status,
+            **extra
+        })
     
-    async def start_workflow(self, project_id: uuid.UUID) -> Dict[str, Any]:
+    def _create_job(
+        self,
+        project: Project,
+        job_type: str,
+        input_payload: Dict[str, Any],
+        fingerprint: Optional[str] = None
+    ) -> Job:
+        retry_job = self._retry_job
+        if retry_job is not None and retry_job.job_type == job_type:
+            # Retry in place, so clients polling the failed job see it run
+            retry_job.status = "running"
+            retry_job.input_payload = dict(input_payload, fingerprint=fingerprint)
+            retry_job.output_payload = None
+            retry_job.error_message = None
+            retry_job.started_at = datetime.utcnow()
+            retry_job.completed_at = None
+            self._publish_job(retry_job)
+            self.db.commit()
+            return retry_job
+        
+        job = Job(
+            project_id=project.id,
+            job_type=job_type,
+            status="running",
+            input_payload=dict(input_payload, fingerprint=fingerprint),
+            started_at=datetime.utcnow()
+        )
+        self.db.add(job)
+        self.db.flush()
+        self._publish_job(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+    
+    def _finish_job(
+        self,
+        job: Job,
+        output: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        if error is None:
+            job.output_payload = output
+            job.status = "completed"
+        else:
+            job.status = "failed"
+            job.error_message = error
+        job.completed_at = datetime.utcnow()
+        self._publish_job(job, output=output, error=error)
+        self.db.commit()
+    
+    def _publish_reused_job(self, job: Job):
+        self._publish_job(job, reused=True)
+        self.db.commit()
+    
+    def _find_reusable_job(self, project: Project, job_type: str, fingerprint: str) -> Optional[Job]:
+        """Latest completed job of this type whose inputs had the same fingerprint"""
+        return self.db.query(Job).filter(
+            Job.project_id == project.id,
+            Job.job_type == job_type,
+            Job.status == "completed",
+            Job.input_payload["fingerprint"].astext == fingerprint
+        ).order_by(Job.created_at.desc()).first()
+    
+    async def start_workflow(
+        self,
+        project_id: uuid.UUID,
+        force: bool = False,
+        retry_job_id: Optional[uuid.UUID] = None,
+        batched: bool = False
+    ) -> Dict[str, Any]:
         """
         Start the complete agent workflow for a project.
         
+        Stages whose inputs did not change since a completed run are not
+        executed again; their previous job is reused.
+        
         Args:
             project_id: UUID of the project to process
+            force: Re-run every stage even when a previous result matches
+            retry_job_id: Failed stage job to run again (in the same row).
+                Upstream stages are reused from their completed jobs, and
+                the stages after it run as usual.
+            batched: The workflow belongs to a batch import; its content is
+                generated together with other batch workflows
             
         Returns:
             Dict with workflow status and job IDs
         """
-        project = self.db.query(Project).filter(Project.id == project_id).first()
+        project = await self._db(
+            lambda: self.db.query(Project).filter(Project.id == project_id).first()
+        )
         
         if not project:
             return {"status": "error", "message": "Project not found"}
         
+        self._batched = batched
+        if retry_job_id:
+            self._retry_job = await self._db(
+                lambda: self.db.query(Job).filter(
+                    Job.id == retry_job_id,
+                    Job.project_id == project_id
+                ).first()
+            )
+            if not self._retry_job or self._retry_job.job_type not in WORKFLOW_STAGES:
+                return {"status": "error", "message": "Job to retry not found"}
+            if not stage_applies(self._retry_job.job_type, project):
+                # The stage would be skipped: report it rather than "success"
+                return {
+                    "status": "error",
+                    "message": f"{WORKFLOW_STAGES[self._retry_job.job_type]['label']} does not apply to this project"
+                }
+        
         # Update project status
-        project.status = "processing"
-        self.db.commit()
+        await self._db(self._set_project_status, project, "processing")
         
         try:
-            # Step 1: Vision Analysis
-            vision_job = await self._run_vision_analysis(project)
+            retry_stage = self._retry_job.job_type if self._retry_job else None
+            jobs, reused, failed_stage = await self._run_stages(project, force, retry_stage)
             
-            if vision_job.status == "failed":
-                project.status = "failed"
-                self.db.commit()
+            if failed_stage:
+                await self._db(self._set_project_status, project, "failed")
                 return {
                     "status": "failed",
-                    "message": "Vision analysis failed",
-                    "error": vision_job.error_message
+                    "message": f"{WORKFLOW_STAGES[failed_stage]['label']} failed",
+                    "error": jobs[failed_stage].error_message
                 }
             
-            # Step 2: Market Research
-            research_job = await self._run_market_research(project, vision_job)
-            
-            if research_job.status == "failed":
-                project.status = "failed"
-                self.db.commit()
-                return {
-                    "status": "failed",
-                    "message": "Market research failed",
-                    "error": research_job.error_message
-                }
-            
-            # Step 3: Content Generation
-            content_job = await self._run_content_generation(project, vision_job, research_job)
-            
-            if content_job.status == "failed":
-                project.status = "failed"
-                self.db.commit()
-                return {
-                    "status": "failed",
-                    "message": "Content generation failed",
-                    "error": content_job.error_message
-                }
-            
-            # Step 4: Image Generation (optional)
-            image_job = None
-            if project.image_path:  # Only if we have a base image
-                image_job = await self._run_image_generation(project, vision_job, research_job)
-            
             # Update project status
-            project.status = "completed"
-            self.db.commit()
+            await self._db(self._set_project_status, project, "completed")
             
             return {
                 "status": "success",
                 "message": "Workflow completed successfully",
                 "jobs": {
-                    "vision_analysis": str(vision_job.id),
-                    "market_research": str(research_job.id),
-                    "content_generation": str(content_job.id),
-                    "image_generation": str(image_job.id) if image_job else None
-                }
+                    stage.lower(): str(jobs[stage].id) if stage in jobs else None
+                    for stage in WORKFLOW_STAGES
+                },
+                "reused": [stage.lower() for stage in reused]
             }
             
         except Exception as e:
-            project.status = "failed"
-            self.db.commit()
+            await self._db(self.db.rollback)
+            await self._db(self._set_project_status, project, "failed")
             return {
                 "status": "error",
                 "message": f"Workflow failed: {str(e)}"
             }
     
-    async def _run_vision_analysis(self, project: Project) -> Job:
+    async def _run_stages(
+        self,
+        project: Project,
+        force: bool = False,
+        retry_stage: Optional[str] = None
+    ) -> Tuple[Dict[str, Job], List[str], Optional[str]]:
+        """
+        Run the WORKFLOW_STAGES graph, starting every stage whose dependencies
+        have completed.
+        
+        A stage whose fingerprint matches a completed job is not run: that
+        job stands in for it (unless `force`), and because its ID is part of
+        the downstream fingerprints, the stages after it can be reused too.
+        `retry_stage` is always run.
+        
+        Once a required stage fails no new stages are started; stages already
+        running are allowed to finish so their jobs are recorded.
+        
+        Returns:
+            (finished jobs by stage name, names of reused stages,
+             name of the failed required stage or None)
+        """
+        stages = {
+            name: spec for name, spec in WORKFLOW_STAGES.items()
+            if stage_applies(name, project)
+        }
+        finished: Dict[str, Job] = {}
+        reused: List[str] = []
+        running: Dict[asyncio.Task, str] = {}
+        failed_stage = None
+        
+        while True:
+            progressed = False
+            if failed_stage is None:
+                for name, spec in stages.items():
+                    if name in finished or name in running.values():
+                        continue
+                    deps = spec["depends_on"]
+                    if all(dep in finished and finished[dep].status == "completed" for dep in deps):
+                        upstream = {dep: finished[dep] for dep in deps}
+                        fingerprint = stage_fingerprint(name, spec["inputs"](project), upstream)
+                        previous = None if force or name == retry_stage else await self._db(
+                            self._find_reusable_job, project, name, fingerprint
+                        )
+                        if previous:
+                            await self._db(self._publish_reused_job, previous)
+                            finished[name] = previous
+                            reused.append(name)
+                            progressed = True
+                            continue
+                        runner = getattr(self, spec["runner"])
+                        running[asyncio.create_task(runner(project, upstream, fingerprint))] = name
+            
+            if progressed:
+                # Reused stages may have unblocked others: schedule again
+                continue
+            if not running:
+                break
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                job = task.result()
+                finished[name] = job
+                if job.status == "failed" and stages[name]["required"] and failed_stage is None:
+                    failed_stage = name
+        
+        return finished, reused, failed_stage
+    
+    async def _run_vision_analysis(
+        self,
+        project: Project,
+        upstream: Dict[str, Job],
+        fingerprint: Optional[str] = None
+    ) -> Job:
         """
         Run Vision Analysis Agent
         
@@ -127,47 +381,37 @@ class AgentOrchestrator:
         - Target demographic
         - Key selling points
         """
-        job = Job(
-            project_id=project.id,
-            job_type="VISION_ANALYSIS",
-            status="running",
-            input_payload={
-                "image_path": project.image_path,
-                "product_name": project.product_name,
-                "description": project.description
-            },
-            started_at=datetime.utcnow()
-        )
-        self.db.add(job)
-        self.db.commit()
-        self.db.refresh(job)
+        job = await self._db(self._create_job, project, "VISION_ANALYSIS", {
+            "image_path": project.image_path,
+            "product_name": project.product_name,
+            "description": project.description
+        }, fingerprint)
         
         try:
             # Use real agent via wrapper
             from app.core.agent_wrapper import get_agent_wrapper
-            agent_wrapper = get_agent_wrapper()
+            agent_wrapper = await run_agent_call(get_agent_wrapper)
             
-            output = agent_wrapper.run_vision_analysis(
+            output = await run_agent_call(
+                agent_wrapper.run_vision_analysis,
                 image_path=project.image_path or "",
                 product_name=project.product_name,
                 description=project.description or ""
             )
             
-            job.output_payload = output
-            job.status = "completed"
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
-            
+            await self._db(self._finish_job, job, output=output)
             return job
             
         except Exception as e:
-            job.status = "failed"
-            job.error_message = str(e)
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self._db(self._finish_job, job, error=str(e))
             return job
     
-    async def _run_market_research(self, project: Project, vision_job: Job) -> Job:
+    async def _run_market_research(
+        self,
+        project: Project,
+        upstream: Dict[str, Job],
+        fingerprint: Optional[str] = None
+    ) -> Job:
         """
         Run Market Research Agent
         
@@ -177,51 +421,37 @@ class AgentOrchestrator:
         - Customer reviews and pain points
         - Pricing strategies
         """
-        job = Job(
-            project_id=project.id,
-            job_type="MARKET_RESEARCH",
-            status="running",
-            input_payload={
-                "product_name": project.product_name,
-                "brand_name": project.brand_name,
-                "vision_data": vision_job.output_payload
-            },
-            started_at=datetime.utcnow()
-        )
-        self.db.add(job)
-        self.db.commit()
-        self.db.refresh(job)
+        # Research only needs the product name, so it runs alongside vision
+        product_data = {"product_name": project.product_name}
+        job = await self._db(self._create_job, project, "MARKET_RESEARCH", {
+            "product_name": project.product_name,
+            "brand_name": project.brand_name
+        }, fingerprint)
         
         try:
             # Use real agent via wrapper
             from app.core.agent_wrapper import get_agent_wrapper
-            agent_wrapper = get_agent_wrapper()
+            agent_wrapper = await run_agent_call(get_agent_wrapper)
             
-            output = agent_wrapper.run_market_research(
+            # Async path: the searches wait on the rate limiter, not a thread
+            output = await agent_wrapper.arun_market_research(
                 product_name=project.product_name,
                 brand_name=project.brand_name or "",
-                product_data=vision_job.output_payload
+                product_data=product_data
             )
             
-            job.output_payload = output
-            job.status = "completed"
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
-            
+            await self._db(self._finish_job, job, output=output)
             return job
             
         except Exception as e:
-            job.status = "failed"
-            job.error_message = str(e)
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self._db(self._finish_job, job, error=str(e))
             return job
     
     async def _run_content_generation(
-        self, 
-        project: Project, 
-        vision_job: Job, 
-        research_job: Job
+        self,
+        project: Project,
+        upstream: Dict[str, Job],
+        fingerprint: Optional[str] = None
     ) -> Job:
         """
         Run Content Writer Agent
@@ -232,110 +462,142 @@ class AgentOrchestrator:
         - Blog posts for Medium
         - Ad copy
         """
-        job = Job(
-            project_id=project.id,
-            job_type="CONTENT_GENERATION",
-            status="running",
-            input_payload={
-                "product_data": vision_job.output_payload,
-                "market_data": research_job.output_payload,
-                "campaign_goal": project.campaign_goal,
-                "target_audience": project.target_audience,
-                "brand_persona": project.brand_persona
-            },
-            started_at=datetime.utcnow()
-        )
-        self.db.add(job)
-        self.db.commit()
-        self.db.refresh(job)
+        vision_job = upstream["VISION_ANALYSIS"]
+        research_job = upstream["MARKET_RESEARCH"]
+        job = await self._db(self._create_job, project, "CONTENT_GENERATION", {
+            "product_data": vision_job.output_payload,
+            "market_data": research_job.output_payload,
+            "campaign_goal": project.campaign_goal,
+            "target_audience": project.target_audience,
+            "brand_persona": project.brand_persona
+        }, fingerprint)
         
         try:
             # Use real agent via wrapper
             from app.core.agent_wrapper import get_agent_wrapper
-            agent_wrapper = get_agent_wrapper()
+            agent_wrapper = await run_agent_call(get_agent_wrapper)
             
-            generated_content = agent_wrapper.run_content_generation(
+            generated_content = await run_agent_call(
+                agent_wrapper.run_content_generation,
                 product_data=vision_job.output_payload,
                 market_data=research_job.output_payload,
                 campaign_goal=project.campaign_goal,
                 target_audience=project.target_audience,
-                brand_persona=project.brand_persona
+                brand_persona=project.brand_persona,
+                batched=self._batched
             )
             
-            job.output_payload = generated_content
-            job.status = "completed"
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self._db(self._finish_job, job, output=generated_content)
             
             # Create assets from generated content
-            await self._create_assets_from_content(project.id, generated_content)
+            await self._db(self._create_assets_from_content, project.id, generated_content)
             
             return job
             
         except Exception as e:
-            job.status = "failed"
-            job.error_message = str(e)
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self._db(self._finish_job, job, error=str(e))
             return job
     
     async def _run_image_generation(
-        self, 
-        project: Project, 
-        vision_job: Job, 
-        research_job: Job
+        self,
+        project: Project,
+        upstream: Dict[str, Job],
+        fingerprint: Optional[str] = None
     ) -> Job:
         """
         Run Image Generator Agent (Optional)
         
-        This agent generates marketing images using DALL-E
+        This agent generates marketing images with Bytez. Each image is
+        copied into the local blob store and recorded as an `image` Asset
+        as soon as it finishes; the job's output lists the images so far.
         """
-        job = Job(
-            project_id=project.id,
-            job_type="IMAGE_GENERATION",
-            status="running",
-            input_payload={
-                "product_data": vision_job.output_payload,
-                "market_data": research_job.output_payload
-            },
-            started_at=datetime.utcnow()
-        )
-        self.db.add(job)
-        self.db.commit()
-        self.db.refresh(job)
+        vision_job = upstream["VISION_ANALYSIS"]
+        job = await self._db(self._create_job, project, "IMAGE_GENERATION", {
+            "product_data": vision_job.output_payload
+        }, fingerprint)
+        
+        stored_images = []
+        
+        async def on_image(image: Dict[str, Any]):
+            # Store each image as soon as it is ready, so a slow or failed
+            # image never costs the ones that already finished
+            stored = await run_agent_call(self._store_generated_image, image)
+            stored_images.append(stored)
+            await self._db(self._save_image_asset, project.id, job, stored, list(stored_images))
         
         try:
-            # TODO: Integrate with your ImageGeneratorAgent
-            # from agents.image_generator import ImageGeneratorAgent
-            # image_agent = ImageGeneratorAgent()
-            # result = image_agent.generate_images(state)
-            
-            # Mock output for now
-            output = {
-                "generated_images": [
-                    {
-                        "type": "social_media_post",
-                        "url": "https://example.com/image1.jpg",
-                        "prompt": "Marketing image for social media"
-                    }
-                ]
-            }
+            from app.core.agent_wrapper import get_agent_wrapper
+            agent_wrapper = await run_agent_call(get_agent_wrapper)
             
-            job.output_payload = output
-            job.status = "completed"
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
+            output = await agent_wrapper.arun_image_generation(
+                product_data=vision_job.output_payload,
+                market_data={},
+                on_image=on_image
+            )
+            if not stored_images:
+                # A completed stage is reused by fingerprint: an empty result
+                # must fail so a later run (or a retry) generates it again
+                errors = output.get("errors") or ["no images were generated"]
+                raise RuntimeError("; ".join(errors))
+            output["generated_images"] = stored_images
             
+            await self._db(self._finish_job, job, output=output)
             return job
             
         except Exception as e:
-            job.status = "failed"
-            job.error_message = str(e)
-            job.completed_at = datetime.utcnow()
-            self.db.commit()
+            await self._db(self._finish_job, job, error=str(e))
             return job
     
-    async def _create_assets_from_content(
+    def _store_generated_image(self, image: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Download a generated image into the blob store.
+        
+        The returned copy points `url` at the local blob; if the download
+        fails the remote URL is kept and no asset is created for it.
+        """
+        stored = dict(image, source_url=image.get("url"))
+        try:
+            name, digest = store_remote(image["url"])
+            stored.update(url=blob_url(name), sha256=digest)
+        except Exception as e:
+            print(f"Could not store generated image {image.get('type')}: {e}")
+            stored["store_error"] = str(e)
+        return stored
+    
+    def _save_image_asset(
+        self,
+        project_id: uuid.UUID,
+        job: Job,
+        image: Dict[str, Any],
+        images_so_far: list
+    ):
+        """
+        Record a stored image as an Asset (once per project and blob) and
+        publish the images finished so far on the job.
+        """
+        if image.get("sha256"):
+            exists = self.db.query(Asset.id).filter(
+                Asset.project_id == project_id,
+                Asset.file_url == image["url"]
+            ).first()
+            if not exists:
+                self.db.add(Asset(
+                    project_id=project_id,
+                    asset_type="image",
+                    content=json.dumps({
+                        "type": image.get("type"),
+                        "prompt": image.get("prompt"),
+                        "sha256": image["sha256"],
+                        "source_url": image.get("source_url")
+                    }),
+                    file_url=image["url"]
+                ))
+        
+        job.output_payload = {"generated_images": images_so_far, "partial": True}
+        self._publish_job(job, output=job.output_payload)
+        self.db.commit()
+    
+    def _create_assets_from_content(
         self, 
         project_id: uuid.UUID, 
         generated_content: Dict[str, Any]
@@ -383,8 +645,13 @@ class AgentOrchestrator:
         
         jobs = self.db.query(Job).filter(Job.project_id == project_id).all()
         
+        return self.format_workflow_status(project.status, jobs)
+    
+    @staticmethod
+    def format_workflow_status(project_status: str, jobs: List[Job]) -> Dict[str, Any]:
+        """Workflow status response for a project's status and jobs"""
         return {
-            "project_status": project.status,
+            "project_status": project_status,
             "jobs": [
                 {
                     "id": str(job.id),
@@ -1,15 +1,24 @@
+import asyncio
+import threading
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from app.core.config import settings
+from app.core.executor import get_password_executor
 
-def hash_password(password: str) -> str:
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+    pass
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """Hash a password using bcrypt"""
     # Encode password to bytes
     password_bytes = password.encode('utf-8')
     # Generate salt and hash
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds or settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     # Return as string
     return hashed.decode('utf-8')
@@ -23,6 +32,37 @@ def verify_password(password: str, hashed: str) -> bool:
     except Exception:
         return False
 
+def needs_rehash(hashed: str) -> bool:
+    """True if a bcrypt hash was made with a different cost than BCRYPT_ROUNDS"""
+    try:
+        # Format: $2b$<cost>$<salt+hash>
+        return int(hashed.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# Requests waiting for (or using) a hashing process. Bounded so a login
+# storm is turned away quickly instead of queueing without limit.
+_pending_hashes = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+async def _run_hashing(fn, *args):
+    if not _pending_hashes.acquire(blocking=False):
+        raise PasswordHashingBusy("Too many password operations in progress")
+    try:
+        future = get_password_executor().submit(fn, *args)
+    except BaseException:
+        _pending_hashes.release()
+        raise
+    future.add_done_callback(lambda _: _pending_hashes.release())
+    return await asyncio.wrap_future(future)
+
+async def hash_password_async(password: str) -> str:
+    """hash_password in the password process pool; raises PasswordHashingBusy when saturated"""
+    return await _run_hashing(hash_password, password, settings.BCRYPT_ROUNDS)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password in the password process pool; raises PasswordHashingBusy when saturated"""
+    return await _run_hashing(verify_password, password, hashed)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
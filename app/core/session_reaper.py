@@ -0,0 +1,82 @@
+"""
+Session Reaper - Deletes expired user sessions in the background
+
+Login inserts a user_sessions row for every token, and nothing else ever
+removes them. The reaper deletes expired rows in small batches, so each
+DELETE holds its locks briefly. It also publishes the table's size as a
+metric. It is safe to run in several processes at once.
+"""
+
+import asyncio
+from datetime import datetime
+from sqlalchemy import delete, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.executor import run_db_call
+from app.core.metrics import metrics
+from app.db.models import UserSession
+from app.db.session import get_session_local
+
+metrics.describe("user_sessions_rows", "gauge", "Approximate number of rows in user_sessions")
+metrics.describe("user_sessions_reaped_total", "counter", "Expired sessions deleted by the reaper")
+
+
+def reap_expired_sessions(db: Session, batch_size: int) -> int:
+    """
+    Delete expired sessions, one batch per transaction.
+
+    Returns:
+        Number of rows deleted
+    """
+    total = 0
+    while True:
+        expired_ids = db.query(UserSession.id).filter(
+            UserSession.expires_at < datetime.utcnow()
+        ).limit(batch_size).scalar_subquery()
+
+        result = db.execute(
+            delete(UserSession)
+            .where(UserSession.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+
+
+def estimate_row_count(db: Session, table_name: str) -> int:
+    """Planner estimate on PostgreSQL (no table scan), exact count elsewhere"""
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+            {"name": table_name}
+        ).scalar()
+        # -1 means the table has never been analyzed
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return db.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+
+def _reap_once() -> int:
+    db = get_session_local()()
+    try:
+        deleted = reap_expired_sessions(db, settings.SESSION_REAPER_BATCH_SIZE)
+        metrics.inc("user_sessions_reaped_total", deleted)
+        metrics.set("user_sessions_rows", estimate_row_count(db, UserSession.__tablename__))
+        return deleted
+    finally:
+        db.close()
+
+
+async def run_session_reaper():
+    """Reap expired sessions every SESSION_REAPER_INTERVAL_SECONDS until cancelled"""
+    while True:
+        try:
+            deleted = await run_db_call(_reap_once)
+            if deleted:
+                print(f"Session reaper: deleted {deleted} expired sessions")
+        except Exception as e:
+            print(f"Session reaper error: {e}")
+        await asyncio.sleep(settings.SESSION_REAPER_INTERVAL_SECONDS)
@@ -0,0 +1,118 @@
+"""
+Upload Reaper - Deletes abandoned resumable uploads in the background
+
+A resumable upload that is started but never completed leaves an
+"uploading" row and a .partial file behind. The reaper deletes uploads with
+no new chunk for UPLOAD_ABANDONED_AFTER_HOURS (the .partial file's
+modification time is the last activity), together with their files, and
+removes .partial files whose row no longer exists. It is safe to run in
+several processes at once.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.executor import run_db_call
+from app.core.metrics import metrics
+from app.db.models import Upload
+from app.db.session import get_session_local
+from app.utils.uploads import discard_partial, partial_dir, partial_path
+
+metrics.describe("uploads_reaped_total", "counter", "Abandoned resumable uploads deleted by the reaper")
+
+
+def _last_activity(upload_id: uuid.UUID) -> float:
+    """Epoch seconds of the upload's last chunk (0 if it never got one)"""
+    try:
+        return os.path.getmtime(partial_path(upload_id))
+    except FileNotFoundError:
+        return 0.0
+
+
+def _old_partial_ids(cutoff: float) -> List[uuid.UUID]:
+    ids = []
+    for entry in os.scandir(partial_dir()):
+        stem, ext = os.path.splitext(entry.name)
+        if ext != ".part" or entry.stat().st_mtime >= cutoff:
+            continue
+        try:
+            ids.append(uuid.UUID(stem))
+        except ValueError:
+            continue
+    return ids
+
+
+def reap_abandoned_uploads(db: Session, abandoned_after: timedelta, batch_size: int) -> int:
+    """
+    Delete abandoned uploads and orphaned .partial files.
+
+    Returns:
+        Number of upload rows deleted
+    """
+    cutoff = datetime.utcnow() - abandoned_after
+    cutoff_epoch = time.time() - abandoned_after.total_seconds()
+
+    candidates = [
+        upload_id for (upload_id,) in db.query(Upload.id).filter(
+            Upload.status == "uploading",
+            Upload.created_at < cutoff
+        )
+    ]
+    # Old uploads that are still receiving chunks are kept
+    abandoned = [upload_id for upload_id in candidates if _last_activity(upload_id) < cutoff_epoch]
+
+    total = 0
+    for start in range(0, len(abandoned), batch_size):
+        result = db.execute(
+            delete(Upload)
+            .where(Upload.id.in_(abandoned[start:start + batch_size]), Upload.status == "uploading")
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+
+    # Files of the uploads above, and of rows deleted with their user
+    old_ids = _old_partial_ids(cutoff_epoch)
+    if old_ids:
+        live = {
+            upload_id for (upload_id,) in db.query(Upload.id).filter(
+                Upload.id.in_(old_ids),
+                Upload.status == "uploading"
+            )
+        }
+        for upload_id in old_ids:
+            if upload_id not in live:
+                discard_partial(upload_id)
+    return total
+
+
+def _reap_once() -> int:
+    db = get_session_local()()
+    try:
+        deleted = reap_abandoned_uploads(
+            db,
+            timedelta(hours=settings.UPLOAD_ABANDONED_AFTER_HOURS),
+            settings.UPLOAD_REAPER_BATCH_SIZE
+        )
+        metrics.inc("uploads_reaped_total", deleted)
+        return deleted
+    finally:
+        db.close()
+
+
+async def run_upload_reaper():
+    """Reap abandoned uploads every UPLOAD_REAPER_INTERVAL_SECONDS until cancelled"""
+    while True:
+        try:
+            deleted = await run_db_call(_reap_once)
+            if deleted:
+                print(f"Upload reaper: deleted {deleted} abandoned uploads")
+        except Exception as e:
+            print(f"Upload reaper error: {e}")
+        await asyncio.sleep(settings.UPLOAD_REAPER_INTERVAL_SECONDS)
@@ -0,0 +1,105 @@
+"""
+Database Migrations - Applies the Alembic migrations in migrations/
+
+Usage:
+    python -m app.db.migrate              # upgrade to the latest revision
+    python -m app.db.migrate upgrade REV  # upgrade to a specific revision
+    python -m app.db.migrate current      # show the database's revision
+    python -m app.db.migrate check        # exit 1 unless the database is up to date
+
+Run this once per deploy, before starting the API server and workers. The
+processes themselves never change the schema; at startup they only compare
+the database's revision with the code's (one single-row query).
+"""
+
+import os
+import sys
+from functools import lru_cache
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from app.core.config import settings
+from app.db.session import get_engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+class SchemaOutOfDate(Exception):
+    """Raised when the database is not at the revision the code expects"""
+    pass
+
+
+def get_alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    # Resolve migrations/ relative to alembic.ini, whatever the working directory
+    config.set_main_option(
+        "script_location",
+        os.path.join(os.path.dirname(ALEMBIC_INI), "migrations")
+    )
+    return config
+
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    """Latest revision in migrations/ (read from files, not the database)"""
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+def current_revision() -> Optional[str]:
+    """Revision recorded in the database, or None if it was never migrated"""
+    try:
+        with get_engine().connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError as e:
+        # Missing alembic_version table: database predates migrations
+        if "alembic_version" in str(e.orig):
+            return None
+        raise
+
+
+def check_schema_version():
+    """
+    Startup check: make sure `python -m app.db.migrate` has been run.
+
+    Controlled by SCHEMA_VERSION_CHECK: "fail" raises SchemaOutOfDate,
+    "warn" only prints, "off" skips the query entirely.
+    """
+    if settings.SCHEMA_VERSION_CHECK == "off":
+        return
+
+    expected = head_revision()
+    current = current_revision()
+    if current == expected:
+        return
+
+    message = (
+        f"Database schema is at revision {current or 'none'}, code expects {expected}. "
+        f"Run: python -m app.db.migrate"
+    )
+    if settings.SCHEMA_VERSION_CHECK == "fail":
+        raise SchemaOutOfDate(message)
+    print(f"Warning: {message}")
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    action = args.pop(0) if args else "upgrade"
+    config = get_alembic_config()
+
+    if action == "upgrade":
+        command.upgrade(config, args[0] if args else "head")
+    elif action == "current":
+        print(current_revision() or "none")
+    elif action == "check":
+        current, expected = current_revision(), head_revision()
+        print(f"database: {current or 'none'}, code: {expected}")
+        sys.exit(0 if current == expected else 1)
+    else:
+        sys.exit(f"Unknown command: {action} (expected upgrade, current or check)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Text, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Text, String, Boolean, Integer, BigInteger, TIMESTAMP, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
 import uuid
@@ -14,6 +15,16 @@ class User(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 
+class Batch(Base):
+    __tablename__ = "batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    source_filename = Column(Text)  # The uploaded CSV/JSONL
+    total = Column(Integer, nullable=False, default=0)  # Projects created by the batch
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
 class Project(Base):
     __tablename__ = "projects"
 
@@ -31,8 +42,22 @@ class Project(Base):
     target_audience = Column(Text)  # Target demographic
     brand_persona = Column(Text)  # Brand personality/voice
     
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("batches.id", ondelete="SET NULL"))  # Bulk import, if any
+    
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    # Only loaded on request (get_project?include=jobs,assets). Deleting a
+    # project leaves unloaded children to ON DELETE CASCADE
+    jobs = relationship("Job", order_by="Job.created_at", cascade="all, delete-orphan", passive_deletes=True)
+    assets = relationship("Asset", order_by="Asset.created_at", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # list_projects: a user's projects, newest first
+        Index("ix_projects_user_id_created_at", "user_id", "created_at"),
+        # Batch progress: a batch's projects by status
+        Index("ix_projects_batch_id_status", "batch_id", "status"),
+    )
+
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -45,19 +70,37 @@ class Job(Base):
     output_payload = Column(JSONB)
     error_message = Column(Text)
     started_at = Column(TIMESTAMP)
+    heartbeat_at = Column(TIMESTAMP)  # Refreshed by the worker while a workflow runs
     completed_at = Column(TIMESTAMP)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        # A project's jobs in order (job lists, latest job, counts)
+        Index("ix_jobs_project_id_created_at", "project_id", "created_at"),
+        # A project's jobs of one type and status (workflow stages, retries)
+        Index("ix_jobs_project_id_job_type_status", "project_id", "job_type", "status"),
+        # Queue polling: oldest queued job of a type
+        Index("ix_jobs_job_type_status_created_at", "job_type", "status", "created_at"),
+    )
+
 
 class UserSession(Base):
     __tablename__ = "user_sessions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(Text, unique=True, nullable=False)
+    token_digest = Column(String(64), nullable=False)  # SHA-256 hex of the JWT, never the token itself
     expires_at = Column(TIMESTAMP, nullable=False)
+    revoked_at = Column(TIMESTAMP)  # Set on logout
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        # Session validation: digest equality plus expiry check, from the index alone
+        Index("ix_user_sessions_token_digest_expires_at", "token_digest", "expires_at"),
+        # Expired-session reaper
+        Index("ix_user_sessions_expires_at", "expires_at"),
+    )
+
 
 class Asset(Base):
     __tablename__ = "assets"
@@ -68,3 +111,22 @@ class Asset(Base):
     content = Column(Text)
     file_url = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+    __table_args__ = (
+        # A project's assets in order (asset lists and counts)
+        Index("ix_assets_project_id_created_at", "project_id", "created_at"),
+    )
+
+
+class Upload(Base):
+    __tablename__ = "uploads"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(Text)
+    content_type = Column(Text)
+    status = Column(Text, default="uploading")  # uploading, completed
+    bytes_received = Column(BigInteger, default=0)
+    sha256 = Column(Text)
+    file_path = Column(Text)  # Final location, set once completed
+    created_at = Column(TIMESTAMP, server_default=func.now())
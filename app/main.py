@@ -1,8 +1,13 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, projects, uploads, jobs, assets
-from app.db.session import get_engine, Base
-from app.db import models  # Import models to register them with Base
+from app.api import auth, projects, uploads, jobs, assets, batches
+from app.db.migrate import check_schema_version, SchemaOutOfDate
+from app.core.metrics import metrics
+from app.core.events import run_event_listener
+from app.core.session_reaper import run_session_reaper
+from app.core.upload_reaper import run_upload_reaper
 
 app = FastAPI(
     title="Catalyst AI Backend",
@@ -21,20 +26,41 @@ app.add_middleware(
 
 @app.on_event("startup")
 def startup():
-    # Create database tables
+    # Schema changes are applied by `python -m app.db.migrate`, not at boot;
+    # here we only check the recorded revision (a single-row query)
     try:
-        engine = get_engine()
-        Base.metadata.create_all(bind=engine)
+        check_schema_version()
+    except SchemaOutOfDate:
+        raise
     except Exception as e:
         print(f"Warning: Could not connect to database: {e}")
         print("The application will start but database operations may fail.")
 
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.session_reaper = asyncio.create_task(run_session_reaper())
+    app.state.upload_reaper = asyncio.create_task(run_upload_reaper())
+    # Feeds /jobs/project/{id}/events from the workers' NOTIFYs
+    app.state.event_listener = asyncio.create_task(run_event_listener())
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.session_reaper.cancel()
+    app.state.upload_reaper.cancel()
+    app.state.event_listener.cancel()
+
 @app.get("/")
 def root():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Process metrics in the Prometheus text format"""
+    return metrics.render()
+
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(uploads.router)
 app.include_router(jobs.router)
 app.include_router(assets.router)
+app.include_router(batches.router)
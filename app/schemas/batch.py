@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, List
+from datetime import datetime
+
+class BatchOut(BaseModel):
+    """Aggregate progress of a bulk import"""
+    id: str
+    source_filename: Optional[str] = None
+    total: int
+    status: str  # created, queued, processing, finished
+    counts: Dict[str, int]  # Projects per status (created, queued, processing, completed, failed)
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class BatchCreated(BatchOut):
+    """Response to a bulk import: the batch and the created projects in file order"""
+    project_ids: List[str]
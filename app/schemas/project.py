@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
+from app.schemas.job import JobOut
+from app.schemas.asset import AssetOut
 
 class ProjectBase(BaseModel):
     """Base schema for Project"""
@@ -50,5 +52,9 @@ class ProjectDetail(ProjectOut):
     assets_count: int = 0
     latest_job_status: Optional[str] = None
     
+    # Only present when requested with ?include=jobs,assets
+    jobs: Optional[List[JobOut]] = None
+    assets: Optional[List[AssetOut]] = None
+    
     class Config:
         from_attributes = True
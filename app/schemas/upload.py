@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class UploadCreate(BaseModel):
+    """Start a resumable upload"""
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field(..., description="MIME type, must be an image/* type")
+
+class UploadOut(BaseModel):
+    id: str
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    status: str  # uploading, completed
+    bytes_received: int = 0
+    sha256: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
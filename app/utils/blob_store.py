@@ -0,0 +1,117 @@
+"""
+Blob Store - Content-addressed storage for generated media
+
+Generated images are downloaded once and stored under the SHA-256 of their
+bytes (UPLOAD_DIR/blobs/<sha256><ext>). Identical images share one file, and
+a blob never changes once written, so its URL can be cached forever.
+
+Blobs are shared between projects and are not removed when a project is
+deleted.
+"""
+
+import os
+import re
+import uuid
+import base64
+import hashlib
+import mimetypes
+from typing import Iterable, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from app.core.config import settings
+
+BLOB_DIR_NAME = "blobs"
+BLOB_URL_PREFIX = "/assets/blobs"
+BLOB_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,5}$")
+
+
+class BlobTooLarge(Exception):
+    """Raised when a blob exceeds MAX_UPLOAD_BYTES"""
+    pass
+
+
+def blob_dir() -> str:
+    directory = os.path.join(settings.UPLOAD_DIR, BLOB_DIR_NAME)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def blob_path(name: str) -> Optional[str]:
+    """Path of a stored blob, or None if `name` is not a valid blob name"""
+    if not BLOB_NAME_PATTERN.match(name):
+        return None
+    return os.path.join(blob_dir(), name)
+
+
+def blob_url(name: str) -> str:
+    """Stable URL clients use to fetch a blob"""
+    return f"{BLOB_URL_PREFIX}/{name}"
+
+
+def _guess_extension(content_type: Optional[str], source: str = "") -> str:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    ext = mimetypes.guess_extension(content_type) if content_type else None
+    if not ext:
+        ext = os.path.splitext(urlparse(source).path)[1].lower()
+    if ext == ".jpe":
+        ext = ".jpg"
+    return ext if re.match(r"^\.[a-z0-9]{1,5}$", ext or "") else ".bin"
+
+
+def store_chunks(chunks: Iterable[bytes], ext: str) -> Tuple[str, str]:
+    """
+    Write chunks to the store under their content hash.
+
+    Returns:
+        (blob name, sha256 hex digest)
+    """
+    directory = blob_dir()
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_BYTES:
+                    raise BlobTooLarge(f"Blob exceeds the {settings.MAX_UPLOAD_BYTES} byte limit")
+                digest.update(chunk)
+                f.write(chunk)
+
+        name = f"{digest.hexdigest()}{ext}"
+        final_path = os.path.join(directory, name)
+        if os.path.exists(final_path):
+            # Already stored: identical content, nothing to write
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return name, digest.hexdigest()
+
+
+def store_remote(source: str) -> Tuple[str, str]:
+    """
+    Download a remote file (http(s) or data: URL) into the store.
+
+    Returns:
+        (blob name, sha256 hex digest)
+    """
+    if source.startswith("data:"):
+        header, _, payload = source.partition(",")
+        content_type = header[5:].split(";")[0]
+        data = base64.b64decode(payload) if ";base64" in header else payload.encode("utf-8")
+        return store_chunks([data], _guess_extension(content_type))
+
+    with requests.get(
+        source,
+        stream=True,
+        timeout=settings.BLOB_DOWNLOAD_TIMEOUT_SECONDS
+    ) as response:
+        response.raise_for_status()
+        ext = _guess_extension(response.headers.get("Content-Type"), source)
+        return store_chunks(response.iter_content(settings.UPLOAD_CHUNK_SIZE), ext)
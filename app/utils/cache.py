@@ -0,0 +1,222 @@
+"""
+Persistent Cache - Small key/value store for expensive agent results
+
+Entries live in a local SQLite file, so they survive restarts and are shared
+by every process on the machine (API server and workers). Each cache is a
+namespace in that file with its own TTL and LRU size limit. Hit and miss
+counts are stored alongside the entries so all processes report the same
+numbers.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "catalyst_cache.sqlite3")
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a fixed-size key from any number of key parts"""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PersistentCache:
+    """
+    Namespaced persistent cache with TTL expiry and LRU eviction.
+
+    Values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        path: Optional[str] = None
+    ):
+        """
+        Args:
+            namespace: Name separating this cache from others in the same file
+            ttl_seconds: Entry lifetime (None = never expires)
+            max_entries: Keep at most this many entries, evicting least recently used
+            path: SQLite file (default: CACHE_DB_PATH env or .cache/catalyst_cache.sqlite3)
+        """
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path = path or os.getenv("CACHE_DB_PATH", DEFAULT_CACHE_PATH)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS ix_cache_entries_lru
+                ON cache_entries (namespace, accessed_at)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per call keeps the cache safe to use from
+        # any thread; the timeout makes concurrent writers wait, not fail.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return self.ttl_seconds is None or time.time() - created_at < self.ttl_seconds
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        """
+        Return the cached value, or None on a miss or expired entry.
+
+        With allow_stale=True an expired entry that has not been evicted yet
+        is returned anyway (useful when the fresh source is unavailable).
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None or not (allow_stale or self._is_fresh(row[1])):
+                self._increment(conn, f"{self.namespace}:misses")
+                return None
+
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (time.time(), self.namespace, key)
+            )
+            self._increment(conn, f"{self.namespace}:hits")
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value.
+
+        With max_entries set, expired entries stay available to allow_stale
+        reads until LRU eviction removes them; otherwise they are purged here.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), now, now)
+            )
+
+            if self.ttl_seconds is not None and self.max_entries is None:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?",
+                    (self.namespace, now - self.ttl_seconds)
+                )
+
+            if self.max_entries is not None:
+                conn.execute("""
+                    DELETE FROM cache_entries
+                    WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache_entries
+                        WHERE namespace = ?
+                        ORDER BY accessed_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                """, (self.namespace, self.namespace, self.max_entries))
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def _increment(self, conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO cache_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def increment_counter(self, name: str, limit: Optional[int] = None) -> Optional[int]:
+        """
+        Atomically add one to a counter shared by all processes.
+
+        Args:
+            name: Counter name within this namespace
+            limit: Refuse to go past this value
+
+        Returns:
+            The new value, or None if the counter is already at `limit`
+        """
+        counter = f"{self.namespace}:{name}"
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT value FROM cache_counters WHERE name = ?", (counter,)
+                ).fetchone()
+                current = row[0] if row else 0
+                if limit is not None and current >= limit:
+                    return None
+                self._increment(conn, counter)
+                return current + 1
+            finally:
+                conn.execute("COMMIT")
+
+    def get_counter(self, name: str) -> int:
+        """Current value of a counter in this namespace"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache_counters WHERE name = ?",
+                (f"{self.namespace}:{name}",)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size of this namespace"""
+        with self._connect() as conn:
+            counters = dict(conn.execute(
+                "SELECT name, value FROM cache_counters WHERE name IN (?, ?)",
+                (f"{self.namespace}:hits", f"{self.namespace}:misses")
+            ).fetchall())
+            entries = conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,)
+            ).fetchone()[0]
+
+        return {
+            "hits": counters.get(f"{self.namespace}:hits", 0),
+            "misses": counters.get(f"{self.namespace}:misses", 0),
+            "entries": entries
+        }
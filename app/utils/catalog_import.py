@@ -0,0 +1,94 @@
+"""
+Catalog Import - Reads product rows for bulk project creation
+
+Accepts CSV (header row required) or JSONL (one JSON object per line).
+Recognized columns are the ProjectCreate fields plus `image` (file name of
+an image sent with the same request) and `upload_id` (a completed upload
+from /uploads). Other columns are ignored; empty values become None.
+"""
+
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, List
+
+PRODUCT_FIELDS = (
+    "product_name", "brand_name", "price", "description",
+    "campaign_goal", "target_audience", "brand_persona",
+)
+IMAGE_FIELDS = ("image", "upload_id")
+
+
+class CatalogFormatError(ValueError):
+    """Raised when the catalog file cannot be parsed"""
+    pass
+
+
+def _clean(row: Dict[str, Any]) -> Dict[str, Any]:
+    cleaned = {}
+    for field in PRODUCT_FIELDS + IMAGE_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        elif value is not None:
+            value = str(value)
+        cleaned[field] = value
+    return cleaned
+
+
+def _is_jsonl(filename: str, content_type: str) -> bool:
+    name = (filename or "").lower()
+    return name.endswith((".jsonl", ".ndjson")) or "json" in (content_type or "")
+
+
+def read_products(
+    source: BinaryIO,
+    filename: str,
+    content_type: str,
+    max_rows: int
+) -> List[Dict[str, Any]]:
+    """
+    Parse a CSV or JSONL catalog into cleaned product dicts.
+
+    Raises:
+        CatalogFormatError: Unreadable file, or more than max_rows products
+    """
+    text_stream = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    rows: List[Dict[str, Any]] = []
+    try:
+        if _is_jsonl(filename, content_type):
+            for line_number, line in enumerate(text_stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise CatalogFormatError(f"Line {line_number}: invalid JSON ({e})")
+                if not isinstance(record, dict):
+                    raise CatalogFormatError(f"Line {line_number}: expected a JSON object")
+                rows.append(_clean(record))
+                if len(rows) > max_rows:
+                    break
+        else:
+            reader = csv.DictReader(text_stream)
+            if not reader.fieldnames or "product_name" not in reader.fieldnames:
+                raise CatalogFormatError("CSV needs a header row with at least a product_name column")
+            for record in reader:
+                if not any(record.values()):
+                    continue
+                rows.append(_clean(record))
+                if len(rows) > max_rows:
+                    break
+    except UnicodeDecodeError:
+        raise CatalogFormatError("Catalog must be UTF-8 encoded")
+    except csv.Error as e:
+        raise CatalogFormatError(f"Invalid CSV: {e}")
+    finally:
+        # Leave the underlying upload file open for the caller
+        text_stream.detach()
+
+    if len(rows) > max_rows:
+        raise CatalogFormatError(f"A batch can contain at most {max_rows} products")
+    if not rows:
+        raise CatalogFormatError("Catalog contains no products")
+    return rows
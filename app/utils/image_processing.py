@@ -0,0 +1,98 @@
+"""
+Image Processing - Shrinks product photos before they go to vision models
+
+Phone photos are often several megabytes, which inflates request size,
+latency and token cost without improving the analysis. `prepare_image`
+applies EXIF orientation, downsizes to a maximum edge and re-encodes to a
+compact format. The result is cached next to the original upload, so each
+image is only processed once.
+
+Pillow is optional: without it the original bytes are sent unchanged.
+"""
+
+import io
+import os
+import glob
+import uuid
+import mimetypes
+from typing import List, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+FORMAT_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "PNG": "image/png",
+}
+
+FORMAT_EXTENSIONS = {
+    "JPEG": ".jpg",
+    "WEBP": ".webp",
+    "PNG": ".png",
+}
+
+
+def derived_image_paths(image_path: str) -> List[str]:
+    """All processed variants cached for an original image"""
+    root, _ = os.path.splitext(image_path)
+    return glob.glob(f"{glob.escape(root)}.vision-*")
+
+
+def prepare_image(
+    image_path: str,
+    max_edge: int = 1024,
+    image_format: str = "WEBP",
+    quality: int = 85
+) -> Tuple[bytes, str]:
+    """
+    Load an image ready to send to a vision model.
+
+    Args:
+        image_path: Path to the original image
+        max_edge: Longest side in pixels after resizing (smaller images are not enlarged)
+        image_format: Output format (JPEG, WEBP or PNG)
+        quality: Encoder quality for lossy formats
+
+    Returns:
+        (image bytes, MIME type)
+    """
+    image_format = image_format.upper()
+    if Image is None or image_format not in FORMAT_MIME_TYPES:
+        with open(image_path, "rb") as f:
+            data = f.read()
+        return data, mimetypes.guess_type(image_path)[0] or "image/jpeg"
+
+    mime_type = FORMAT_MIME_TYPES[image_format]
+    root, _ = os.path.splitext(image_path)
+    derived_path = f"{root}.vision-{max_edge}-q{quality}{FORMAT_EXTENSIONS[image_format]}"
+
+    # Reuse the processed copy unless the original was replaced since
+    if os.path.exists(derived_path) and os.path.getmtime(derived_path) >= os.path.getmtime(image_path):
+        with open(derived_path, "rb") as f:
+            return f.read(), mime_type
+
+    with Image.open(image_path) as original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_edge, max_edge))
+
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, quality=quality)
+
+    data = buffer.getvalue()
+
+    # Write atomically so concurrent workers never read a partial file
+    tmp_path = f"{derived_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, derived_path)
+
+    return data, mime_type
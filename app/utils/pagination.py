@@ -0,0 +1,86 @@
+"""
+Keyset Pagination - Cursor-based paging on (created_at, id)
+
+Offset paging makes the database walk past every skipped row, so deep pages
+get slower linearly. Here each page continues strictly after the last row
+of the previous one, which the (…, created_at) indexes can seek to
+directly: page 1000 costs the same as page 1.
+
+The cursor handed to clients is an opaque URL-safe token; they pass it back
+unchanged to get the next page. A null next_cursor means the last page.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from app.core.config import settings
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor token that was not produced by encode_cursor"""
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    payload = json.dumps({"t": created_at.isoformat(), "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Requested page size, defaulted and capped by the server"""
+    if not limit:
+        return settings.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, settings.PAGE_SIZE_MAX))
+
+
+def paginate(query, model, cursor: Optional[str], limit: int, newest_first: bool = False):
+    """
+    Restrict a query (Select or ORM Query) to one page of `model` rows.
+
+    Rows are ordered by (created_at, id), ascending or newest first. One
+    extra row is fetched so split_page can tell whether another page
+    follows. Raises InvalidCursor for a malformed cursor.
+    """
+    created_at, row_id = model.created_at, model.id
+
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        # Written as a range on created_at plus a tie-break on id (rather
+        # than a row comparison) so the leading condition can use the index
+        if newest_first:
+            query = query.where(
+                created_at <= after_created_at,
+                or_(created_at < after_created_at, and_(created_at == after_created_at, row_id < after_id))
+            )
+        else:
+            query = query.where(
+                created_at >= after_created_at,
+                or_(created_at > after_created_at, and_(created_at == after_created_at, row_id > after_id))
+            )
+
+    if newest_first:
+        query = query.order_by(created_at.desc(), row_id.desc())
+    else:
+        query = query.order_by(created_at.asc(), row_id.asc())
+    return query.limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row fetched by paginate; returns (rows, next_cursor)"""
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = list(rows[:limit])
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,68 @@
+"""
+Rate Limiting - Token buckets shared by every workflow in the process
+
+A bucket refills at `rate` tokens per second up to `capacity`. Callers
+reserve a token and wait until it is due, so concurrent callers are served
+in order and the long-run rate never exceeds `rate`, while up to `capacity`
+requests may go out at once.
+
+Buckets work from threads (acquire) and coroutines (acquire_async) and are
+not tied to an event loop, so one bucket covers the API server, workers and
+agent thread pools alike.
+"""
+
+import time
+import asyncio
+import threading
+from typing import Dict
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, going into debt if needed; returns seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> float:
+        """Block the calling thread until a token is available; returns seconds waited"""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Wait for a token without blocking the event loop; returns seconds waited"""
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: int = 1) -> TokenBucket:
+    """Get or create the process-wide bucket called `name`"""
+    with _buckets_lock:
+        if name not in _buckets:
+            _buckets[name] = TokenBucket(rate, capacity)
+        return _buckets[name]
@@ -0,0 +1,186 @@
+"""
+Upload Storage - Streams uploaded files to disk in bounded chunks
+
+Uploads are never read into memory as a whole: they are copied in
+UPLOAD_CHUNK_SIZE pieces, checked against MAX_UPLOAD_BYTES as they arrive,
+and hashed on the way. Files are written under a temporary name and renamed
+into place, so a half-written image is never visible under its final path.
+
+Resumable uploads are hashed chunk by chunk as well. hashlib state cannot be
+stored in the database, so the running digest lives in the process that
+received the chunks; if an upload's chunks reach different processes (or the
+server restarts), completing it falls back to reading the file once.
+"""
+
+import os
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Optional, Tuple
+from app.core.config import settings
+
+PARTIAL_DIR_NAME = ".partial"
+
+# Unfinished uploads tracked at most; the oldest digests are dropped beyond this
+MAX_PARTIAL_DIGESTS = 1000
+
+_partial_digests: "OrderedDict[uuid.UUID, Tuple[int, Any]]" = OrderedDict()  # upload id -> (bytes hashed, sha256)
+_partial_digests_lock = threading.Lock()
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES"""
+    pass
+
+
+class PartialUploadMissing(Exception):
+    """Raised when a resumable upload's bytes are gone (reaped or already finalized)"""
+    pass
+
+
+def safe_extension(filename: str, default: str = ".jpg") -> str:
+    """File extension from a client-supplied name, or `default` if it looks unsafe"""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if not ext or len(ext) > 6 or not ext[1:].isalnum():
+        return default
+    return ext
+
+
+def partial_dir() -> str:
+    """Directory holding the bytes of unfinished resumable uploads"""
+    directory = os.path.join(settings.UPLOAD_DIR, PARTIAL_DIR_NAME)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def partial_path(upload_id: uuid.UUID) -> str:
+    """Where the bytes of an unfinished resumable upload are kept"""
+    return os.path.join(partial_dir(), f"{upload_id}.part")
+
+
+def _take_digest(upload_id: uuid.UUID, offset: int) -> Optional[Any]:
+    """Copy of the running digest if it covers exactly the first `offset` bytes"""
+    with _partial_digests_lock:
+        entry = _partial_digests.get(upload_id)
+        if entry and entry[0] == offset:
+            return entry[1].copy()
+    return hashlib.sha256() if offset == 0 else None
+
+
+def _store_digest(upload_id: uuid.UUID, size: int, digest) -> None:
+    with _partial_digests_lock:
+        _partial_digests[upload_id] = (size, digest)
+        _partial_digests.move_to_end(upload_id)
+        while len(_partial_digests) > MAX_PARTIAL_DIGESTS:
+            _partial_digests.popitem(last=False)
+
+
+def _copy_chunks(source: BinaryIO, target: BinaryIO, already_written: int, digest=None) -> int:
+    """Copy `source` into `target` chunk by chunk; returns bytes copied"""
+    copied = 0
+    while True:
+        chunk = source.read(settings.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return copied
+        copied += len(chunk)
+        if already_written + copied > settings.MAX_UPLOAD_BYTES:
+            raise UploadTooLarge(f"File exceeds the {settings.MAX_UPLOAD_BYTES} byte limit")
+        if digest is not None:
+            digest.update(chunk)
+        target.write(chunk)
+
+
+def save_stream(source: BinaryIO, final_name: str) -> Tuple[str, str, int]:
+    """
+    Stream a complete file into the upload directory.
+
+    Args:
+        source: File-like object to read from
+        final_name: File name inside UPLOAD_DIR
+
+    Returns:
+        (file path, sha256 hex digest, size in bytes)
+    """
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    final_path = os.path.join(settings.UPLOAD_DIR, final_name)
+    tmp_path = os.path.join(settings.UPLOAD_DIR, f".{final_name}.{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+
+    try:
+        with open(tmp_path, "wb") as target:
+            size = _copy_chunks(source, target, 0, digest)
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return final_path, digest.hexdigest(), size
+
+
+def append_chunk(upload_id: uuid.UUID, source: BinaryIO, offset: int) -> int:
+    """
+    Append one chunk to a resumable upload.
+
+    The caller must hold the upload's row lock, so chunks of one upload are
+    never written concurrently.
+
+    Args:
+        upload_id: Upload the chunk belongs to
+        source: Chunk contents
+        offset: Byte offset the chunk starts at (must equal the bytes received so far)
+
+    Returns:
+        Total bytes received after this chunk
+    """
+    path = partial_path(upload_id)
+    digest = _take_digest(upload_id, offset)
+    with open(path, "ab") as target:
+        # Drop anything past the acknowledged offset (e.g. an interrupted chunk)
+        target.truncate(offset)
+        target.seek(offset)
+        _copy_chunks(source, target, offset, digest)
+        size = target.tell()
+    if digest is not None:
+        _store_digest(upload_id, size, digest)
+    return size
+
+
+def finalize_partial(upload_id: uuid.UUID, final_name: str) -> Tuple[str, str]:
+    """
+    Move a finished resumable upload into place.
+
+    Returns:
+        (file path, sha256 hex digest)
+
+    Raises:
+        PartialUploadMissing: The partial file no longer exists
+    """
+    source_path = partial_path(upload_id)
+    with _partial_digests_lock:
+        entry = _partial_digests.pop(upload_id, None)
+    final_path = os.path.join(settings.UPLOAD_DIR, final_name)
+    try:
+        if entry and entry[0] == os.path.getsize(source_path):
+            digest = entry[1]
+        else:
+            # Chunks were hashed by another process: read the file once
+            digest = hashlib.sha256()
+            with open(source_path, "rb") as f:
+                for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        os.replace(source_path, final_path)
+    except FileNotFoundError:
+        raise PartialUploadMissing(f"Upload {upload_id} has no data on disk any more")
+    return final_path, digest.hexdigest()
+
+
+def discard_partial(upload_id: uuid.UUID) -> None:
+    """Delete an unfinished upload's bytes and running digest"""
+    with _partial_digests_lock:
+        _partial_digests.pop(upload_id, None)
+    try:
+        os.remove(partial_path(upload_id))
+    except FileNotFoundError:
+        pass
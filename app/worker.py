@@ -0,0 +1,158 @@
+"""
+Workflow Worker - Runs queued agent workflows outside the API process
+
+Usage:
+    python -m app.worker
+
+Start as many workers as needed, on as many machines as needed. They
+coordinate only through the jobs table (see app/core/job_queue.py).
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.job_queue import BATCH_WORKFLOW_JOB_TYPE, claim_next_job, finish_job, heartbeat_jobs, requeue_stale_jobs
+from app.core.executor import run_db_call
+from app.core.orchestrator import AgentOrchestrator
+from app.db.session import get_session_local
+from app.db.migrate import check_schema_version
+from app.db.models import Job
+
+
+class WorkflowWorker:
+    """
+    Polls the job queue and runs up to `concurrency` workflows at once,
+    keeping the heartbeat of every workflow it runs fresh.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY
+        self.poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL_SECONDS
+        self.stale_after = timedelta(minutes=settings.JOB_STALE_AFTER_MINUTES)
+        self._stopping = False
+        self._last_stale_check = 0.0
+        self._running: Set[uuid.UUID] = set()
+
+    def stop(self):
+        """Finish running workflows, then exit"""
+        print(f"[WORKER {self.worker_id}] Shutting down after current workflows...")
+        self._stopping = True
+
+    def _claim(self) -> Optional[Tuple[uuid.UUID, uuid.UUID, str, Dict[str, Any]]]:
+        """Claim one queued workflow; returns (job_id, project_id, job_type, options)"""
+        db = get_session_local()()
+        try:
+            if time.monotonic() - self._last_stale_check > 60:
+                self._last_stale_check = time.monotonic()
+                requeued = requeue_stale_jobs(db, self.stale_after)
+                if requeued:
+                    print(f"[WORKER {self.worker_id}] Requeued {requeued} stale workflow(s)")
+
+            job = claim_next_job(db)
+            if not job:
+                return None
+            return job.id, job.project_id, job.job_type, job.input_payload or {}
+        finally:
+            db.close()
+
+    def _finish(self, db, job_id: uuid.UUID, result: dict):
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job:
+            finish_job(db, job, result)
+
+    def _heartbeat(self, job_ids):
+        db = get_session_local()()
+        try:
+            heartbeat_jobs(db, job_ids)
+        finally:
+            db.close()
+
+    async def _heartbeat_loop(self):
+        """Refresh heartbeat_at of the running workflows until cancelled"""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                await run_db_call(self._heartbeat, list(self._running))
+            except Exception as e:
+                print(f"[WORKER {self.worker_id}] Heartbeat failed: {e}")
+
+    async def _process(self, job_id: uuid.UUID, project_id: uuid.UUID, job_type: str, options: Dict[str, Any]):
+        """Run one claimed workflow with its own database session"""
+        db = get_session_local()()
+        self._running.add(job_id)
+        try:
+            print(f"[WORKER {self.worker_id}] Running workflow {job_id} for project {project_id}")
+            orchestrator = AgentOrchestrator(db)
+            try:
+                retry_job_id = options.get("retry_job_id")
+                result = await orchestrator.start_workflow(
+                    project_id,
+                    force=bool(options.get("force")),
+                    retry_job_id=uuid.UUID(retry_job_id) if retry_job_id else None,
+                    batched=job_type == BATCH_WORKFLOW_JOB_TYPE
+                )
+            except Exception as e:
+                await run_db_call(db.rollback)
+                result = {"status": "error", "message": f"Workflow failed: {str(e)}"}
+
+            await run_db_call(self._finish, db, job_id, result)
+            print(f"[WORKER {self.worker_id}] Workflow {job_id} finished: {result.get('status')}")
+        finally:
+            self._running.discard(job_id)
+            await run_db_call(db.close)
+
+    async def run(self):
+        """Main loop: claim work while there are free slots"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on Windows event loops
+
+        print(f"[WORKER {self.worker_id}] Started (concurrency={self.concurrency})")
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+        while not self._stopping:
+            await slots.acquire()
+            try:
+                claimed = await run_db_call(self._claim)
+            except Exception as e:
+                print(f"[WORKER {self.worker_id}] Could not poll queue: {e}")
+                claimed = None
+
+            if not claimed:
+                slots.release()
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self._process(*claimed))
+            task.add_done_callback(lambda t: slots.release())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        heartbeat.cancel()
+
+
+def main():
+    check_schema_version()
+    worker = WorkflowWorker()
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Index benchmark - query plans for the hot per-user/per-project queries,
+with and without the indexes from migration 0002_query_indexes.
+
+Usage (PostgreSQL, after `alembic upgrade head`):
+    python benchmark_indexes.py                 # seed ~1M jobs, then compare plans
+    python benchmark_indexes.py --jobs 200000   # smaller dataset
+    python benchmark_indexes.py --cleanup       # remove the seeded data
+
+The data belongs to a dedicated benchmark user and is generated in SQL
+(generate_series), so seeding takes seconds rather than hours. The
+"before" plans run inside a transaction that drops the indexes and is then
+rolled back, so the database is never left without them. That transaction
+locks the tables while it runs: use a development or staging database.
+"""
+
+import argparse
+import time
+from sqlalchemy import text
+from app.db.session import get_engine
+
+BENCH_EMAIL = "index-benchmark@example.com"
+
+INDEXES = [
+    "ix_projects_user_id_created_at",
+    "ix_jobs_project_id_created_at",
+    "ix_jobs_project_id_job_type_status",
+    "ix_jobs_job_type_status_created_at",
+    "ix_assets_project_id_created_at",
+]
+
+# The queries behind list_projects, get_project, get_project_jobs,
+# get_project_assets, get_workflow_status and the worker's queue poll
+QUERIES = {
+    "list_projects": """
+        SELECT * FROM projects WHERE user_id = :user_id
+        ORDER BY created_at DESC LIMIT 100
+    """,
+    "project_jobs": """
+        SELECT * FROM jobs WHERE project_id = :project_id ORDER BY created_at
+    """,
+    "project_job_count": """
+        SELECT COUNT(*) FROM jobs WHERE project_id = :project_id
+    """,
+    "latest_job": """
+        SELECT status FROM jobs WHERE project_id = :project_id
+        ORDER BY created_at DESC LIMIT 1
+    """,
+    "stage_lookup": """
+        SELECT * FROM jobs WHERE project_id = :project_id
+        AND job_type = 'CONTENT_GENERATION' AND status = 'completed'
+    """,
+    "project_assets": """
+        SELECT * FROM assets WHERE project_id = :project_id ORDER BY created_at
+    """,
+    "queue_poll": """
+        SELECT id FROM jobs WHERE job_type = 'WORKFLOW' AND status = 'queued'
+        ORDER BY created_at LIMIT 1
+    """,
+}
+
+JOB_TYPES = ["VISION_ANALYSIS", "MARKET_RESEARCH", "CONTENT_GENERATION", "IMAGE_GENERATION", "WORKFLOW"]
+STATUSES = ["completed", "completed", "completed", "failed", "queued"]
+
+
+def seed(conn, total_jobs: int, jobs_per_project: int = 10):
+    user_id = conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": BENCH_EMAIL}).scalar()
+    if user_id is not None:
+        existing = conn.execute(text(
+            "SELECT COUNT(*) FROM jobs j JOIN projects p ON p.id = j.project_id WHERE p.user_id = :user_id"
+        ), {"user_id": user_id}).scalar()
+        print(f"Benchmark data already present ({existing} jobs)")
+        return
+
+    projects = max(1, total_jobs // jobs_per_project)
+    start = time.time()
+    print(f"Seeding {projects} projects and {total_jobs} jobs...")
+
+    # Spread the projects over many users, as in production: the benchmark
+    # user owns 1% of them
+    conn.execute(text("""
+        INSERT INTO users (id, email, password_hash, is_active)
+        SELECT gen_random_uuid(), 'bench-' || g || '@example.com', 'x', true
+        FROM generate_series(1, 99) g
+        UNION ALL
+        SELECT gen_random_uuid(), :email, 'x', true
+    """), {"email": BENCH_EMAIL})
+
+    conn.execute(text("""
+        INSERT INTO projects (id, user_id, product_name, status, created_at)
+        SELECT gen_random_uuid(), u.id, 'Benchmark product ' || g, 'completed',
+               now() - (g || ' seconds')::interval
+        FROM generate_series(1, :projects) g
+        JOIN LATERAL (
+            SELECT id FROM users
+            WHERE email LIKE 'bench-%@example.com' OR email = :email
+            ORDER BY email OFFSET (g % 100) LIMIT 1
+        ) u ON true
+    """), {"projects": projects, "email": BENCH_EMAIL})
+
+    conn.execute(text("""
+        INSERT INTO jobs (id, project_id, job_type, status, created_at)
+        SELECT gen_random_uuid(), p.id,
+               (:job_types)[1 + (g % 5)], (:statuses)[1 + ((g / 5) % 5)],
+               p.created_at + (g || ' seconds')::interval
+        FROM projects p
+        JOIN users u ON u.id = p.user_id
+        CROSS JOIN generate_series(1, :per_project) g
+        WHERE u.email LIKE 'bench-%@example.com' OR u.email = :email
+    """), {"per_project": jobs_per_project, "job_types": JOB_TYPES, "statuses": STATUSES, "email": BENCH_EMAIL})
+
+    conn.execute(text("""
+        INSERT INTO assets (id, project_id, asset_type, content, created_at)
+        SELECT gen_random_uuid(), p.id, 'blog_post', 'benchmark', p.created_at
+        FROM projects p JOIN users u ON u.id = p.user_id
+        WHERE u.email LIKE 'bench-%@example.com' OR u.email = :email
+    """), {"email": BENCH_EMAIL})
+
+    conn.execute(text("ANALYZE users; ANALYZE projects; ANALYZE jobs; ANALYZE assets"))
+    print(f"Seeded in {time.time() - start:.1f}s")
+
+
+def cleanup(conn):
+    conn.execute(text(
+        "DELETE FROM users WHERE email LIKE 'bench-%@example.com' OR email = :email"
+    ), {"email": BENCH_EMAIL})
+    print("Benchmark data removed")
+
+
+def explain(conn, params):
+    plans = {}
+    for name, query in QUERIES.items():
+        rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"), params).scalars().all()
+        plans[name] = rows
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1_000_000, help="Number of jobs to seed")
+    parser.add_argument("--cleanup", action="store_true", help="Remove the seeded data and exit")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The index benchmark needs PostgreSQL")
+
+    with engine.begin() as conn:
+        if args.cleanup:
+            cleanup(conn)
+            return
+        seed(conn, args.jobs)
+
+    with engine.connect() as conn:
+        params = {}
+        params["user_id"] = conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": BENCH_EMAIL}).scalar()
+        params["project_id"] = conn.execute(text(
+            "SELECT id FROM projects WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 1"
+        ), {"user_id": params["user_id"]}).scalar()
+        conn.commit()
+
+        # Before: drop the indexes inside a transaction that is rolled back
+        transaction = conn.begin()
+        for index in INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        before = explain(conn, params)
+        transaction.rollback()
+
+        with conn.begin():
+            after = explain(conn, params)
+
+    for name in QUERIES:
+        print("=" * 78)
+        print(name)
+        print("-" * 36 + " before " + "-" * 34)
+        print("\n".join(before[name]))
+        print("-" * 36 + " after " + "-" * 35)
+        print("\n".join(after[name]))
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,37 @@ def fix_db_schema():
                 print(f"Successfully added {col}")
             else:
                 print(f"Column {col} already exists.")
+        
+        # user_sessions: revoked_at (logout) and the switch from the plain
+        # token column to token_digest. Same steps as migration 0001_baseline,
+        # for databases still bootstrapped with create_all
+        result = conn.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name='user_sessions';
+        """))
+        session_columns = [row[0] for row in result]
+        
+        if session_columns:
+            if "revoked_at" not in session_columns:
+                print("Adding missing column: user_sessions.revoked_at...")
+                conn.execute(text("ALTER TABLE user_sessions ADD COLUMN revoked_at TIMESTAMP;"))
+            if "token" in session_columns:
+                # Stored tokens cannot be turned into usable digests: everyone logs in again
+                print("Replacing user_sessions.token with token_digest (existing sessions are dropped)...")
+                conn.execute(text("DELETE FROM user_sessions;"))
+                conn.execute(text("ALTER TABLE user_sessions DROP COLUMN token;"))
+            if "token_digest" not in session_columns:
+                conn.execute(text("ALTER TABLE user_sessions ADD COLUMN token_digest VARCHAR(64) NOT NULL;"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_user_sessions_token_digest_expires_at "
+                "ON user_sessions (token_digest, expires_at);"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_user_sessions_expires_at ON user_sessions (expires_at);"
+            ))
+            conn.commit()
+            print("user_sessions is up to date.")
     
     print("Database schema is now up to date!")
 
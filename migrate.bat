@@ -0,0 +1,11 @@
+@echo off
+echo ============================================================
+echo Applying Catalyst AI Database Migrations
+echo ============================================================
+echo.
+echo Run once per deploy, before start_server.bat / start_worker.bat
+echo.
+echo ============================================================
+echo.
+
+python -m app.db.migrate %*
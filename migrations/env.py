@@ -0,0 +1,50 @@
+"""
+Alembic environment - runs migrations against DATABASE_URL
+
+Models are imported so that `alembic revision --autogenerate` compares the
+database with app/db/models.py.
+"""
+
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.core.config import settings
+from app.db.session import Base
+from app.db import models  # Import models to register them with Base
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of connecting (alembic upgrade --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # NullPool: migrations run once, no need to keep connections around
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
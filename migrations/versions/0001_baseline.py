@@ -0,0 +1,146 @@
+"""Baseline schema
+
+Creates every table on an empty database. On a database created earlier by
+Base.metadata.create_all (or patched with fix_db.py), only what is missing
+is added, so existing installations can run `alembic upgrade head` as-is:
+
+- missing tables are created
+- projects gains the marketing strategy columns if absent
+- user_sessions moves from the plain `token` column to `token_digest`; the
+  old rows cannot be converted usefully and are deleted (users log in again)
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _columns(table):
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table):
+    return {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    tables = _tables()
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.Text(), nullable=False, unique=True),
+            sa.Column("password_hash", sa.Text(), nullable=False),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        )
+
+    if "projects" not in tables:
+        op.create_table(
+            "projects",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE")),
+            sa.Column("product_name", sa.Text()),
+            sa.Column("brand_name", sa.Text()),
+            sa.Column("price", sa.Text()),
+            sa.Column("description", sa.Text()),
+            sa.Column("image_path", sa.Text()),
+            sa.Column("status", sa.Text()),
+            sa.Column("campaign_goal", sa.Text()),
+            sa.Column("target_audience", sa.Text()),
+            sa.Column("brand_persona", sa.Text()),
+            sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        )
+    else:
+        # Columns fix_db.py used to add by hand
+        existing = _columns("projects")
+        for name in ("campaign_goal", "target_audience", "brand_persona"):
+            if name not in existing:
+                op.add_column("projects", sa.Column(name, sa.Text()))
+
+    if "jobs" not in tables:
+        op.create_table(
+            "jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("project_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("projects.id", ondelete="CASCADE")),
+            sa.Column("job_type", sa.Text(), nullable=False),
+            sa.Column("status", sa.Text()),
+            sa.Column("input_payload", postgresql.JSONB()),
+            sa.Column("output_payload", postgresql.JSONB()),
+            sa.Column("error_message", sa.Text()),
+            sa.Column("started_at", sa.TIMESTAMP()),
+            sa.Column("completed_at", sa.TIMESTAMP()),
+            sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        )
+
+    if "user_sessions" not in tables:
+        op.create_table(
+            "user_sessions",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("token_digest", sa.String(64), nullable=False),
+            sa.Column("expires_at", sa.TIMESTAMP(), nullable=False),
+            sa.Column("revoked_at", sa.TIMESTAMP()),
+            sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        )
+    else:
+        existing = _columns("user_sessions")
+        # batch mode also works on SQLite, which cannot drop a UNIQUE column in place
+        with op.batch_alter_table("user_sessions") as batch:
+            if "token" in existing:
+                op.execute("DELETE FROM user_sessions")
+                batch.drop_column("token")
+            if "token_digest" not in existing:
+                batch.add_column(sa.Column("token_digest", sa.String(64), nullable=False))
+            if "revoked_at" not in existing:
+                batch.add_column(sa.Column("revoked_at", sa.TIMESTAMP()))
+
+    indexes = _indexes("user_sessions")
+    if "ix_user_sessions_token_digest_expires_at" not in indexes:
+        op.create_index("ix_user_sessions_token_digest_expires_at", "user_sessions", ["token_digest", "expires_at"])
+    if "ix_user_sessions_expires_at" not in indexes:
+        op.create_index("ix_user_sessions_expires_at", "user_sessions", ["expires_at"])
+
+    if "assets" not in tables:
+        op.create_table(
+            "assets",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("project_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("asset_type", sa.Text(), nullable=False),
+            sa.Column("content", sa.Text()),
+            sa.Column("file_url", sa.Text()),
+            sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        )
+
+    if "uploads" not in tables:
+        op.create_table(
+            "uploads",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("filename", sa.Text()),
+            sa.Column("content_type", sa.Text()),
+            sa.Column("status", sa.Text()),
+            sa.Column("bytes_received", sa.BigInteger()),
+            sa.Column("sha256", sa.Text()),
+            sa.Column("file_path", sa.Text()),
+            sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        )
+
+
+def downgrade():
+    for table in ("uploads", "assets", "user_sessions", "jobs", "projects", "users"):
+        op.drop_table(table)
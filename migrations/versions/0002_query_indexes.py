@@ -0,0 +1,44 @@
+"""Indexes for per-user and per-project queries
+
+Nearly every endpoint filters projects by user_id and jobs/assets by
+project_id; without these indexes each of those is a full table scan.
+On PostgreSQL the indexes are built CONCURRENTLY so large jobs tables stay
+writable during the upgrade. See benchmark_indexes.py for query plans
+before and after.
+
+Revision ID: 0002_query_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0002_query_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_projects_user_id_created_at", "projects", ["user_id", "created_at"]),
+    ("ix_jobs_project_id_created_at", "jobs", ["project_id", "created_at"]),
+    ("ix_jobs_project_id_job_type_status", "jobs", ["project_id", "job_type", "status"]),
+    ("ix_jobs_job_type_status_created_at", "jobs", ["job_type", "status", "created_at"]),
+    ("ix_assets_project_id_created_at", "assets", ["project_id", "created_at"]),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
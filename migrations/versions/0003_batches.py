@@ -0,0 +1,55 @@
+"""Batches for bulk project imports
+
+Adds the batches table and projects.batch_id, with an index for the batch
+progress query (a batch's projects grouped by status).
+
+Revision ID: 0003_batches
+Revises: 0002_query_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003_batches"
+down_revision = "0002_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "batches",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("source_filename", sa.Text()),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+
+    # A nullable column without a default is a metadata-only change on
+    # PostgreSQL; batch mode is for SQLite, which cannot add the foreign key
+    with op.batch_alter_table("projects") as batch:
+        batch.add_column(sa.Column("batch_id", postgresql.UUID(as_uuid=True)))
+        batch.create_foreign_key(
+            "fk_projects_batch_id_batches", "batches",
+            ["batch_id"], ["id"], ondelete="SET NULL"
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_projects_batch_id_status", "projects", ["batch_id", "status"],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_projects_batch_id_status", table_name="projects", postgresql_concurrently=True, if_exists=True)
+    with op.batch_alter_table("projects") as batch:
+        batch.drop_constraint("fk_projects_batch_id_batches", type_="foreignkey")
+        batch.drop_column("batch_id")
+    op.drop_table("batches")
@@ -0,0 +1,28 @@
+"""Heartbeat for running workflow jobs
+
+Workers refresh jobs.heartbeat_at while a workflow runs; stale-job recovery
+looks at it instead of started_at, so long workflows are not requeued while
+their worker is still alive.
+
+Revision ID: 0004_job_heartbeat
+Revises: 0003_batches
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_job_heartbeat"
+down_revision = "0003_batches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable without a default: metadata-only on PostgreSQL
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.TIMESTAMP()))
+
+
+def downgrade():
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("heartbeat_at")
@@ -0,0 +1,13 @@
+@echo off
+echo ============================================================
+echo Starting Catalyst AI Workflow Worker
+echo ============================================================
+echo.
+echo Processes workflows queued by POST /jobs/start/{project_id}
+echo Run several of these to process more projects in parallel
+echo Press Ctrl+C to stop the worker
+echo.
+echo ============================================================
+echo.
+
+python -m app.worker
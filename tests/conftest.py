@@ -0,0 +1,91 @@
+"""
+Shared fixtures: an SQLite database and upload directory per test run.
+
+Settings are read when app modules are imported, so the environment is set
+before anything from app/ is loaded.
+"""
+
+import asyncio
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="catalyst-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["USE_MOCK_AGENTS"] = "true"
+os.environ["SCHEMA_VERSION_CHECK"] = "off"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+from app.api.auth import get_current_user  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.orchestrator import AgentOrchestrator  # noqa: E402
+from app.db import models  # noqa: E402  (registers the tables)
+from app.db.session import Base, get_engine, get_session_local  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables"""
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = get_session_local()()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    user = models.User(email="owner@example.com", password_hash="x", is_active=True)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def make_project(db, user):
+    """Create projects owned by `user`; fields override the defaults"""
+    def make(**fields):
+        fields = dict({"product_name": "Mug", "status": "created"}, **fields)
+        project = models.Project(user_id=user.id, **fields)
+        db.add(project)
+        db.commit()
+        return project
+    return make
+
+
+@pytest.fixture
+def run_workflow(db):
+    """Run a project's workflow to completion in its own session, as the worker does"""
+    def run(project_id, **options):
+        session = get_session_local()()
+        try:
+            return asyncio.run(AgentOrchestrator(session).start_workflow(project_id, **options))
+        finally:
+            session.close()
+    return run
+
+
+@pytest.fixture
+def client(db, user, monkeypatch, tmp_path):
+    """An API client logged in as `user`, storing files under tmp_path"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.auth_cache import AuthCache, UserSnapshot, token_digest
+from app.db.models import UserSession
+
+
+@pytest.fixture
+def cache():
+    return AuthCache(max_entries=3, ttl_seconds=60, poll_seconds=0)
+
+
+def _snapshot(user):
+    return UserSnapshot(id=user.id, email=user.email, is_active=True)
+
+
+def _expires_in(seconds):
+    return time.time() + seconds
+
+
+def test_cached_until_token_expiry_or_ttl(cache, user):
+    cache.put("fresh", _snapshot(user), _expires_in(3600))
+    cache.put("expired", _snapshot(user), _expires_in(-1))
+
+    assert cache.get("fresh") == _snapshot(user)
+    assert cache.get("expired") is None
+    assert cache.get("unknown") is None
+
+
+def test_least_recently_used_entry_is_evicted(cache, user):
+    for token in ("a", "b", "c"):
+        cache.put(token, _snapshot(user), _expires_in(3600))
+    cache.get("a")
+    cache.put("d", _snapshot(user), _expires_in(3600))
+
+    assert cache.get("b") is None
+    assert all(cache.get(token) for token in ("a", "c", "d"))
+
+
+def test_local_revocation_is_immediate_and_sticky(cache, user):
+    cache.put("token", _snapshot(user), _expires_in(3600))
+
+    cache.revoke("token", _expires_in(3600))
+
+    assert cache.get("token") is None
+    cache.put("token", _snapshot(user), _expires_in(3600))
+    assert cache.get("token") is None
+
+
+def _session(db, user, token, revoked_at=None, expires_in=timedelta(hours=1)):
+    db.add(UserSession(
+        user_id=user.id,
+        token_digest=token_digest(token),
+        expires_at=datetime.utcnow() + expires_in,
+        revoked_at=revoked_at
+    ))
+    db.commit()
+
+
+def test_revocations_from_other_processes_are_polled(cache, db, user):
+    cache.put("kept", _snapshot(user), _expires_in(3600))
+    cache.put("logged-out", _snapshot(user), _expires_in(3600))
+    _session(db, user, "kept")
+    _session(db, user, "logged-out", revoked_at=datetime.utcnow())
+
+    cache.refresh_revocations(db)
+
+    assert cache.get("kept") is not None
+    assert cache.get("logged-out") is None
+
+
+def test_later_polls_pick_up_new_revocations(cache, db, user):
+    _session(db, user, "token")
+    cache.refresh_revocations(db)
+    cache.put("token", _snapshot(user), _expires_in(3600))
+
+    db.query(UserSession).update({UserSession.revoked_at: datetime.utcnow()})
+    db.commit()
+    cache.refresh_revocations(db)
+
+    assert cache.get("token") is None
+
+
+def test_poll_interval_limits_queries(db, user):
+    cache = AuthCache(max_entries=10, ttl_seconds=60, poll_seconds=3600)
+    cache.refresh_revocations(db)
+    cache.put("token", _snapshot(user), _expires_in(3600))
+    _session(db, user, "token", revoked_at=datetime.utcnow())
+
+    cache.refresh_revocations(db)
+
+    # Not polled again yet: the revocation is seen after the interval
+    assert cache.get("token") is not None
@@ -0,0 +1,140 @@
+import os
+import uuid
+
+import pytest
+
+from app.api import batches
+from app.api.batches import _batch_status
+from app.core.job_queue import BATCH_WORKFLOW_JOB_TYPE
+from app.db.models import Batch, Job, Project, Upload
+
+
+def _post(client, catalog, images=(), start=True):
+    files = [("products", ("catalog.csv", catalog, "text/csv"))]
+    files += [("images", (name, b"\x89PNG", "image/png")) for name in images]
+    return client.post("/batches/", files=files, data={"start": str(start).lower()})
+
+
+def _completed_upload(db, user, tmp_path):
+    path = tmp_path / "uploaded.png"
+    path.write_bytes(b"\x89PNG")
+    upload = Upload(user_id=user.id, filename="uploaded.png", status="completed", file_path=str(path))
+    db.add(upload)
+    db.commit()
+    return upload
+
+
+def test_rows_are_created_and_queued_as_batch_workflows(db, client, user, tmp_path):
+    upload = _completed_upload(db, user, tmp_path)
+    catalog = (
+        "product_name,price,image,upload_id\n"
+        "Mug,12,mug.png,\n"
+        "Cup,8,,\n"
+        f"Plate,20,,{upload.id}\n"
+    )
+
+    response = _post(client, catalog, images=["mug.png", "unused.png"])
+
+    assert response.status_code == 201
+    body = response.json()
+    assert (body["total"], body["status"], body["counts"]) == (3, "queued", {"queued": 3})
+    projects = {project.product_name: project for project in db.query(Project)}
+    assert os.path.exists(projects["Mug"].image_path)
+    assert projects["Cup"].image_path is None
+    assert projects["Plate"].image_path == upload.file_path
+    # Only the referenced image is stored
+    assert db.query(Upload).filter(Upload.filename == "unused.png").count() == 0
+    jobs = db.query(Job).all()
+    assert {job.job_type for job in jobs} == {BATCH_WORKFLOW_JOB_TYPE}
+    assert {job.input_payload["batch_id"] for job in jobs} == {body["id"]}
+    assert {job.project_id for job in jobs} == {project.id for project in projects.values()}
+
+
+def test_without_start_no_workflow_is_queued(db, client):
+    response = _post(client, "product_name\nMug\n", start=False)
+
+    assert response.json()["status"] == "created"
+    assert db.query(Project).one().status == "created"
+    assert db.query(Job).count() == 0
+
+
+def test_invalid_rows_create_nothing(db, client, user, tmp_path):
+    catalog = (
+        "product_name,price,image,upload_id\n"
+        "Mug,12,mug.png,\n"
+        ",8,,\n"
+        "Cup,8,missing.png,\n"
+        "Plate,8,mug.png,%s\n"
+        "Bowl,8,,not-a-uuid\n"
+        "Jug,8,,%s\n"
+    ) % (uuid.uuid4(), uuid.uuid4())
+
+    response = _post(client, catalog, images=["mug.png"])
+
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert [error.split(":")[0] for error in detail] == ["Row 2", "Row 3", "Row 4", "Row 5"]
+    assert "image 'missing.png' was not sent" in detail[1]
+    assert (db.query(Batch).count(), db.query(Project).count(), db.query(Upload).count()) == (0, 0, 0)
+    assert not os.listdir(tmp_path)
+
+
+def test_unknown_upload_is_reported_once_rows_are_valid(db, client):
+    response = _post(client, f"product_name,upload_id\nMug,{uuid.uuid4()}\n")
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == ["Row 1: upload not found or not completed"]
+
+
+def test_reported_errors_are_capped(client, monkeypatch):
+    monkeypatch.setattr(batches, "MAX_REPORTED_ERRORS", 2)
+
+    detail = _post(client, "product_name,price\n" + ",1\n" * 5).json()["detail"]
+
+    assert len(detail) == 3
+    assert detail[-1] == "... and 3 more"
+
+
+def test_failed_insert_removes_saved_images(db, client, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("insert failed")
+
+    def remove_fails(path):
+        raise OSError("busy")
+
+    monkeypatch.setattr(batches, "add_batch_workflows", fail)
+    response = _post(client, "product_name,image\nMug,mug.png\n", images=["mug.png"])
+
+    assert response.status_code == 500
+    assert db.query(Batch).count() == 0
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".png")]
+
+    # A cleanup failure does not replace the original error
+    monkeypatch.setattr(batches.os, "remove", remove_fails)
+    response = _post(client, "product_name,image\nMug,mug.png\n", images=["mug.png"])
+    assert response.json()["detail"] == "Database error: insert failed"
+
+
+def test_progress_counts_projects_by_status(db, client):
+    batch_id = _post(client, "product_name\nMug\nCup\nPlate\n").json()["id"]
+    mug, cup = db.query(Project).filter(Project.product_name.in_(["Mug", "Cup"]))
+    mug.status, cup.status = "completed", "processing"
+    db.commit()
+
+    body = client.get(f"/batches/{batch_id}").json()
+
+    assert body["status"] == "processing"
+    assert body["counts"] == {"completed": 1, "processing": 1, "queued": 1}
+    assert client.get(f"/batches/{uuid.uuid4()}").status_code == 404
+
+
+@pytest.mark.parametrize("counts, expected", [
+    ({"created": 2}, "created"),
+    ({"queued": 2}, "queued"),
+    ({"queued": 1, "processing": 1}, "processing"),
+    ({"queued": 1, "failed": 1}, "processing"),
+    ({"completed": 1, "failed": 1}, "finished"),
+    ({}, "created"),
+])
+def test_batch_status(counts, expected):
+    assert _batch_status(counts) == expected
@@ -0,0 +1,53 @@
+import base64
+import hashlib
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.utils.blob_store import BlobTooLarge, blob_dir, blob_path, store_chunks, store_remote
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+
+
+def test_blobs_are_named_by_content_hash():
+    name, sha256 = store_chunks([b"ab", b"cd"], ".png")
+
+    assert sha256 == hashlib.sha256(b"abcd").hexdigest()
+    assert name == f"{sha256}.png"
+    with open(blob_path(name), "rb") as f:
+        assert f.read() == b"abcd"
+
+
+def test_identical_content_is_stored_once():
+    first, _ = store_chunks([b"same"], ".png")
+    second, _ = store_chunks([b"sa", b"me"], ".png")
+
+    assert first == second
+    assert os.listdir(blob_dir()) == [first]
+
+
+def test_data_url_is_decoded():
+    data_url = "data:image/png;base64," + base64.b64encode(b"\x89PNG").decode()
+
+    name, sha256 = store_remote(data_url)
+
+    assert sha256 == hashlib.sha256(b"\x89PNG").hexdigest()
+    assert name.endswith(".png")
+
+
+def test_oversized_blob_leaves_no_file(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 3)
+
+    with pytest.raises(BlobTooLarge):
+        store_chunks([b"ab", b"cd"], ".png")
+
+    assert os.listdir(blob_dir()) == []
+
+
+@pytest.mark.parametrize("name", ["../secret.png", "abc.png", "A" * 64 + ".png"])
+def test_blob_path_rejects_other_names(name):
+    assert blob_path(name) is None
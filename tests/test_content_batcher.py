@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from app.core.agent_wrapper import AgentWrapper, ContentBatcher
+
+
+class FakeContentAgent:
+    """Answers batched and single requests; `drop` names products left out of batches"""
+
+    def __init__(self, fail_batch=False, fail_single=(), drop=()):
+        self.fail_batch = fail_batch
+        self.fail_single = set(fail_single)
+        self.drop = set(drop)
+        self.batches = []
+        self.singles = []
+        self.threads = []
+
+    def generate_content_batch(self, items):
+        self.batches.append([product["product_name"] for product, _ in items])
+        self.threads.append(threading.current_thread().name)
+        if self.fail_batch:
+            raise RuntimeError("malformed batch response")
+        return [
+            None if product["product_name"] in self.drop else {"for": product["product_name"], "batched": True}
+            for product, _ in items
+        ]
+
+    def generate_content(self, product, market):
+        self.singles.append(product["product_name"])
+        if product["product_name"] in self.fail_single:
+            raise RuntimeError("single request failed")
+        return {"for": product["product_name"], "batched": False}
+
+
+def _submit_all(batcher, names):
+    results = {}
+
+    def submit(name):
+        try:
+            results[name] = batcher.submit({"product_name": name}, {"reviews": []})
+        except Exception as e:
+            results[name] = e
+
+    threads = [threading.Thread(target=submit, args=(name,), name=f"caller-{name}") for name in names]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+def test_concurrent_requests_share_one_call():
+    agent = FakeContentAgent()
+
+    results = _submit_all(ContentBatcher(agent, max_products=3, window_seconds=5), ["a", "b", "c"])
+
+    assert len(agent.batches) == 1
+    assert sorted(agent.batches[0]) == ["a", "b", "c"]
+    assert all(results[name] == {"for": name, "batched": True} for name in "abc")
+
+
+def test_lone_request_is_sent_when_window_closes():
+    agent = FakeContentAgent()
+
+    results = _submit_all(ContentBatcher(agent, max_products=4, window_seconds=0.05), ["a"])
+
+    assert agent.batches == [["a"]]
+    assert results["a"]["for"] == "a"
+
+
+def test_batches_are_sent_from_a_caller_thread():
+    agent = FakeContentAgent()
+
+    # Two full batches and one sent when its window closes
+    _submit_all(ContentBatcher(agent, max_products=2, window_seconds=0.2), ["a", "b", "c", "d", "e"])
+
+    assert sorted(len(batch) for batch in agent.batches) == [1, 2, 2]
+    assert all(name.startswith("caller-") for name in agent.threads)
+
+
+def test_products_missing_from_answer_are_generated_alone():
+    agent = FakeContentAgent(drop={"b"})
+
+    results = _submit_all(ContentBatcher(agent, max_products=2, window_seconds=5), ["a", "b"])
+
+    assert agent.singles == ["b"]
+    assert results["b"] == {"for": "b", "batched": False}
+
+
+def test_failed_batch_is_retried_per_product():
+    agent = FakeContentAgent(fail_batch=True, fail_single={"b"})
+
+    results = _submit_all(ContentBatcher(agent, max_products=3, window_seconds=5), ["a", "b", "c"])
+
+    assert sorted(agent.singles) == ["a", "b", "c"]
+    assert results["a"] == {"for": "a", "batched": False}
+    assert results["c"] == {"for": "c", "batched": False}
+    assert isinstance(results["b"], RuntimeError)
+
+
+class RecordingBatcher:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, product_data, market_data):
+        self.submitted.append(product_data["product_name"])
+        return {"linkedin_post": "batched"}
+
+
+class DirectContentAgent:
+    def __call__(self, state):
+        state["generated_content"] = {"linkedin_post": "direct"}
+        return state
+
+    def record_content(self, state, generated):
+        state["generated_content"] = generated
+        return state
+
+
+def _real_agent_wrapper():
+    wrapper = AgentWrapper.__new__(AgentWrapper)
+    wrapper.use_mock = False
+    wrapper.content_agent = DirectContentAgent()
+    wrapper.content_batcher = RecordingBatcher()
+    return wrapper
+
+
+def test_only_batch_workflows_use_the_batcher():
+    # Builds the agent state from app.agents, which needs the agent dependencies
+    pytest.importorskip("langchain_core")
+    wrapper = _real_agent_wrapper()
+    product, market = {"product_name": "Mug"}, {"reviews": []}
+
+    assert wrapper.run_content_generation(product, market) == {"linkedin_post": "direct"}
+    assert wrapper.content_batcher.submitted == []
+
+    assert wrapper.run_content_generation(product, market, batched=True) == {"linkedin_post": "batched"}
+    assert wrapper.content_batcher.submitted == ["Mug"]
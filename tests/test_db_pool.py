@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.metrics import metrics
+from app.db.session import InstrumentedQueuePool, _instrument_pool, get_async_engine, get_engine
+
+
+def _pool_engine(creator):
+    engine = create_engine(
+        "sqlite://", creator=creator, poolclass=InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.01
+    )
+    _instrument_pool(engine)
+    return engine
+
+
+def test_sync_and_async_pools_report_separately(db):
+    get_async_engine()
+    checkouts = metrics.get("db_pool_checkouts_total")
+    async_checkouts = metrics.get("db_async_pool_checkouts_total")
+
+    with get_engine().connect():
+        assert metrics.get("db_pool_checked_out") >= 1
+
+    assert metrics.get("db_pool_checkouts_total") == checkouts + 1
+    assert metrics.get("db_async_pool_checkouts_total") == async_checkouts
+
+
+def test_only_pool_timeouts_are_counted(tmp_path):
+    path = str(tmp_path / "pool.db")
+    engine = _pool_engine(lambda: sqlite3.connect(path, check_same_thread=False))
+    timeouts = metrics.get("db_pool_timeouts_total")
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert metrics.get("db_pool_timeouts_total") == timeouts + 1
+
+    def refused():
+        raise sqlite3.OperationalError("connection refused")
+
+    with pytest.raises(exc.OperationalError):
+        _pool_engine(refused).connect()
+    assert metrics.get("db_pool_timeouts_total") == timeouts + 1
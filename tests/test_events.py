@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from app.core.events import MAX_PAYLOAD_BYTES, MAX_TRUNCATED_STRING_CHARS, _encode, publish_event
+
+
+def _job_event(**extra):
+    return dict(type="job", project_id="p-1", job_id="j-1", stage="CONTENT_GENERATION", status="failed", **extra)
+
+
+def _size(payload: str) -> int:
+    return len(payload.encode())
+
+
+def test_small_event_is_sent_unchanged():
+    event = _job_event(output={"linkedin": "post"}, error=None)
+    assert json.loads(_encode(event)) == event
+
+
+def test_large_output_is_dropped():
+    payload = _encode(_job_event(output={"blog": "x" * 20000}))
+
+    decoded = json.loads(payload)
+    assert _size(payload) <= MAX_PAYLOAD_BYTES
+    assert "output" not in decoded
+    assert decoded["truncated"] is True
+    assert decoded["job_id"] == "j-1"
+
+
+def test_long_error_is_cut_short():
+    payload = _encode(_job_event(error="Traceback\n" + "frame\n" * 5000))
+
+    decoded = json.loads(payload)
+    assert _size(payload) <= MAX_PAYLOAD_BYTES
+    assert decoded["error"].startswith("Traceback")
+    assert len(decoded["error"]) == MAX_TRUNCATED_STRING_CHARS
+    assert decoded["status"] == "failed"
+
+
+@pytest.mark.parametrize("event", [
+    # Many fields, each short enough on its own
+    _job_event(**{f"field_{i}": "y" * MAX_TRUNCATED_STRING_CHARS for i in range(20)}),
+    # Non-ASCII text is escaped and grows six-fold
+    _job_event(error="é" * 10000, detail="ü" * 10000),
+])
+def test_payload_never_exceeds_limit(event):
+    payload = _encode(event)
+
+    decoded = json.loads(payload)
+    assert _size(payload) <= MAX_PAYLOAD_BYTES
+    assert decoded["truncated"] is True
+    for key in ("type", "project_id", "job_id", "stage", "status"):
+        assert decoded[key] == event[key]
+
+
+def test_publish_failure_does_not_reach_caller(db, monkeypatch):
+    from app.core import events
+
+    class BrokenBroker:
+        def publish(self, event):
+            raise RuntimeError("broker down")
+
+    monkeypatch.setattr(events, "get_event_broker", lambda: BrokenBroker())
+
+    publish_event(db, _job_event())
@@ -0,0 +1,75 @@
+import uuid
+
+from app.core.agent_wrapper import AgentWrapper
+from app.core.orchestrator import stage_fingerprint
+from app.db.models import Job
+
+
+def _job(job_id=None):
+    return Job(id=job_id or uuid.uuid4())
+
+
+def test_fingerprint_is_stable():
+    upstream = {"VISION_ANALYSIS": _job(uuid.UUID(int=1))}
+    inputs = {"campaign_goal": "launch", "brand_persona": None}
+
+    assert stage_fingerprint("CONTENT_GENERATION", inputs, upstream) == \
+        stage_fingerprint("CONTENT_GENERATION", dict(reversed(list(inputs.items()))), dict(upstream))
+
+
+def test_fingerprint_changes_with_inputs_stage_and_upstream():
+    upstream = {"VISION_ANALYSIS": _job()}
+    base = stage_fingerprint("CONTENT_GENERATION", {"brand_persona": "bold"}, upstream)
+
+    assert stage_fingerprint("CONTENT_GENERATION", {"brand_persona": "playful"}, upstream) != base
+    assert stage_fingerprint("IMAGE_GENERATION", {"brand_persona": "bold"}, upstream) != base
+    assert stage_fingerprint("CONTENT_GENERATION", {"brand_persona": "bold"}, {"VISION_ANALYSIS": _job()}) != base
+
+
+def test_fingerprint_includes_version(monkeypatch):
+    from app.core import orchestrator
+
+    before = stage_fingerprint("MARKET_RESEARCH", {"product_name": "Mug"}, {})
+    monkeypatch.setattr(orchestrator, "FINGERPRINT_VERSION", orchestrator.FINGERPRINT_VERSION + 1)
+
+    assert stage_fingerprint("MARKET_RESEARCH", {"product_name": "Mug"}, {}) != before
+
+
+def test_unchanged_stages_are_reused(db, make_project, run_workflow):
+    project = make_project(brand_persona="bold")
+
+    first = run_workflow(project.id)
+    assert first["status"] == "success"
+    assert first["reused"] == []
+
+    second = run_workflow(project.id)
+    assert sorted(second["reused"]) == ["content_generation", "market_research", "vision_analysis"]
+    assert second["jobs"] == first["jobs"]
+
+    # Only content generation reads brand_persona
+    project.brand_persona = "playful"
+    db.commit()
+    third = run_workflow(project.id)
+    assert sorted(third["reused"]) == ["market_research", "vision_analysis"]
+    assert third["jobs"]["content_generation"] != first["jobs"]["content_generation"]
+
+    forced = run_workflow(project.id, force=True)
+    assert forced["reused"] == []
+    assert db.query(Job).filter(Job.project_id == project.id).count() == 7
+
+
+def test_image_stage_without_images_fails_and_is_not_reused(db, make_project, run_workflow, monkeypatch):
+    async def no_images(self, *args, **kwargs):
+        return {"generated_images": [], "errors": ["Image Generator Error: Bytez unavailable"]}
+
+    monkeypatch.setattr(AgentWrapper, "arun_image_generation", no_images)
+    project = make_project(image_path="mug.jpg")
+
+    first = run_workflow(project.id)
+    image_job = db.get(Job, uuid.UUID(first["jobs"]["image_generation"]))
+    assert (image_job.status, image_job.error_message) == ("failed", "Image Generator Error: Bytez unavailable")
+
+    monkeypatch.undo()
+    second = run_workflow(project.id)
+    assert "image_generation" not in second["reused"]
+    assert db.get(Job, uuid.UUID(second["jobs"]["image_generation"])).status == "completed"
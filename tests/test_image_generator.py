@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+import pytest
+
+# The agent module imports the Bytez SDK and langchain at import time
+pytest.importorskip("bytez")
+pytest.importorskip("langchain_core")
+
+from app.agents.image_generator import ImageGeneratorAgent  # noqa: E402
+
+
+class FakeImageAgent(ImageGeneratorAgent):
+    def __init__(self):
+        self.concurrency = 2
+        self.timeout_seconds = 5
+        self.threads = set()
+
+    def generate_image(self, prompt):
+        self.threads.add(threading.current_thread().name)
+        return {"output": f"https://images.example/{len(prompt)}.png", "error": None}
+
+
+def test_images_are_generated_on_the_shared_agent_pool():
+    agent = FakeImageAgent()
+
+    images, errors = asyncio.run(agent.agenerate_images({"product_name": "Mug"}))
+
+    assert errors == []
+    assert len(images) == len(agent.build_prompts({"product_name": "Mug"}))
+    assert all(name.startswith("agent") for name in agent.threads)
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.job_queue import (
+    BATCH_WORKFLOW_JOB_TYPE, WORKER_LOST_ERROR, WORKFLOW_JOB_TYPE, WORKFLOW_JOB_TYPES, add_batch_workflows,
+    claim_next_job, enqueue_workflow, finish_job, heartbeat_jobs, requeue_stale_jobs
+)
+from app.db.models import Job
+
+
+def _batch(db, make_project, count):
+    projects = [make_project(status="queued") for _ in range(count)]
+    add_batch_workflows(db, [project.id for project in projects], "batch-1")
+    db.commit()
+
+
+def test_enqueue_marks_project_queued(db, make_project):
+    project = make_project()
+
+    job = enqueue_workflow(db, project, {"force": True})
+
+    assert (job.job_type, job.status) == (WORKFLOW_JOB_TYPE, "queued")
+    assert job.input_payload == {"project_id": str(project.id), "force": True}
+    assert project.status == "queued"
+
+
+def test_claim_takes_oldest_and_marks_running(db, make_project):
+    first = enqueue_workflow(db, make_project())
+    db.query(Job).filter(Job.id == first.id).update({Job.created_at: datetime.utcnow() - timedelta(minutes=1)})
+    db.commit()
+    enqueue_workflow(db, make_project())
+
+    job = claim_next_job(db)
+
+    assert job.id == first.id
+    assert job.status == "running"
+    assert job.started_at is not None and job.heartbeat_at is not None
+
+
+def test_empty_queue(db):
+    assert claim_next_job(db) is None
+
+
+def test_interactive_workflows_come_before_batch(db, make_project):
+    _batch(db, make_project, 2)
+    interactive = enqueue_workflow(db, make_project())
+
+    assert claim_next_job(db).id == interactive.id
+    assert claim_next_job(db).job_type == BATCH_WORKFLOW_JOB_TYPE
+
+
+def test_batch_workflows_respect_running_limit(db, make_project, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_RUNNING_WORKFLOWS", 2)
+    _batch(db, make_project, 3)
+
+    running = [claim_next_job(db), claim_next_job(db)]
+    assert claim_next_job(db) is None
+
+    finish_job(db, running[0], {"status": "success"})
+    assert claim_next_job(db).job_type == BATCH_WORKFLOW_JOB_TYPE
+
+
+def test_long_running_job_with_heartbeat_is_kept(db, make_project):
+    enqueue_workflow(db, make_project())
+    job = claim_next_job(db)
+    db.query(Job).update({Job.started_at: datetime.utcnow() - timedelta(hours=3)})
+    db.commit()
+
+    heartbeat_jobs(db, [job.id])
+
+    assert requeue_stale_jobs(db, timedelta(minutes=5)) == 0
+
+
+def test_job_without_heartbeat_is_requeued(db, make_project):
+    enqueue_workflow(db, make_project())
+    job = claim_next_job(db)
+    db.query(Job).update({Job.heartbeat_at: datetime.utcnow() - timedelta(minutes=10)})
+    db.commit()
+
+    assert requeue_stale_jobs(db, timedelta(minutes=5)) == 1
+
+    db.refresh(job)
+    assert (job.status, job.started_at, job.heartbeat_at) == ("queued", None, None)
+    assert claim_next_job(db).id == job.id
+
+
+def test_requeue_fails_the_lost_run_stages(db, make_project):
+    project, other = make_project(), make_project()
+    enqueue_workflow(db, project)
+    job = claim_next_job(db)
+    db.add_all([
+        Job(project_id=project.id, job_type="VISION_ANALYSIS", status="completed"),
+        Job(project_id=project.id, job_type="CONTENT_GENERATION", status="running"),
+        Job(project_id=other.id, job_type="CONTENT_GENERATION", status="running"),
+    ])
+    db.query(Job).filter(Job.id == job.id).update({Job.heartbeat_at: datetime.utcnow() - timedelta(minutes=10)})
+    db.commit()
+
+    assert requeue_stale_jobs(db, timedelta(minutes=5)) == 1
+
+    stages = db.query(Job.project_id, Job.job_type, Job.status, Job.error_message).filter(
+        Job.job_type.notin_(WORKFLOW_JOB_TYPES)
+    )
+    assert set(stages) == {
+        (project.id, "VISION_ANALYSIS", "completed", None),
+        (project.id, "CONTENT_GENERATION", "failed", WORKER_LOST_ERROR),
+        (other.id, "CONTENT_GENERATION", "running", None),
+    }
@@ -0,0 +1,76 @@
+import uuid
+
+from app.core.agent_wrapper import AgentWrapper
+from app.core.job_queue import BATCH_WORKFLOW_JOB_TYPE, WORKFLOW_JOB_TYPE
+from app.db.models import Batch, Job
+
+
+async def _failing_async(*args, **kwargs):
+    raise RuntimeError("agent down")
+
+
+def _stage_job(db, project, job_type):
+    return db.query(Job).filter(Job.project_id == project.id, Job.job_type == job_type).one()
+
+
+def _queued_workflow(db, response):
+    db.expire_all()
+    return db.get(Job, uuid.UUID(response.json()["workflow_job_id"]))
+
+
+def test_failed_stage_is_rerun_in_place(db, client, make_project, run_workflow, monkeypatch):
+    monkeypatch.setattr(AgentWrapper, "arun_market_research", _failing_async)
+    project = make_project()
+    run_workflow(project.id)
+    failed = _stage_job(db, project, "MARKET_RESEARCH")
+
+    response = client.post(f"/jobs/{failed.id}/retry")
+
+    assert response.status_code == 202
+    workflow = _queued_workflow(db, response)
+    assert workflow.job_type == WORKFLOW_JOB_TYPE
+    assert workflow.input_payload["retry_job_id"] == str(failed.id)
+
+    monkeypatch.undo()
+    assert run_workflow(project.id, retry_job_id=failed.id)["status"] == "success"
+    db.expire_all()
+    assert _stage_job(db, project, "MARKET_RESEARCH").status == "completed"
+
+
+def test_stage_of_batch_project_is_retried_as_batch_workflow(db, client, user, make_project, run_workflow, monkeypatch):
+    batch = Batch(user_id=user.id, total=1)
+    db.add(batch)
+    db.commit()
+    monkeypatch.setattr(AgentWrapper, "arun_market_research", _failing_async)
+    project = make_project(batch_id=batch.id)
+    run_workflow(project.id)
+
+    response = client.post(f"/jobs/{_stage_job(db, project, 'MARKET_RESEARCH').id}/retry")
+
+    workflow = _queued_workflow(db, response)
+    assert workflow.job_type == BATCH_WORKFLOW_JOB_TYPE
+    assert workflow.input_payload["batch_id"] == str(batch.id)
+
+
+def test_stage_that_no_longer_applies_is_rejected(db, client, make_project, run_workflow, monkeypatch):
+    monkeypatch.setattr(AgentWrapper, "arun_image_generation", _failing_async)
+    project = make_project(image_path="mug.jpg")
+    run_workflow(project.id)
+    failed = _stage_job(db, project, "IMAGE_GENERATION")
+
+    project.image_path = None
+    db.commit()
+    response = client.post(f"/jobs/{failed.id}/retry")
+
+    assert response.status_code == 409
+    assert db.query(Job).filter(Job.job_type == WORKFLOW_JOB_TYPE).count() == 0
+
+
+def test_only_failed_jobs_can_be_retried(db, client, make_project, run_workflow):
+    project = make_project()
+    run_workflow(project.id)
+
+    response = client.post(f"/jobs/{_stage_job(db, project, 'VISION_ANALYSIS').id}/retry")
+
+    assert response.status_code == 400
+    assert "completed" in response.json()["detail"]
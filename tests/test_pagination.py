@@ -0,0 +1,88 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.models import Project
+from app.utils.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, page_size, paginate, split_page
+)
+
+
+def _add_projects(db, user, count, created_at=None):
+    base = datetime(2026, 1, 1)
+    for i in range(count):
+        db.add(Project(
+            user_id=user.id,
+            product_name=f"P{i}",
+            status="created",
+            # Pairs of rows share a timestamp, so the id tie-break matters
+            created_at=created_at or base + timedelta(seconds=i // 2)
+        ))
+    db.commit()
+
+
+def _walk(db, user, limit, newest_first):
+    seen, cursor = [], None
+    while True:
+        query = paginate(
+            select(Project).where(Project.user_id == user.id),
+            Project, cursor, limit, newest_first=newest_first
+        )
+        rows, cursor = split_page(db.scalars(query).all(), limit)
+        seen.extend(rows)
+        if cursor is None:
+            return seen
+
+
+def test_cursor_round_trip():
+    created_at, row_id = datetime(2026, 3, 4, 5, 6, 7, 890), uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2026, 1, 1), "x")])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_page_size_defaults_and_caps():
+    assert page_size(None) == settings.PAGE_SIZE_DEFAULT
+    assert page_size(0) == settings.PAGE_SIZE_DEFAULT
+    assert page_size(-5) == 1
+    assert page_size(settings.PAGE_SIZE_MAX + 1) == settings.PAGE_SIZE_MAX
+
+
+def test_split_page_trims_extra_row_and_points_at_last_kept():
+    rows = [Project(id=uuid.uuid4(), created_at=datetime(2026, 1, 1, 0, 0, i)) for i in range(4)]
+
+    page, cursor = split_page(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == (rows[2].created_at, rows[2].id)
+
+    assert split_page(rows, 4) == (rows, None)
+
+
+@pytest.mark.parametrize("newest_first", [False, True])
+def test_pages_cover_every_row_once_in_order(db, user, newest_first):
+    _add_projects(db, user, 11)
+
+    rows = _walk(db, user, 3, newest_first)
+
+    keys = [(row.created_at, str(row.id)) for row in rows]
+    assert len(keys) == 11
+    assert len(set(keys)) == 11
+    assert keys == sorted(keys, reverse=newest_first)
+
+
+def test_pages_with_identical_timestamps(db, user):
+    _add_projects(db, user, 7, created_at=datetime(2026, 1, 1))
+
+    assert len({row.id for row in _walk(db, user, 2, newest_first=True)}) == 7
+
+
+def test_empty_result_has_no_cursor(db, user):
+    query = paginate(select(Project).where(Project.user_id == user.id), Project, None, 5)
+    assert split_page(db.scalars(query).all(), 5) == ([], None)
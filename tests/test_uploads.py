@@ -0,0 +1,113 @@
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.upload_reaper import reap_abandoned_uploads
+from app.db.models import Upload
+from app.utils import uploads as upload_storage
+
+
+@pytest.fixture(autouse=True)
+def upload_limit(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1000)
+
+
+def _start(client):
+    response = client.post("/uploads/", json={"filename": "mug.jpg", "content_type": "image/jpeg"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _put(client, upload_id, offset, data):
+    return client.put(f"/uploads/{upload_id}", data={"offset": offset}, files={"chunk": ("chunk", data)})
+
+
+def test_chunks_must_arrive_at_the_current_offset(client):
+    upload_id = _start(client)
+
+    assert _put(client, upload_id, 0, b"a" * 30).json()["bytes_received"] == 30
+
+    conflict = _put(client, upload_id, 0, b"a" * 30)
+    assert conflict.status_code == 409
+    assert conflict.json()["detail"] == "Expected offset 30"
+
+    assert _put(client, upload_id, 30, b"b" * 30).json()["bytes_received"] == 60
+    assert client.get(f"/uploads/{upload_id}").json()["bytes_received"] == 60
+
+
+def test_complete_stores_file_and_incremental_hash(client):
+    upload_id = _start(client)
+    _put(client, upload_id, 0, b"a" * 30)
+    _put(client, upload_id, 30, b"b" * 30)
+
+    completed = client.post(f"/uploads/{upload_id}/complete").json()
+
+    assert completed["status"] == "completed"
+    assert completed["sha256"] == hashlib.sha256(b"a" * 30 + b"b" * 30).hexdigest()
+    assert not os.path.exists(upload_storage.partial_path(uuid.UUID(upload_id)))
+    # Completing again is a no-op, further chunks are refused
+    assert client.post(f"/uploads/{upload_id}/complete").json()["sha256"] == completed["sha256"]
+    assert _put(client, upload_id, 60, b"c").status_code == 400
+
+
+def test_complete_rehashes_chunks_received_elsewhere(client):
+    upload_id = _start(client)
+    _put(client, upload_id, 0, b"x" * 10)
+    # As if the next chunk went to another process
+    upload_storage._partial_digests.clear()
+    _put(client, upload_id, 10, b"y" * 10)
+
+    completed = client.post(f"/uploads/{upload_id}/complete").json()
+
+    assert completed["sha256"] == hashlib.sha256(b"x" * 10 + b"y" * 10).hexdigest()
+
+
+def test_oversized_chunk_is_rejected_and_upload_resumes(client):
+    upload_id = _start(client)
+    _put(client, upload_id, 0, b"a" * 30)
+
+    assert _put(client, upload_id, 30, b"b" * 2000).status_code == 413
+    assert _put(client, upload_id, 30, b"b" * 30).json()["bytes_received"] == 60
+
+    completed = client.post(f"/uploads/{upload_id}/complete").json()
+    assert completed["sha256"] == hashlib.sha256(b"a" * 30 + b"b" * 30).hexdigest()
+
+
+def test_complete_without_data_fails(client):
+    upload_id = _start(client)
+    assert client.post(f"/uploads/{upload_id}/complete").status_code == 400
+
+
+def test_complete_after_data_was_removed_conflicts(client, db):
+    upload_id = _start(client)
+    _put(client, upload_id, 0, b"a" * 30)
+    upload_storage.discard_partial(uuid.UUID(upload_id))
+
+    response = client.post(f"/uploads/{upload_id}/complete")
+
+    assert response.status_code == 409
+    assert db.get(Upload, uuid.UUID(upload_id)).status == "uploading"
+
+
+def test_reaper_removes_abandoned_uploads_only(client, db):
+    abandoned_id, active_id = uuid.UUID(_start(client)), uuid.UUID(_start(client))
+    for upload_id in (abandoned_id, active_id):
+        _put(client, upload_id, 0, b"z")
+    db.query(Upload).update({Upload.created_at: datetime.utcnow() - timedelta(days=3)})
+    db.commit()
+    day_ago = time.time() - 25 * 3600
+    os.utime(upload_storage.partial_path(abandoned_id), (day_ago, day_ago))
+    orphan = upload_storage.partial_path(uuid.uuid4())
+    with open(orphan, "wb") as f:
+        f.write(b"q")
+    os.utime(orphan, (day_ago, day_ago))
+
+    assert reap_abandoned_uploads(db, timedelta(hours=24), batch_size=10) == 1
+
+    assert [row.id for row in db.query(Upload.id)] == [active_id]
+    assert os.listdir(upload_storage.partial_dir()) == [f"{active_id}.part"]
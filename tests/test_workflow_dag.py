@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+from app.core.agent_wrapper import AgentWrapper
+from app.db.models import Job
+
+
+def _stage_statuses(db, project):
+    return dict(db.query(Job.job_type, Job.status).filter(Job.project_id == project.id))
+
+
+def _failing(*args, **kwargs):
+    raise RuntimeError("agent down")
+
+
+async def _failing_async(*args, **kwargs):
+    raise RuntimeError("agent down")
+
+
+def test_independent_stages_run_concurrently(db, make_project, run_workflow, monkeypatch):
+    spans = {}
+    vision = AgentWrapper.run_vision_analysis
+    research = AgentWrapper.arun_market_research
+
+    def slow_vision(self, *args, **kwargs):
+        start = time.monotonic()
+        time.sleep(0.3)
+        spans["vision"] = (start, time.monotonic())
+        return vision(self, *args, **kwargs)
+
+    async def slow_research(self, *args, **kwargs):
+        start = time.monotonic()
+        await asyncio.sleep(0.3)
+        spans["research"] = (start, time.monotonic())
+        return await research(self, *args, **kwargs)
+
+    monkeypatch.setattr(AgentWrapper, "run_vision_analysis", slow_vision)
+    monkeypatch.setattr(AgentWrapper, "arun_market_research", slow_research)
+    project = make_project()
+
+    assert run_workflow(project.id)["status"] == "success"
+
+    (vision_start, vision_end), (research_start, research_end) = spans["vision"], spans["research"]
+    assert vision_start < research_end and research_start < vision_end
+
+
+def test_stage_without_condition_is_skipped(db, make_project, run_workflow):
+    project = make_project()
+
+    result = run_workflow(project.id)
+
+    assert result["jobs"]["image_generation"] is None
+    assert set(_stage_statuses(db, project)) == {"VISION_ANALYSIS", "MARKET_RESEARCH", "CONTENT_GENERATION"}
+
+
+def test_required_failure_stops_dependent_stages(db, make_project, run_workflow, monkeypatch):
+    monkeypatch.setattr(AgentWrapper, "arun_market_research", _failing_async)
+    project = make_project()
+
+    result = run_workflow(project.id)
+
+    assert result["status"] == "failed"
+    assert result["error"] == "agent down"
+    assert _stage_statuses(db, project) == {"VISION_ANALYSIS": "completed", "MARKET_RESEARCH": "failed"}
+    db.refresh(project)
+    assert project.status == "failed"
+
+
+def test_optional_failure_does_not_fail_workflow(db, make_project, run_workflow, monkeypatch):
+    monkeypatch.setattr(AgentWrapper, "arun_image_generation", _failing_async)
+    project = make_project(image_path="mug.jpg")
+
+    result = run_workflow(project.id)
+
+    assert result["status"] == "success"
+    assert _stage_statuses(db, project)["IMAGE_GENERATION"] == "failed"
+    assert _stage_statuses(db, project)["CONTENT_GENERATION"] == "completed"